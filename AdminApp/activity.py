@@ -0,0 +1,92 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
+
+from .models import ActivityEntry
+
+
+DEFAULT_PAGE_SIZE = 20
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def _user_id(user):
+    return user.pk if user is not None and user.is_authenticated else None
+
+
+def record_activity(business_id, user, action, obj=None, message='', model=None, object_count=1):
+    """Add one entry to the feed of a business"""
+    if not business_id:
+        return None
+    model = model or (type(obj) if obj is not None else None)
+    return ActivityEntry.objects.create(
+        business_id=business_id,
+        user_id=_user_id(user),
+        action=action,
+        content_type=ContentType.objects.get_for_model(model) if model else None,
+        object_id=str(obj.pk) if obj is not None else None,
+        object_repr=str(obj)[:200] if obj is not None else '',
+        object_count=object_count,
+        message=message,
+    )
+
+
+def record_bulk_activity(user, model, business_ids, message):
+    """One 'bulk' entry per business for an action over many objects
+
+    business_ids holds the business of every affected object, so each
+    business's entry can carry its own object count.
+    """
+    content_type = ContentType.objects.get_for_model(model)
+    entries = [
+        ActivityEntry(
+            business_id=business_id,
+            user_id=_user_id(user),
+            action='bulk',
+            content_type=content_type,
+            object_repr=f'{count} {model._meta.verbose_name if count == 1 else model._meta.verbose_name_plural}',
+            object_count=count,
+            message=message,
+        )
+        for business_id, count in Counter(business_ids).items() if business_id
+    ]
+    return ActivityEntry.objects.bulk_create(entries)
+
+
+def encode_cursor(entry):
+    """Opaque position of an entry, pointing at everything older than it"""
+    delta = entry.created_at - EPOCH
+    microseconds = (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+    return f'{microseconds}-{entry.pk}'
+
+
+def decode_cursor(cursor):
+    """(created_at, pk) of a cursor, or None when it is malformed"""
+    try:
+        microseconds, pk = cursor.split('-')
+        return EPOCH + timedelta(microseconds=int(microseconds)), int(pk)
+    except (AttributeError, ValueError, OverflowError):
+        return None
+
+
+def get_activity_page(business, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """A page of a business's feed, newest first, with the cursor of the next page
+
+    Keyset pagination on (created_at, id): every page is an index range scan
+    of limit + 1 rows however far back it is, unlike OFFSET.
+    """
+    entries = (
+        ActivityEntry.objects.filter(business=business)
+        .select_related('user', 'content_type')
+        .order_by('-created_at', '-id')
+    )
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        created_at, pk = position
+        entries = entries.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+    entries = list(entries[:limit + 1])
+    next_cursor = encode_cursor(entries[limit - 1]) if len(entries) > limit else None
+    return entries[:limit], next_cursor
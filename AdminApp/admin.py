@@ -5,12 +5,27 @@ from django.utils.html import format_html
 from django.http import HttpResponseRedirect
 from django.contrib import messages
 from .models import *
+from .dashboard_cache import invalidate_business_dashboards
+from .activity import record_activity, record_bulk_activity
+from .bulk_actions import BULK_ACTION_CHUNK_SIZE, run_in_chunks, set_bulk_progress
+from .payments import pay_in_full
+from .write_queue import run_serialized, write_queue_enabled
+from .object_counts import COUNTED_MODELS, get_object_count
+from .filter_choices import choice_label, choice_queryset
 
 from django import forms
 
 
 from django import forms
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ORDER_VAR, PAGE_VAR, ChangeList
+from django.db import router
+from django.db.models import Q
+from django.core.exceptions import NON_FIELD_ERRORS
+from django.core.paginator import InvalidPage
+from django.urls import reverse
 
 
 from import_export import resources
@@ -22,12 +37,241 @@ import xlwt
 from datetime import datetime
  
 
+class SaveErrorFormMixin:
+    """Adds the errors of a rejected save to a bound form, see BusinessAwareAdmin.changeform_view"""
+    save_error = None
+
+    def _post_clean(self):
+        super()._post_clean()
+        if self.save_error is not None:
+            self._update_errors(self.save_error)
+
+
+class VehicleNumberSearchMixin:
+    """Admin search that also matches vehicle numbers anywhere, however they are typed
+
+    "MH 12 AB", "mh12ab" and "12-ab-1234" all find MH12AB1234 through the
+    normalized vehicle_key. The other search fields are matched anywhere too,
+    so this adds no scan of its own; the indexed prefix lookups are in
+    AdminApp.vehicle_lookup.
+    """
+    # Path from the admin's model to Vehicle, '' for Vehicle itself
+    vehicle_search_path = 'vehicle'
+
+    def get_search_results(self, request, queryset, search_term):
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        key = normalize_vehicle_number(search_term)
+        if key:
+            path = f'{self.vehicle_search_path}__' if self.vehicle_search_path else ''
+            results |= queryset.filter(**{f'{path}vehicle_key__icontains': key})
+        return results, may_have_duplicates
+
+
+class AjaxRelatedListFilter(admin.RelatedFieldListFilter):
+    """Related-object filter whose choices are searched on demand from /api/filter-choices/<field>/
+
+    Only the selected object is loaded with the changelist, so its render
+    time does not grow with the parties, vehicles or drivers of a business.
+    The field must be one of AdminApp.filter_choices.CHOICE_FIELDS.
+    """
+    template = 'admin/adminapp/ajax_related_filter.html'
+
+    def field_choices(self, field, request, model_admin):
+        self.choices_url = reverse('filter_choices_api', args=[self.field_path])
+        selected = [value for value in self.lookup_val or () if value]
+        if not selected:
+            return []
+        try:
+            objects = choice_queryset(field.related_model, request.user).filter(pk__in=selected)
+            if field.related_model is not Business:
+                objects = objects.select_related('business')
+            return [(obj.pk, choice_label(obj, request.user)) for obj in objects]
+        except (ValueError, ValidationError):
+            # Not a valid id, the changelist reports it as a bad lookup
+            return []
+
+    @property
+    def include_empty_choice(self):
+        return False
+
+    def has_output(self):
+        return True
+
+
+# Filtered changelists count at most this many rows and show e.g. "10,000+" beyond it
+ADMIN_COUNT_CAP = getattr(settings, 'ADMIN_COUNT_CAP', 10000)
+
+# Query string parameter asking a changelist for the exact filtered count
+EXACT_COUNT_VAR = '_count'
+
+# Query string parameters of keyset pages: the last row before, or the first row after, the page
+AFTER_VAR = '_after'
+BEFORE_VAR = '_before'
+
+
+class CappedCount(int):
+    """A count that stopped at the cap, displayed with a trailing "+" like 10,000+"""
+
+    def __str__(self):
+        return f'{int(self):,}+'
+
+
+class CachedCountChangeList(ChangeList):
+    """Changelist that never counts a whole table
+
+    The unfiltered total comes from the per-business BusinessObjectCount rows.
+    A filtered or searched list whose first page is not full needs no COUNT,
+    the page holds every row. Otherwise it counts at most ADMIN_COUNT_CAP + 1
+    rows and shows "10,000+" past the cap; ?_count=1 asks for the exact count.
+
+    With the admin's keyset_field set and the default ordering, pages are
+    sought by (keyset_field, pk) cursors instead of OFFSET, so a deep page
+    costs as much as the first one.
+    """
+
+    def get_filters_params(self, params=None):
+        params = super().get_filters_params(params)
+        for name in (EXACT_COUNT_VAR, AFTER_VAR, BEFORE_VAR):
+            params.pop(name, None)
+        return params
+
+    def get_result_counts(self, request):
+        """(filtered count, unfiltered count) of the rows the user can see"""
+        self.single_page = None
+        full_result_count = self.model_admin.get_cached_count(request)
+        if not self.get_filters_params() and not self.query:
+            return full_result_count, full_result_count
+        if EXACT_COUNT_VAR in self.params:
+            return self.queryset.count(), full_result_count
+        if self.page_num == 1 and AFTER_VAR not in self.params and BEFORE_VAR not in self.params:
+            # Read one row past the first page; if it isn't there, the page is the whole list
+            rows = self.queryset[:self.list_per_page + 1]
+            if len(rows) <= self.list_per_page:
+                self.single_page = rows
+                return len(rows), full_result_count
+        result_count = self.queryset.order_by().values('pk')[:ADMIN_COUNT_CAP + 1].count()
+        if result_count > ADMIN_COUNT_CAP:
+            result_count = CappedCount(ADMIN_COUNT_CAP)
+        return result_count, full_result_count
+
+    def get_results(self, request):
+        result_count, full_result_count = self.get_result_counts(request)
+        paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        # Already known, the paginator must not run its own COUNT
+        paginator.count = result_count
+        can_show_all = result_count <= self.list_max_show_all
+        multi_page = result_count > self.list_per_page
+
+        # Sorting by a column header falls back to numbered pages
+        field = self.model_admin.keyset_field
+        self.keyset = bool(field) and ORDER_VAR not in self.params and multi_page
+        self.next_page_url = self.previous_page_url = None
+        if (self.show_all and can_show_all) or not multi_page:
+            self.keyset = False
+            result_list = self.queryset._clone() if self.single_page is None else self.single_page
+        elif self.keyset:
+            result_list = self.get_keyset_page(field)
+        else:
+            try:
+                result_list = paginator.page(self.page_num).object_list
+            except InvalidPage:
+                raise IncorrectLookupParameters
+
+        self.result_count = result_count
+        self.count_is_capped = isinstance(result_count, CappedCount)
+        self.exact_count_url = self.get_query_string({EXACT_COUNT_VAR: 1})
+        self.show_full_result_count = self.model_admin.show_full_result_count
+        self.show_admin_actions = bool(full_result_count)
+        self.full_result_count = full_result_count
+        self.result_list = result_list
+        self.can_show_all = can_show_all
+        self.multi_page = multi_page
+        self.paginator = paginator
+
+    def get_keyset_page(self, field):
+        """The page after ?_after=, before ?_before=, or the first one, newest first
+
+        Only the (field, pk) keys of the page plus one row are read to find
+        out whether another page follows; the page itself is fetched by pk.
+        The plain bound on field beside the (field, pk) comparison lets SQLite
+        seek into the index instead of walking it from the start.
+        """
+        model_field = self.model._meta.get_field(field)
+        after, before = self.params.get(AFTER_VAR), self.params.get(BEFORE_VAR)
+        keys = self.queryset.values_list(field, 'pk')
+        try:
+            if before:
+                value, pk = self.decode_cursor(model_field, before)
+                keys = keys.filter(
+                    Q(**{f'{field}__gte': value}),
+                    Q(**{f'{field}__gt': value}) | Q(**{field: value, 'pk__gt': pk}),
+                )
+                keys = keys.order_by(field, 'pk')
+            else:
+                keys = keys.order_by(f'-{field}', '-pk')
+                if after:
+                    value, pk = self.decode_cursor(model_field, after)
+                    keys = keys.filter(
+                        Q(**{f'{field}__lte': value}),
+                        Q(**{f'{field}__lt': value}) | Q(**{field: value, 'pk__lt': pk}),
+                    )
+            keys = list(keys[:self.list_per_page + 1])
+        except (ValueError, ValidationError):
+            raise IncorrectLookupParameters
+
+        more = len(keys) > self.list_per_page
+        keys = keys[:self.list_per_page]
+        if before:
+            keys.reverse()
+        has_next, has_previous = (True, more) if before else (more, bool(after))
+        if keys and has_next:
+            self.next_page_url = self.get_query_string(
+                {AFTER_VAR: self.encode_cursor(*keys[-1]), BEFORE_VAR: None, PAGE_VAR: None}
+            )
+        if keys and has_previous:
+            self.previous_page_url = self.get_query_string(
+                {BEFORE_VAR: self.encode_cursor(*keys[0]), AFTER_VAR: None, PAGE_VAR: None}
+            )
+        return self.queryset.filter(pk__in=[pk for value, pk in keys]).order_by(f'-{field}', '-pk')
+
+    @staticmethod
+    def encode_cursor(value, pk):
+        return f'{value}~{pk}'
+
+    @staticmethod
+    def decode_cursor(model_field, cursor):
+        value, pk = cursor.rsplit('~', 1)
+        return model_field.to_python(value), int(pk)
+
+
 class BusinessAwareAdmin(admin.ModelAdmin):
     """Base admin class for all business-related models with Jazzmin support"""
     
     # Jazzmin settings
     list_per_page = 25
     show_full_result_count = True
+
+    # Rows changed per transaction by run_bulk_action
+    bulk_action_chunk_size = BULK_ACTION_CHUNK_SIZE
+
+    # Count changelist rows from BusinessObjectCount and capped COUNTs, see CachedCountChangeList
+    use_cached_counts = True
+
+    # Field of the default ordering that changelist pages are sought by, None for OFFSET pages
+    keyset_field = None
+
+    def get_changelist(self, request, **kwargs):
+        if self.use_cached_counts and self.model in COUNTED_MODELS:
+            return CachedCountChangeList
+        return super().get_changelist(request, **kwargs)
+
+    def get_cached_count(self, request):
+        """Stored number of rows the user can see, without filters"""
+        if hasattr(request.user, 'is_system_admin') and request.user.is_system_admin:
+            return get_object_count(self.model)
+        elif hasattr(request.user, 'business') and request.user.business:
+            return get_object_count(self.model, request.user.business_id)
+        return 0
     
     def get_list_display(self, request):
         list_display = super().get_list_display(request) or []
@@ -35,10 +279,57 @@ class BusinessAwareAdmin(admin.ModelAdmin):
             return ('business',) + tuple(list_display)
         return list_display
     
+    # Mirror admin log entries into the business activity feed
+    def log_addition(self, request, obj, message):
+        entry = super().log_addition(request, obj, message)
+        record_activity(obj.business_id, request.user, 'add', obj, entry.get_change_message())
+        return entry
+    
+    def log_change(self, request, obj, message):
+        entry = super().log_change(request, obj, message)
+        record_activity(obj.business_id, request.user, 'change', obj, entry.get_change_message())
+        return entry
+    
+    def log_deletions(self, request, queryset):
+        entries = super().log_deletions(request, queryset)
+        objects = list(queryset)
+        if len(objects) == 1:
+            record_activity(objects[0].business_id, request.user, 'delete', objects[0])
+        else:
+            record_bulk_activity(request.user, self.model, [obj.business_id for obj in objects], 'Deleted')
+        return entries
+    
+    def run_bulk_action(self, request, queryset, message, process):
+        """Apply process(chunk) to a selection in pk-range chunks, one short transaction each
+
+        A huge selection never holds the write lock for long. Each chunk records
+        its activity entries and invalidates its dashboards as it commits, and
+        the progress is published for /api/bulk-actions/progress/.
+        Returns the number of rows process() changed.
+        """
+        state = {'action': request.POST.get('action', ''), 'model': self.model._meta.model_name,
+                 'message': message, 'finished': False}
+
+        def process_chunk(chunk):
+            business_ids = list(chunk.values_list('business_id', flat=True))
+            updated = process(chunk)
+            invalidate_business_dashboards(business_ids)
+            record_bulk_activity(request.user, self.model, business_ids, message)
+            return updated
+
+        def progress(done, total, chunks):
+            state.update(done=done, total=total, chunks=chunks)
+            set_bulk_progress(request.user.pk, state)
+
+        updated = run_in_chunks(queryset, process_chunk, self.bulk_action_chunk_size, progress)
+        state['finished'] = True
+        set_bulk_progress(request.user.pk, state)
+        return updated
+
     def get_list_filter(self, request):
         list_filter = super().get_list_filter(request) or []
         if hasattr(request.user, 'is_system_admin') and request.user.is_system_admin:
-            return ('business', 'created_at') + tuple(list_filter)
+            return (('business', AjaxRelatedListFilter), 'created_at') + tuple(list_filter)
         return tuple(list_filter) + ('created_at',) if list_filter else ('created_at',)
     
     def get_queryset(self, request):
@@ -69,8 +360,41 @@ class BusinessAwareAdmin(admin.ModelAdmin):
                 return ('business',) + tuple(exclude)
         return exclude
     
+    def queues_writes(self):
+        """The SQLite write queue is on for this model's database, see AdminApp.write_queue"""
+        return write_queue_enabled(router.db_for_write(self.model))
+
+    def changeform_view(self, request, object_id=None, form_url='', extra_context=None):
+        # With the write queue, only save_model() and save_related() go to the writer
+        # thread; validation and rendering stay here, outside any transaction
+        view = self._changeform_view if self.queues_writes() else super().changeform_view
+        try:
+            return view(request, object_id, form_url, extra_context)
+        except ValidationError as error:
+            # The save was rejected, e.g. by a unique constraint, and rolled back:
+            # show the form again with the errors
+            request.save_error = error
+            return view(request, object_id, form_url, extra_context)
+
+    def delete_view(self, request, object_id, extra_context=None):
+        if self.queues_writes():
+            return self._delete_view(request, object_id, extra_context)
+        return super().delete_view(request, object_id, extra_context)
+
+    def save_related(self, request, form, formsets, change):
+        save_related = super().save_related
+        run_serialized(lambda: save_related(request, form, formsets, change), router.db_for_write(self.model))
+
+    def delete_model(self, request, obj):
+        delete_model = super().delete_model
+        run_serialized(lambda: delete_model(request, obj), router.db_for_write(self.model))
+
     def get_form(self, request, obj=None, **kwargs):
         form = super().get_form(request, obj, **kwargs)
+
+        save_error = getattr(request, 'save_error', None)
+        if save_error is not None:
+            form = type(form.__name__, (SaveErrorFormMixin, form), {'save_error': save_error})
         
         # For non-admin users, handle business field logic
         if not (hasattr(request.user, 'is_system_admin') and request.user.is_system_admin):
@@ -117,7 +441,8 @@ class BusinessAwareAdmin(admin.ModelAdmin):
             
             # Call parent save ONLY if obj exists
             if obj is not None:
-                super().save_model(request, obj, form, change)
+                save_model = super().save_model
+                run_serialized(lambda: save_model(request, obj, form, change), router.db_for_write(self.model))
             else:
                 print("DEBUG: obj is None, cannot save")
                 
@@ -710,36 +1035,9 @@ class VehicleOwnerForm(forms.ModelForm):
         model = VehicleOwner
         fields = '__all__'
 
-    def clean(self):
-        cleaned_data = super().clean()
-        owner_name = cleaned_data.get('owner_name')
-        mobile_number = cleaned_data.get('owner_mobile_number')
-        
-        # Only validate if we have both name, mobile number and request context
-        if (owner_name and 
-            mobile_number and 
-            self.request and 
-            hasattr(self.request.user, 'business') and 
-            self.request.user.business):
-            
-            queryset = VehicleOwner.objects.filter(
-                business=self.request.user.business,
-                owner_name=owner_name,
-                owner_mobile_number=mobile_number
-            )
-            
-            # Exclude current instance when editing
-            if self.instance and self.instance.pk:
-                queryset = queryset.exclude(pk=self.instance.pk)
-            
-            if queryset.exists():
-                raise forms.ValidationError({
-                    'owner_mobile_number': f'An owner with name "{owner_name}" and mobile number {mobile_number} already exists in your business.',
-                    'owner_name': f'An owner with name "{owner_name}" and mobile number {mobile_number} already exists in your business.'
-                })
-        
-        return cleaned_data
-    
+    # Duplicate name + mobile is caught by the unique constraint when saving,
+    # see UniqueConstraintMixin and BusinessAwareAdmin.changeform_view
+
 
 
 @admin.register(VehicleOwner)
@@ -825,6 +1123,7 @@ class VehicleOwnerAdmin(ExportMixin, BusinessAwareAdmin):
             f"{count} Vehicle{'s' if count != 1 else ''}"
         )
     total_vehicles_badge.short_description = 'Total Vehicles'
+    total_vehicles_badge.admin_order_field = 'vehicle_count'
 
     def get_form(self, request, obj=None, **kwargs):
         """Inject request into the form"""
@@ -880,40 +1179,8 @@ class VehicleForm(forms.ModelForm):
         else:
             print("🚀 DEBUG: ❌ No request available")
 
-        if 1<10:
-            vehicle_count=Vehicle.objects.filter(business=business).count()
-            max_vehicles=business.max_vehicles
-            if vehicle_number and business and vehicle_count >= max_vehicles:
-                raise forms.ValidationError({
-                    'vehicle_number': f'Cannot add more vehicles. Maximum limit of {max_vehicles} reached for your business.'
-                }) 
-        
-        # Your existing validation logic
-        if vehicle_number and business:
-            print(f"🚀 DEBUG: Checking duplicate for '{vehicle_number}' in '{business.business_name}'")
-            try: 
-                queryset = Vehicle.objects.filter(
-                    business=business,
-                    vehicle_number=vehicle_number
-                )
-                
-                if self.instance and self.instance.pk:
-                    queryset = queryset.exclude(pk=self.instance.pk) 
-                
-                if queryset.exists():
-                    existing_vehicle = queryset.first()
-                    owner_info = f" (Owner: {existing_vehicle.owner.owner_name})" if existing_vehicle.owner else "" 
-                    
-                    raise forms.ValidationError({
-                        'vehicle_number': f'Vehicle number "{vehicle_number}" is already registered in your business{owner_info}.'
-                    })
-                else:
-                    print("🚀 DEBUG: ✅ No duplicate found")
-                
-            except Exception as e:
-                raise forms.ValidationError({
-                    'vehicle_number': f'Error: {str(e)}'
-                })
+        # The vehicle limit and duplicate numbers are checked by Vehicle.save(),
+        # atomically and without pre-check queries
 
         if owner and business:
             print(f"🚀 DEBUG: Checking owner-business consistency")
@@ -934,7 +1201,7 @@ class VehicleForm(forms.ModelForm):
     
 from django.db import IntegrityError
 @admin.register(Vehicle)
-class VehicleAdmin(ExportMixin, BusinessAwareAdmin):
+class VehicleAdmin(VehicleNumberSearchMixin, ExportMixin, BusinessAwareAdmin):
     resource_class = VehicleResource
     formats = [base_formats.XLSX, base_formats.CSV]
     
@@ -948,7 +1215,8 @@ class VehicleAdmin(ExportMixin, BusinessAwareAdmin):
         'created_at'
     )
     list_filter = ('created_at', 'updated_at')
-    search_fields = ('vehicle_number', 'vehicle_name', 'model_name', 'owner__owner_name')
+    search_fields = ('vehicle_name', 'model_name', 'owner__owner_name')
+    vehicle_search_path = ''
     readonly_fields = ('photo_preview', 'owner_info', 'total_bills_badge', 'created_at', 'updated_at')
     list_select_related = ('owner', 'business')
     date_hierarchy = 'created_at'
@@ -1070,6 +1338,7 @@ class VehicleAdmin(ExportMixin, BusinessAwareAdmin):
             f"{count} Bill{'s' if count != 1 else ''}"
         )
     total_bills_badge.short_description = 'Total Bills'
+    total_bills_badge.admin_order_field = 'bill_count'
 
     def get_queryset(self, request):
         qs = super().get_queryset(request)
@@ -1105,30 +1374,8 @@ class PartyForm(forms.ModelForm):
             cleaned_data['business'] = business
 
         print(f"DEBUG: PartyForm clean() - business: {business}")
-        # Validate name + mobile uniqueness (only when both are provided)
-        if name and mobile and business:
-            queryset = Party.objects.filter(
-                business=business,
-                name=name,
-                mobile=mobile
-            )
-            
-            if self.instance and self.instance.pk:
-                queryset = queryset.exclude(pk=self.instance.pk)
-            
-            if queryset.exists():
-                self.add_error('mobile', f'A party with name "{name}" and mobile number {mobile} already exists in your business.')
-                self.add_error('name', f'A party with name "{name}" and mobile number {mobile} already exists in your business.')
-        
-        # Validate GST uniqueness (global)
-        if gst_no:
-            gst_no = gst_no.strip().upper()
-            queryset = Party.objects.filter(gst_no=gst_no)
-            if self.instance and self.instance.pk:
-                queryset = queryset.exclude(pk=self.instance.pk)
-            if queryset.exists():
-                self.add_error('gst_no', f'GST number {gst_no} is already registered with another party.')
-        
+        # Name + mobile and GST duplicates are caught by the unique constraints when saving
+
         # Validate mobile conflicts
         # if mobile and business:
         #     primary_queryset = Party.objects.filter(business=business, mobile=mobile)
@@ -1263,11 +1510,12 @@ class PartyAdmin(ExportMixin, BusinessAwareAdmin):
         'mobile_display', 
         'photo_preview', 
         'total_bills_badge',
+        'outstanding_amount',
         'created_at'
     )
     list_filter = ('created_at', 'updated_at')
     search_fields = ('name', 'gst_no', 'mobile', 'alternate_mobile', 'business__business_name')
-    readonly_fields = ('photo_preview', 'total_bills_badge', 'created_at', 'updated_at')
+    readonly_fields = ('photo_preview', 'total_bills_badge', 'outstanding_amount', 'created_at', 'updated_at')
     list_select_related = ('business',)
     date_hierarchy = 'created_at'
     
@@ -1297,7 +1545,7 @@ class PartyAdmin(ExportMixin, BusinessAwareAdmin):
             'classes': ('collapse',)
         }),
         ('Statistics', {
-            'fields': ('total_bills_badge',),
+            'fields': ('total_bills_badge', 'outstanding_amount'),
             'classes': ('collapse',)
         }),
         ('System Information', {
@@ -1344,6 +1592,7 @@ class PartyAdmin(ExportMixin, BusinessAwareAdmin):
             f"{count} Bill{'s' if count != 1 else ''}"
         )
     total_bills_badge.short_description = 'Total Bills'
+    total_bills_badge.admin_order_field = 'bill_count'
     
     def get_queryset(self, request):
         qs = super().get_queryset(request)
@@ -1375,15 +1624,8 @@ class DriverForm(forms.ModelForm):
             business = self.request.user.business
             cleaned_data['business'] = business
         
-        # Validate mobile uniqueness
-        if mobile and business:
-            queryset = Driver.objects.filter(business=business, mobile=mobile)
-            if self.instance and self.instance.pk:
-                queryset = queryset.exclude(pk=self.instance.pk)
-            if queryset.exists():
-                self.add_error('mobile', 
-                    f'Driver with mobile {mobile} already exists in your business.')
- 
+        # Mobile duplicates are caught by the unique constraints when saving
+
         return cleaned_data
     
 
@@ -1487,6 +1729,7 @@ class DriverAdmin(ExportMixin, BusinessAwareAdmin):
             f"{count} Bill{'s' if count != 1 else ''}"
         )
     total_bills_badge.short_description = 'Total Bills'
+    total_bills_badge.admin_order_field = 'bill_count'
     
     def get_queryset(self, request):
         qs = super().get_queryset(request)
@@ -1500,6 +1743,35 @@ class DriverAdmin(ExportMixin, BusinessAwareAdmin):
 
 
 
+class VehicleLookupSelect(forms.Select):
+    """Vehicle select of the bill form searched by number through /api/vehicles/lookup/
+
+    Only the selected vehicle is rendered with the form; others are found as
+    the number is typed, however it is spelled, through the vehicle_key index.
+    """
+    template_name = 'admin/adminapp/vehicle_lookup_select.html'
+
+    class Media:
+        js = ('admin/js/vendor/jquery/jquery.min.js', 'admin/js/vendor/select2/select2.full.min.js', 'admin/js/jquery.init.js')
+        css = {'screen': ('admin/css/vendor/select2/select2.min.css',)}
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['lookup_url'] = reverse('vehicle_lookup_api')
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        selected = [option for option in value if option]
+        empty_label = self.choices.field.empty_label
+        choices = [] if empty_label is None else [('', empty_label)]
+        if selected:
+            choices += [self.choices.choice(vehicle) for vehicle in self.choices.queryset.filter(pk__in=selected)]
+        return [
+            (None, [self.create_option(name, option, label, bool(option), index, attrs=attrs)], index)
+            for index, (option, label) in enumerate(choices)
+        ]
+
+
 class BillForm(forms.ModelForm):
     class Meta:
         model = Bill
@@ -1517,42 +1789,22 @@ class BillForm(forms.ModelForm):
         
         # Get values from cleaned_data with safe defaults
         rent_amount = cleaned_data.get('rent_amount', 0) or 0
-        advance_amount = cleaned_data.get('advance_amount', 0) or 0
         commission = cleaned_data.get('commission', 0) or 0
         commission_charge = cleaned_data.get('commission_charge', 0) or 0
-        commission_received = cleaned_data.get('commission_received', 0) or 0
-        commission_received_date = cleaned_data.get('commission_received_date')
         business = cleaned_data.get('business')
         vehicle = cleaned_data.get('vehicle')
 
         # AUTO-CALCULATIONS (set back to cleaned_data)
-        # Auto-calculate pending amount
-        pending_amount = rent_amount - advance_amount
-        cleaned_data['pending_amount'] = pending_amount
-        
+        # Pending amounts are computed by the database, see Bill.pending_amount
+
         # Auto-calculate commission charge if commission percentage is provided
         if commission and commission > 0 and not commission_charge:
             commission_charge = (rent_amount * commission) / 100
             cleaned_data['commission_charge'] = commission_charge
-        
-        # Auto-calculate commission pending
-        if commission_charge:
-            commission_pending = commission_charge - commission_received
-            cleaned_data['commission_pending'] = commission_pending
 
         # VALIDATIONS
-        if advance_amount > rent_amount:
-            raise ValidationError({'advance_amount': 'Advance amount cannot exceed rent amount.'})
-        
-        if commission_received > commission_charge:
-            raise ValidationError({'commission_received': 'Commission received cannot exceed commission charge.'})
+        # The amount rules live in Bill.clean, which bulk creation runs too
 
-        # Validate commission received date
-        if commission_received_date and not commission_received:
-            raise ValidationError({
-                'commission_received_date': 'Commission received date cannot be set without commission received amount.'
-            })
-        
         # Validate vehicle belongs to the same business
         if vehicle and business and vehicle.business != business:
             raise ValidationError({
@@ -1561,14 +1813,42 @@ class BillForm(forms.ModelForm):
 
         return cleaned_data
 
+    def _update_errors(self, errors):
+        # Bill.clean may name a field shown read-only, e.g. the advance when the rent drops below it
+        if hasattr(errors, 'error_dict'):
+            for field in [name for name in errors.error_dict if name != NON_FIELD_ERRORS and name not in self.fields]:
+                errors.error_dict.setdefault(NON_FIELD_ERRORS, []).extend(errors.error_dict.pop(field))
+        super()._update_errors(errors)
+
     # REMOVE THE ENTIRE save() method from BillForm
     # Let the model handle bill number generation
     
 
 
 
+class BillPaymentInline(admin.TabularInline):
+    """Payment history of a bill; payments are recorded through AdminApp.payments"""
+    model = BillPayment
+    fields = ('paid_on', 'kind', 'amount', 'received_by', 'notes', 'created_at')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_view_permission(self, request, obj=None):
+        # Whoever may open the bill, like BusinessAwareAdmin, sees its payments
+        if hasattr(request.user, 'is_system_admin') and request.user.is_system_admin:
+            return True
+        return bool(getattr(request.user, 'business', None))
+
+
 @admin.register(Bill)
-class BillAdmin(ExportMixin, BusinessAwareAdmin):
+class BillAdmin(VehicleNumberSearchMixin, ExportMixin, BusinessAwareAdmin):
     resource_class = BillResource
     formats = [base_formats.XLSX, base_formats.CSV]
     
@@ -1701,13 +1981,13 @@ class BillAdmin(ExportMixin, BusinessAwareAdmin):
         'print_button',
     )
     
+    # Business is added for system admins by BusinessAwareAdmin.get_list_filter
     list_filter = (
         DateRangeFilter,
         'bill_date',
-        'business',
-        'driver',
-        'vehicle',
-        'party',
+        ('driver', AjaxRelatedListFilter),
+        ('vehicle', AjaxRelatedListFilter),
+        ('party', AjaxRelatedListFilter),
         PaymentStatusListFilter,
         CommissionStatusListFilter,
     )
@@ -1715,7 +1995,6 @@ class BillAdmin(ExportMixin, BusinessAwareAdmin):
     search_fields = (
         'bill_number',
         'party__name',
-        'vehicle__vehicle_number',
         'driver__driver_name',
         'from_location',
         'to_location',
@@ -1790,8 +2069,20 @@ class BillAdmin(ExportMixin, BusinessAwareAdmin):
     list_select_related = ('party', 'vehicle', 'driver', 'reference', 'business')
     date_hierarchy = 'bill_date'
     ordering = ('-bill_date',)
+    # Pages are sought by (bill_date, id) through bill_business_date_id_idx
+    keyset_field = 'bill_date'
     
     actions = ['mark_as_paid', 'mark_commission_received']
+    inlines = [BillPaymentInline]
+
+    # Received amounts of a saved bill only change through payments, so the ledger sees every one
+    payment_fields = ('advance_amount', 'commission_received', 'commission_received_date')
+
+    def get_readonly_fields(self, request, obj=None):
+        readonly_fields = super().get_readonly_fields(request, obj)
+        if obj:
+            return tuple(readonly_fields) + self.payment_fields
+        return readonly_fields
     
     def print_button(self, obj):
         """Print button for individual bill"""
@@ -1997,11 +2288,14 @@ class BillAdmin(ExportMixin, BusinessAwareAdmin):
     updated_at_display.short_description = 'Updated At'
     
     def mark_as_paid(self, request, queryset):
-        from django.db.models import F
-        updated = queryset.update(
-            advance_amount=F('rent_amount'),
-            pending_amount=0
-        )
+        from django.utils import timezone
+        today = timezone.localdate()
+
+        def process(bills):
+            # Each bill gets a ledger payment of its pending rent
+            return len(pay_in_full(bills, 'rent', today, request.user, 'Marked as paid'))
+
+        updated = self.run_bulk_action(request, queryset, 'Marked as paid', process)
         self.message_user(
             request,
             f'Successfully marked {updated} bill(s) as paid.',
@@ -2011,12 +2305,12 @@ class BillAdmin(ExportMixin, BusinessAwareAdmin):
     
     def mark_commission_received(self, request, queryset):
         from django.utils import timezone
-        from django.db.models import F
-        updated = queryset.update(
-            commission_received=F('commission_charge'),
-            commission_pending=0,
-            commission_received_date=timezone.now().date()
-        )
+        today = timezone.localdate()
+
+        def process(bills):
+            return len(pay_in_full(bills, 'commission', today, request.user, 'Marked commission as received'))
+
+        updated = self.run_bulk_action(request, queryset, 'Marked commission as received', process)
         self.message_user(
             request,
             f'Successfully marked commission as received for {updated} bill(s).',
@@ -2028,12 +2322,6 @@ class BillAdmin(ExportMixin, BusinessAwareAdmin):
         qs = super().get_queryset(request)
         return qs.select_related('party', 'vehicle', 'driver', 'reference', 'business')
     
-    def get_list_filter(self, request):
-        list_filter = list(super().get_list_filter(request))
-        if not request.user.is_system_admin:
-            list_filter = [f for f in list_filter if f != 'business']
-        return list_filter
-
     def formfield_for_foreignkey(self, db_field, request, **kwargs):
         """
         Filter foreign key dropdowns to show ONLY current business data
@@ -2049,6 +2337,7 @@ class BillAdmin(ExportMixin, BusinessAwareAdmin):
                     kwargs["queryset"] = Party.objects.filter(business=business)
                 elif db_field.name == "vehicle":
                     kwargs["queryset"] = Vehicle.objects.filter(business=business)
+                    kwargs["widget"] = VehicleLookupSelect
                 elif db_field.name == "driver":
                     kwargs["queryset"] = Driver.objects.filter(business=business)
                 elif db_field.name == "reference":
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AdminappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'AdminApp'
+
+    def ready(self):
+        from . import signals  # noqa: F401
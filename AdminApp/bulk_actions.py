@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .write_queue import run_serialized
+
+
+# Rows written per transaction; each chunk holds SQLite's write lock only briefly
+BULK_ACTION_CHUNK_SIZE = getattr(settings, 'BULK_ACTION_CHUNK_SIZE', 500)
+BULK_ACTION_CACHE_ALIAS = getattr(settings, 'BULK_ACTION_CACHE_ALIAS', 'default')
+
+# Seconds the progress of an action stays readable after its last chunk
+PROGRESS_TIMEOUT = 3600
+
+
+def _progress_key(user_id):
+    return f'bulk-action:progress:{user_id}'
+
+
+def get_bulk_progress(user_id):
+    """Progress of the latest bulk action of a user, or None"""
+    return caches[BULK_ACTION_CACHE_ALIAS].get(_progress_key(user_id))
+
+
+def set_bulk_progress(user_id, progress):
+    caches[BULK_ACTION_CACHE_ALIAS].set(_progress_key(user_id), progress, timeout=PROGRESS_TIMEOUT)
+
+
+def pk_chunks(queryset, chunk_size=BULK_ACTION_CHUNK_SIZE):
+    """Consecutive (first_pk, last_pk) ranges holding up to chunk_size rows of a queryset
+
+    Each range is looked up after the previous one was processed, by keyset
+    rather than offset, so updates that make rows leave the queryset do not
+    shift the remaining chunks.
+    """
+    pks = queryset.order_by('pk').values_list('pk', flat=True)
+    last = None
+    while True:
+        chunk = list((pks if last is None else pks.filter(pk__gt=last))[:chunk_size])
+        if not chunk:
+            return
+        last = chunk[-1]
+        yield chunk[0], last
+
+
+def _process_chunk(process, chunk):
+    with transaction.atomic():
+        return process(chunk)
+
+
+def run_in_chunks(queryset, process, chunk_size=BULK_ACTION_CHUNK_SIZE, progress=None):
+    """Call process(chunk) for pk-range slices of a queryset, each in its own transaction
+
+    Chunks go through the SQLite write queue when it is enabled.
+    process returns the number of rows it changed. progress(done, total, chunks)
+    is called after every committed chunk. Returns the total of process().
+    """
+    total = queryset.count()
+    done = chunks = 0
+    if progress:
+        progress(done, total, chunks)
+    for first, last in pk_chunks(queryset, chunk_size):
+        done += run_serialized(lambda: _process_chunk(process, queryset.filter(pk__gte=first, pk__lte=last)))
+        chunks += 1
+        if progress:
+            progress(done, total, chunks)
+    return done
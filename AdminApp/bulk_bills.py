@@ -0,0 +1,179 @@
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+
+from .models import Bill, Vehicle, Party, Driver, VehicleOwner, normalize_vehicle_number
+from .rollups import refresh_rollups
+from .leaderboards import refresh_leaderboards
+from .dashboard_cache import invalidate_business_dashboards
+from .activity import record_bulk_activity
+from .payments import adjust_party_balances, pending_amount
+from .object_counts import adjust_object_counts, adjust_related_counts
+from .write_queue import run_serialized
+from .vehicle_lookup import vehicle_key_map
+
+
+DEFAULT_CHUNK_SIZE = 200
+
+# Foreign keys a row may set by id, and the business-owned model each points to
+RELATED_FIELDS = {
+    'vehicle': Vehicle,
+    'party': Party,
+    'driver': Driver,
+    'reference': VehicleOwner,
+}
+
+# Plain fields a row may set; numbers, business and timestamps are managed here
+VALUE_FIELDS = (
+    'from_location', 'to_location', 'material_type', 'rent_amount', 'advance_amount',
+    'commission', 'commission_charge', 'commission_received', 'notes', 'bill_date',
+    'commission_received_date',
+)
+
+# Rows may name the vehicle by number instead of id, typed any way vehicle_key normalizes
+VEHICLE_NUMBER_FIELD = 'vehicle_number'
+
+
+class BulkBillResult:
+    """Bills created by create_bills and the errors of the rows that were skipped"""
+
+    def __init__(self):
+        self.created = []
+        self.errors = {}
+
+    def add_error(self, row, errors):
+        self.errors.setdefault(row, {}).update(errors)
+
+    def as_dict(self):
+        return {
+            'created': [{'id': bill.pk, 'bill_number': bill.bill_number} for bill in self.created],
+            'errors': [{'row': row, 'errors': errors} for row, errors in sorted(self.errors.items())],
+        }
+
+
+def _business_ids(business):
+    """Ids of the vehicles, parties, drivers and owners of a business, one query each
+
+    Vehicles come with their keys, under VEHICLE_NUMBER_FIELD, to resolve numbers.
+    """
+    vehicle_keys = vehicle_key_map(business)
+    ids = {
+        field: set(model.objects.filter(business=business).values_list('pk', flat=True))
+        for field, model in RELATED_FIELDS.items() if model is not Vehicle
+    }
+    ids['vehicle'] = set(vehicle_keys.values())
+    ids[VEHICLE_NUMBER_FIELD] = vehicle_keys
+    return ids
+
+
+def build_bill(business, values, related_ids):
+    """An unsaved, validated Bill for one row, or raise ValidationError
+
+    Foreign keys are checked against the preloaded ids of the business instead
+    of one query per key, which full_clean() would do.
+    """
+    unknown = set(values) - set(VALUE_FIELDS) - set(RELATED_FIELDS) - {VEHICLE_NUMBER_FIELD}
+    if unknown:
+        raise ValidationError({field: 'Unknown field.' for field in sorted(unknown)})
+
+    bill = Bill(business=business, **{field: values[field] for field in VALUE_FIELDS if field in values})
+
+    errors = {}
+    number = values.get(VEHICLE_NUMBER_FIELD)
+    if number not in (None, ''):
+        pk = related_ids[VEHICLE_NUMBER_FIELD].get(normalize_vehicle_number(str(number)))
+        if values.get('vehicle') not in (None, ''):
+            errors['vehicle'] = f'Give either vehicle or {VEHICLE_NUMBER_FIELD}, not both.'
+        elif pk is None:
+            errors['vehicle'] = f'No vehicle {number} in this business.'
+        else:
+            values = {**values, 'vehicle': pk}
+
+    for field in RELATED_FIELDS:
+        if field in errors:
+            continue
+        pk = values.get(field)
+        if pk in (None, ''):
+            if not Bill._meta.get_field(field).null:
+                errors[field] = 'This field is required.'
+            continue
+        try:
+            pk = int(pk)
+        except (TypeError, ValueError):
+            errors[field] = 'Must be an id.'
+            continue
+        if pk not in related_ids[field]:
+            errors[field] = f'No {field} {pk} in this business.'
+            continue
+        setattr(bill, f'{field}_id', pk)
+
+    try:
+        bill.clean_fields(exclude=['bill_number', 'business'] + list(RELATED_FIELDS))
+    except ValidationError as error:
+        errors.update({field: ' '.join(messages) for field, messages in error.message_dict.items()})
+    # Commission charge and the amount rules of BillForm, once the amounts themselves are valid
+    if not errors.keys() & set(VALUE_FIELDS):
+        try:
+            bill.clean()
+        except ValidationError as error:
+            errors.update({field: ' '.join(messages) for field, messages in error.message_dict.items()})
+    if errors:
+        raise ValidationError(errors)
+    return bill
+
+
+def _insert_chunk(bills, chunk_size):
+    """Number and insert one chunk atomically, so its numbers are only used if it commits"""
+    sequences = {}
+    for bill in bills:
+        sequences.setdefault(bill.bill_number_sequence(), []).append(bill)
+
+    with transaction.atomic():
+        for sequence_bills in sequences.values():
+            sequence_bills[0].assign_bill_numbers(sequence_bills)
+        Bill.objects.bulk_create(bills, batch_size=chunk_size)
+
+        # bulk_create sends no signals, keep the derived tables in step here
+        refresh_rollups({(bill.business_id, bill.bill_date) for bill in bills})
+        refresh_leaderboards({(bill.business_id, bill.bill_date, bill.vehicle_id, bill.party_id) for bill in bills})
+        adjust_party_balances((bill.party_id, pending_amount(bill.rent_amount, bill.advance_amount)) for bill in bills)
+        adjust_object_counts(Bill, [bill.business_id for bill in bills])
+        adjust_related_counts(Bill, bills)
+        invalidate_business_dashboards({bill.business_id for bill in bills})
+
+
+def create_bills(business, rows, chunk_size=DEFAULT_CHUNK_SIZE, user=None):
+    """Create many bills of a business from dicts of field values
+
+    Every row is validated before anything is written. Valid rows are numbered
+    in contiguous blocks and inserted chunk by chunk; invalid rows, and the
+    rows of a chunk the database rejects, are reported by index in
+    result.errors without stopping the others.
+    """
+    result = BulkBillResult()
+    related_ids = _business_ids(business)
+
+    valid = []
+    for index, values in enumerate(rows):
+        if not isinstance(values, dict):
+            result.add_error(index, {'__all__': ['Each bill must be an object.']})
+            continue
+        try:
+            valid.append((index, build_bill(business, values, related_ids)))
+        except ValidationError as error:
+            result.add_error(index, error.message_dict)
+
+    for start in range(0, len(valid), chunk_size):
+        chunk = valid[start:start + chunk_size]
+        bills = [bill for index, bill in chunk]
+        try:
+            run_serialized(lambda: _insert_chunk(bills, chunk_size))
+        except DatabaseError as error:
+            for index, bill in chunk:
+                bill.bill_number = ''
+                result.add_error(index, {'__all__': [str(error)]})
+            continue
+        result.created.extend(bills)
+
+    if result.created:
+        record_bulk_activity(user, Bill, [bill.business_id for bill in result.created], 'Created in bulk')
+    return result
@@ -0,0 +1,75 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, connections
+
+
+# Upper bound on dashboard queries running at the same time per process.
+# SQLite readers run in parallel on separate connections and release the
+# GIL while a statement runs, but every worker thread holds its own
+# connection while it runs, so keep this small.
+DASHBOARD_QUERY_WORKERS = getattr(settings, 'DASHBOARD_QUERY_WORKERS', 4)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=DASHBOARD_QUERY_WORKERS,
+                    thread_name_prefix='dashboard-query',
+                )
+    return _executor
+
+
+def _run_in_worker(call):
+    """Run a query callable on a worker thread and release its connection afterwards"""
+    try:
+        return call()
+    finally:
+        connections.close_all()
+
+
+def _must_run_inline():
+    # Worker threads use their own connections and cannot see rows written
+    # by an open transaction of the calling thread. With a single worker
+    # there is nothing to gain from handing the queries over.
+    return connection.in_atomic_block or DASHBOARD_QUERY_WORKERS <= 1
+
+
+def _run_inline(calls):
+    return {name: call() for name, call in calls.items()}
+
+
+def run_concurrently(calls):
+    """Run independent name -> callable queries on the bounded pool, blocking until all finish"""
+    if _must_run_inline():
+        return _run_inline(calls)
+
+    executor = get_executor()
+    futures = {name: executor.submit(_run_in_worker, call) for name, call in calls.items()}
+    return {name: future.result() for name, future in futures.items()}
+
+
+async def arun_concurrently(calls):
+    """Async version of run_concurrently, awaiting the queries on the same bounded pool"""
+    # Asked on the thread sync code runs on, whose connection holds the open transaction
+    if await sync_to_async(_must_run_inline)():
+        return await sync_to_async(_run_inline)(calls)
+
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    names = list(calls)
+    results = await asyncio.gather(*(
+        loop.run_in_executor(executor, _run_in_worker, calls[name])
+        for name in names
+    ))
+    return dict(zip(names, results))
+
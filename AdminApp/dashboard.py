@@ -0,0 +1,256 @@
+from datetime import timedelta
+
+from django.db.models import Count, Sum, Q, F
+from django.db.models.functions import TruncWeek, TruncMonth
+
+from .models import Business, BillDailyRollup, Vehicle, Party, Driver, VehicleOwner
+from .subqueries import count_subquery
+
+
+# Amount totals shown on the dashboard, keyed by the context name they use
+BILL_TOTAL_FIELDS = {
+    'total_revenue': 'rent_amount',
+    'total_advance': 'advance_amount',
+    'total_pending': 'pending_amount',
+    'total_commission': 'commission_charge',
+    'total_commission_received': 'commission_received',
+    'total_commission_pending': 'commission_pending',
+}
+
+# (label, BillDailyRollup counter, filter) - same rules as Bill.payment_status
+PAYMENT_STATUSES = (
+    ('Paid', 'paid_count', Q(pending_amount=0)),
+    ('Partially Paid', 'partial_count', Q(advance_amount__gt=0, pending_amount__gt=0)),
+    ('Pending', 'pending_count', Q(advance_amount=0, pending_amount__gt=0)),
+)
+
+
+# Metrics compared against the previous period
+COMPARED_METRICS = ('total_bills',) + tuple(BILL_TOTAL_FIELDS)
+
+
+def _format_metrics(result, suffix=''):
+    """Shape a raw aggregate result into the dashboard metric names"""
+    metrics = {'total_bills': result['total_bills' + suffix] or 0}
+    for key in BILL_TOTAL_FIELDS:
+        metrics[key] = result[key + suffix] or 0
+    metrics['payment_status_data'] = {
+        label: result[counter + suffix] or 0
+        for label, counter, condition in PAYMENT_STATUSES
+    }
+    return metrics
+
+
+def get_bill_metrics(bills):
+    """Key bill totals and payment status split for any bill queryset in one query"""
+    aggregates = {'total_bills': Count('id')}
+    for key, field in BILL_TOTAL_FIELDS.items():
+        aggregates[key] = Sum(field)
+    for label, counter, condition in PAYMENT_STATUSES:
+        aggregates[counter] = Count('id', filter=condition)
+    return _format_metrics(bills.aggregate(**aggregates))
+
+
+def _rollup_aggregates(suffix='', period=None):
+    """Sums of every rollup metric, limited to the rows matching period when given"""
+    aggregates = {'total_bills' + suffix: Sum('bill_count', filter=period)}
+    for key, field in BILL_TOTAL_FIELDS.items():
+        aggregates[key + suffix] = Sum(field, filter=period)
+    for label, counter, condition in PAYMENT_STATUSES:
+        aggregates[counter + suffix] = Sum(counter, filter=period)
+    return aggregates
+
+
+def get_rollup_metrics(rollups):
+    """Same result as get_bill_metrics, read from BillDailyRollup rows"""
+    return _format_metrics(rollups.aggregate(**_rollup_aggregates()))
+
+
+def previous_period(start_date, end_date):
+    """The equally long period ending the day before start_date"""
+    previous_end = start_date - timedelta(days=1)
+    return previous_end - (end_date - start_date), previous_end
+
+
+def get_period_metrics(business, start_date, end_date):
+    """Metrics of a period and of the period before it, from one aggregation
+
+    The rollups of both periods are read in a single pass over the combined
+    span, each metric summed twice with a filter on its half.
+    """
+    previous_start, previous_end = previous_period(start_date, end_date)
+    rollups = BillDailyRollup.objects.filter(
+        business=business,
+        bill_date__range=[previous_start, end_date]
+    )
+    # Both halves are suffixed, an alias may not shadow a field another Sum() reads
+    result = rollups.aggregate(
+        **_rollup_aggregates('_current', Q(bill_date__gte=start_date)),
+        **_rollup_aggregates('_previous', Q(bill_date__lte=previous_end)),
+    )
+    return _format_metrics(result, '_current'), _format_metrics(result, '_previous')
+
+
+def get_metric_deltas(current, previous):
+    """Absolute and percent change of each compared metric"""
+    deltas = {}
+    for key in COMPARED_METRICS:
+        change = current[key] - previous[key]
+        deltas[key] = {
+            'previous': previous[key],
+            'change': change,
+            # No percentage against an empty previous period
+            'percent': round(float(change) / float(previous[key]) * 100, 1) if previous[key] else None,
+        }
+    return deltas
+
+
+def get_entity_counts(business):
+    """Vehicle, party, driver and owner counts for a business in one query"""
+    counts = Business.objects.filter(pk=business.pk).annotate(
+        total_vehicles=count_subquery(Vehicle),
+        total_parties=count_subquery(Party),
+        total_drivers=count_subquery(Driver),
+        total_owners=count_subquery(VehicleOwner),
+    ).values('total_vehicles', 'total_parties', 'total_drivers', 'total_owners').first()
+    return counts or {
+        'total_vehicles': 0,
+        'total_parties': 0,
+        'total_drivers': 0,
+        'total_owners': 0,
+    }
+
+
+def get_dashboard_metrics(business, start_date, end_date):
+    """All key metrics for a business and date range, compared with the previous period"""
+    metrics, previous = get_period_metrics(business, start_date, end_date)
+    previous_start, previous_end = previous_period(start_date, end_date)
+    metrics['comparison'] = {
+        'start_date': previous_start,
+        'end_date': previous_end,
+        'previous': previous,
+        'deltas': get_metric_deltas(metrics, previous),
+    }
+    metrics.update(get_entity_counts(business))
+    return metrics
+
+
+# Bucket expressions on bill_date; rollups are already one row per day
+GRANULARITIES = {
+    'day': lambda: F('bill_date'),
+    'week': lambda: TruncWeek('bill_date'),
+    'month': lambda: TruncMonth('bill_date'),
+}
+
+# Longest span (in days) still shown with the given granularity
+DAY_BUCKET_MAX_SPAN = 62
+WEEK_BUCKET_MAX_SPAN = 366
+
+
+def pick_granularity(start_date, end_date):
+    """Choose day, week or month buckets so the chart stays readable"""
+    span = (end_date - start_date).days + 1
+    if span <= DAY_BUCKET_MAX_SPAN:
+        return 'day'
+    if span <= WEEK_BUCKET_MAX_SPAN:
+        return 'week'
+    return 'month'
+
+
+def bucket_start(value, granularity):
+    """First day of the bucket containing a date (weeks start on Monday like TruncWeek)"""
+    if granularity == 'week':
+        return value - timedelta(days=value.weekday())
+    if granularity == 'month':
+        return value.replace(day=1)
+    return value
+
+
+def next_bucket(value, granularity):
+    if granularity == 'week':
+        return value + timedelta(days=7)
+    if granularity == 'month':
+        return (value.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return value + timedelta(days=1)
+
+
+def bucket_label(value, granularity):
+    if granularity == 'month':
+        return value.strftime('%Y-%m')
+    return value.strftime('%Y-%m-%d')
+
+
+def build_revenue_series(rows, start_date, end_date, granularity=None):
+    """Revenue and advance per day/week/month from bills or BillDailyRollup rows
+
+    Buckets are grouped in SQL and gaps are filled in one pass over the
+    ordered result, so the cost is linear in the number of buckets.
+    """
+    if granularity not in GRANULARITIES:
+        granularity = pick_granularity(start_date, end_date)
+
+    buckets = (
+        rows.order_by()
+        .annotate(bucket=GRANULARITIES[granularity]())
+        .values('bucket')
+        .annotate(revenue=Sum('rent_amount'), advance=Sum('advance_amount'))
+        .order_by('bucket')
+    )
+
+    labels, revenue, advance = [], [], []
+    buckets = iter(buckets)
+    row = next(buckets, None)
+    current = bucket_start(start_date, granularity)
+    while current <= end_date:
+        labels.append(bucket_label(current, granularity))
+        while row is not None and row['bucket'] < current:
+            row = next(buckets, None)
+        if row is not None and row['bucket'] == current:
+            revenue.append(float(row['revenue'] or 0))
+            advance.append(float(row['advance'] or 0))
+            row = next(buckets, None)
+        else:
+            revenue.append(0)
+            advance.append(0)
+        current = next_bucket(current, granularity)
+
+    return {
+        'granularity': granularity,
+        'labels': labels,
+        'revenue': revenue,
+        'advance': advance,
+    }
+
+
+# Columns of the cross-business overview, keyed by the name they sort on
+OVERVIEW_TOTAL_FIELDS = {
+    'total_bills': 'bill_count',
+    'total_revenue': 'rent_amount',
+    'total_pending': 'pending_amount',
+    'total_commission': 'commission_charge',
+    'total_commission_pending': 'commission_pending',
+}
+OVERVIEW_SORT_FIELDS = ('business_name',) + tuple(OVERVIEW_TOTAL_FIELDS)
+OVERVIEW_DEFAULT_SORT = '-total_revenue'
+
+
+def get_business_overview(start_date, end_date, sort=OVERVIEW_DEFAULT_SORT):
+    """Bill totals of every business for a date range, as one grouped query
+
+    Businesses are LEFT JOINed to their daily rollups, so tenants without
+    bills in the range still show up with zeros. Unknown sort keys fall back
+    to the default; ties are broken by pk to keep paging stable.
+    """
+    if sort.lstrip('-') not in OVERVIEW_SORT_FIELDS:
+        sort = OVERVIEW_DEFAULT_SORT
+
+    in_range = Q(bill_rollups__bill_date__range=[start_date, end_date])
+    totals = {
+        key: Sum(f'bill_rollups__{field}', filter=in_range, default=0)
+        for key, field in OVERVIEW_TOTAL_FIELDS.items()
+    }
+    return (
+        Business.objects.annotate(**totals)
+        .values('pk', 'business_name', 'business_label', 'status', *totals)
+        .order_by(sort, 'pk')
+    )
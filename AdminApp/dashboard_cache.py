@@ -0,0 +1,112 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+# Seconds a computed dashboard stays cached; writes invalidate it sooner
+DASHBOARD_CACHE_TIMEOUT = getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300)
+DASHBOARD_CACHE_ALIAS = getattr(settings, 'DASHBOARD_CACHE_ALIAS', 'default')
+
+HITS_KEY = 'dashboard:stats:hits'
+MISSES_KEY = 'dashboard:stats:misses'
+
+
+def _cache():
+    return caches[DASHBOARD_CACHE_ALIAS]
+
+
+def _version_key(business_id):
+    return f'dashboard:version:{business_id}'
+
+
+def _increment(key):
+    """incr() that also works when the key is missing or was evicted"""
+    cache = _cache()
+    if cache.add(key, 1, timeout=None):
+        return 1
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+        return 1
+
+
+def get_business_version(business_id):
+    """Current cache version of a business
+
+    A missing version starts from the clock rather than 1, so entries written
+    under an evicted version can never be mistaken for current ones.
+    """
+    cache = _cache()
+    key = _version_key(business_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_business_version(business_id):
+    """Invalidate every cached dashboard of a business"""
+    cache = _cache()
+    key = _version_key(business_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, int(time.time() * 1000), timeout=None)
+
+
+def invalidate_business_dashboards(business_ids):
+    """Bump the versions once the current transaction commits
+
+    Bumping before commit would let a concurrent reader cache the old data
+    under the new version.
+    """
+    business_ids = {business_id for business_id in business_ids if business_id}
+
+    def bump():
+        for business_id in business_ids:
+            bump_business_version(business_id)
+
+    if business_ids:
+        transaction.on_commit(bump)
+
+
+def dashboard_cache_key(business_id, start_date, end_date, *extra):
+    version = get_business_version(business_id)
+    parts = [str(business_id), str(version), start_date.isoformat(), end_date.isoformat()]
+    parts.extend(str(part) for part in extra)
+    return 'dashboard:data:' + ':'.join(parts)
+
+
+def get_cached_dashboard_data(business, start_date, end_date, compute, *extra):
+    """Return compute() for a business and date range, cached until the business changes"""
+    cache = _cache()
+    key = dashboard_cache_key(business.pk, start_date, end_date, *extra)
+    data = cache.get(key)
+    if data is not None:
+        _increment(HITS_KEY)
+        return data
+
+    _increment(MISSES_KEY)
+    data = compute()
+    cache.set(key, data, timeout=DASHBOARD_CACHE_TIMEOUT)
+    return data
+
+
+def get_cache_stats():
+    cache = _cache()
+    hits = cache.get(HITS_KEY) or 0
+    misses = cache.get(MISSES_KEY) or 0
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total * 100, 1) if total else 0,
+    }
+
+
+def reset_cache_stats():
+    _cache().delete_many([HITS_KEY, MISSES_KEY])
@@ -0,0 +1,86 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .dashboard_cache import get_business_version
+from .models import Business, Driver, Party, Vehicle
+from .vehicle_lookup import vehicle_key_prefix_filter
+
+
+# Choices returned per search; the changelist filters never load more
+FILTER_CHOICES_LIMIT = 20
+FILTER_CHOICES_TIMEOUT = getattr(settings, 'FILTER_CHOICES_TIMEOUT', 300)
+FILTER_CHOICES_CACHE_ALIAS = getattr(settings, 'FILTER_CHOICES_CACHE_ALIAS', 'default')
+
+# Related model of each searchable filter and the field its choices are matched and ordered by
+CHOICE_FIELDS = {
+    'party': (Party, 'name'),
+    'driver': (Driver, 'driver_name'),
+    'vehicle': (Vehicle, 'vehicle_key'),
+    'business': (Business, 'business_name'),
+}
+
+
+def _is_system_admin(user):
+    return getattr(user, 'is_system_admin', False)
+
+
+def choice_queryset(model, user):
+    """Objects of a filter's model that the user may pick"""
+    objects = model._default_manager.all()
+    if _is_system_admin(user):
+        return objects
+    if model is Business or not getattr(user, 'business_id', None):
+        return objects.none()
+    return objects.filter(business_id=user.business_id)
+
+
+def choice_label(obj, user):
+    """Text of a choice, with the business for system admins who see every business"""
+    if _is_system_admin(user) and not isinstance(obj, Business):
+        return f'{obj} ({obj.business})'
+    return str(obj)
+
+
+def search_choices(field, user, query='', limit=FILTER_CHOICES_LIMIT):
+    """Up to limit {'id', 'text'} choices of a filter matching query, in index order
+
+    Parties and drivers match anywhere in the name and are read in
+    (business, name) index order, so the LIMIT stops the walk early; vehicles
+    match their number by vehicle_key prefix.
+    """
+    model, order = CHOICE_FIELDS[field]
+    objects = choice_queryset(model, user)
+    if model is Vehicle:
+        prefix = vehicle_key_prefix_filter(query)
+        if prefix:
+            objects = objects.filter(**prefix)
+    elif query:
+        objects = objects.filter(**{f'{order}__icontains': query})
+    if _is_system_admin(user) and model is not Business:
+        objects = objects.select_related('business')
+    return [
+        {'id': obj.pk, 'text': choice_label(obj, user)}
+        for obj in objects.order_by(order, 'pk')[:limit]
+    ]
+
+
+def get_filter_choices(field, user, query='', limit=FILTER_CHOICES_LIMIT):
+    """search_choices of a business user, cached until the business's data changes
+
+    System admins search across businesses, which share no cache version, so
+    their results are not cached.
+    """
+    if _is_system_admin(user) or not getattr(user, 'business_id', None):
+        return search_choices(field, user, query, limit)
+
+    digest = hashlib.md5(query.strip().lower().encode()).hexdigest()
+    version = get_business_version(user.business_id)
+    key = f'filter-choices:{user.business_id}:{version}:{field}:{limit}:{digest}'
+    cache = caches[FILTER_CHOICES_CACHE_ALIAS]
+    choices = cache.get(key)
+    if choices is None:
+        choices = search_choices(field, user, query.strip(), limit)
+        cache.set(key, choices, timeout=FILTER_CHOICES_TIMEOUT)
+    return choices
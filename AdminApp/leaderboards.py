@@ -0,0 +1,163 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Sum, Q
+from django.utils import timezone
+
+from .models import Bill, LeaderboardWindow, LeaderboardEntry
+
+
+# Standard windows, as (start_date, end_date) for a given day
+WINDOWS = {
+    'this_month': lambda today: (today.replace(day=1), today),
+    'last_30_days': lambda today: (today - timedelta(days=30), today),
+    'this_year': lambda today: (today.replace(month=1, day=1), today),
+}
+
+# Bill field each leaderboard groups on, and what a missing subject is called
+LEADERBOARDS = {
+    'vehicle': ('vehicle_id', 'Unknown'),
+    'party': ('party_id', 'Unknown Party'),
+}
+
+
+def match_window(start_date, end_date, today=None):
+    """Name of the standard window covering exactly start_date..end_date, or None"""
+    today = today or timezone.now().date()
+    for name, bounds in WINDOWS.items():
+        if bounds(today) == (start_date, end_date):
+            return name
+    return None
+
+
+def _subject_totals(bills, kind):
+    field = LEADERBOARDS[kind][0]
+    return (
+        bills.order_by()
+        .values(field)
+        .annotate(bill_count=Count('id'), revenue=Sum('rent_amount', default=0))
+    )
+
+
+def _subject_filter(field, subject_ids):
+    condition = Q(**{f'{field}__in': [pk for pk in subject_ids if pk is not None]})
+    if None in subject_ids:
+        condition |= Q(**{f'{field}__isnull': True})
+    return condition
+
+
+def _write_entries(window, kind, subject_ids=None):
+    """Recompute the entries of a window for some subjects, or all of them when None"""
+    field = LEADERBOARDS[kind][0]
+    bills = Bill.objects.filter(
+        business_id=window.business_id,
+        bill_date__range=[window.start_date, window.end_date]
+    )
+    entries = window.entries.filter(kind=kind)
+    if subject_ids is not None:
+        bills = bills.filter(_subject_filter(field, subject_ids))
+        entries = entries.filter(_subject_filter(field, subject_ids))
+
+    rows = [
+        LeaderboardEntry(window=window, kind=kind, bill_count=totals['bill_count'],
+                         revenue=totals['revenue'], **{field: totals[field]})
+        for totals in _subject_totals(bills, kind)
+    ]
+    with transaction.atomic():
+        entries.delete()
+        LeaderboardEntry.objects.bulk_create(rows)
+
+
+def get_current_window(business_id, name, today=None):
+    """The materialized window of a business, rebuilt first if it has moved on since it was built"""
+    today = today or timezone.now().date()
+    start_date, end_date = WINDOWS[name](today)
+    window = LeaderboardWindow.objects.filter(business_id=business_id, name=name).first()
+    if window and (window.start_date, window.end_date) == (start_date, end_date):
+        return window
+
+    with transaction.atomic():
+        window, created = LeaderboardWindow.objects.update_or_create(
+            business_id=business_id, name=name,
+            defaults={'start_date': start_date, 'end_date': end_date},
+        )
+        for kind in LEADERBOARDS:
+            _write_entries(window, kind)
+    return window
+
+
+def get_top_entries(business, kind, start_date, end_date, limit):
+    """Top subjects by revenue from the matching window, or None for a custom range"""
+    name = match_window(start_date, end_date)
+    if name is None:
+        return None
+
+    window = get_current_window(business.pk, name)
+    entries = (
+        window.entries.filter(kind=kind)
+        .select_related(kind)
+        .order_by('-revenue', '-bill_count', LEADERBOARDS[kind][0])[:limit]
+    )
+    return [
+        {
+            'label': _label(getattr(entry, kind), kind),
+            'bill_count': entry.bill_count,
+            'revenue': entry.revenue,
+        }
+        for entry in entries
+    ]
+
+
+def get_live_top_entries(bills, kind, limit):
+    """Same result as get_top_entries, computed from a bill queryset"""
+    field, unknown = LEADERBOARDS[kind]
+    label_field = 'vehicle__vehicle_number' if kind == 'vehicle' else 'party__name'
+    rows = (
+        _subject_totals(bills, kind)
+        .values(field, label_field, 'bill_count', 'revenue')
+        .order_by('-revenue', '-bill_count', field)[:limit]
+    )
+    return [
+        {
+            'label': row[label_field] or unknown,
+            'bill_count': row['bill_count'],
+            'revenue': row['revenue'],
+        }
+        for row in rows
+    ]
+
+
+def _label(subject, kind):
+    if subject is None:
+        return LEADERBOARDS[kind][1]
+    return subject.vehicle_number if kind == 'vehicle' else subject.name
+
+
+def refresh_leaderboards(changes):
+    """Recompute the entries touched by bill changes
+
+    changes are (business_id, bill_date, vehicle_id, party_id) tuples, for both
+    the old and new state of an edited bill. Only windows that are already
+    built and contain the bill date are updated; the rest rebuild on first read.
+    """
+    changes_by_business = defaultdict(list)
+    for business_id, bill_date, vehicle_id, party_id in changes:
+        if business_id and bill_date:
+            changes_by_business[business_id].append((bill_date, vehicle_id, party_id))
+
+    for business_id, business_changes in changes_by_business.items():
+        for window in LeaderboardWindow.objects.filter(business_id=business_id):
+            subjects = {'vehicle': set(), 'party': set()}
+            for bill_date, vehicle_id, party_id in business_changes:
+                if window.start_date <= bill_date <= window.end_date:
+                    subjects['vehicle'].add(vehicle_id)
+                    subjects['party'].add(party_id)
+            for kind, subject_ids in subjects.items():
+                if subject_ids:
+                    _write_entries(window, kind, subject_ids)
+
+
+def reset_business_leaderboards(business_ids):
+    """Drop the windows of some businesses so they rebuild on next read"""
+    LeaderboardWindow.objects.filter(business_id__in=list(business_ids)).delete()
@@ -0,0 +1,135 @@
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare sequential and concurrent (async) dashboard computation on a seeded, "
+        "throwaway SQLite database. Your real database is never touched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bills', type=int, default=50000, help='Bills to seed (default 50000).')
+        parser.add_argument('--days', type=int, default=365, help='Days the bills are spread over (default 365).')
+        parser.add_argument('--vehicles', type=int, default=50, help='Vehicles to seed (default 50).')
+        parser.add_argument('--parties', type=int, default=300, help='Parties to seed (default 300).')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per variant (default 5).')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stderr.write('The benchmark creates a temporary SQLite database and needs the sqlite3 backend.')
+            return
+
+        directory = tempfile.mkdtemp()
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        original_test_name = test_settings.get('NAME')
+        # A file database, so worker threads get independent connections like in production
+        test_settings['NAME'] = os.path.join(directory, 'benchmark.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            business = self.seed(options)
+            self.run_benchmark(business, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            test_settings['NAME'] = original_test_name
+
+    def seed(self, options):
+        from AdminApp.models import Business, Vehicle, Party, Driver, Bill
+        from AdminApp.rollups import rebuild_business_rollups
+
+        self.stdout.write(f"Seeding {options['bills']} bills over {options['days']} days...")
+        business = Business.objects.create(
+            business_name='Benchmark Transport', business_label='BENCH', mobile_number='9999999999',
+            max_vehicles=options['vehicles'],
+        )
+        vehicles = Vehicle.objects.bulk_create([
+            Vehicle(business=business, vehicle_number=f'MH12BM{number:04d}')
+            for number in range(options['vehicles'])
+        ])
+        parties = Party.objects.bulk_create([
+            Party(business=business, name=f'Party {number}')
+            for number in range(options['parties'])
+        ])
+        drivers = Driver.objects.bulk_create([
+            Driver(business=business, driver_name=f'Driver {number}')
+            for number in range(20)
+        ])
+
+        rng = random.Random(42)
+        today = timezone.now().date()
+        bills = []
+        for number in range(options['bills']):
+            rent = rng.randrange(1000, 50000, 100)
+            advance = rng.choice([0, rent // 2, rent])
+            bills.append(Bill(
+                business=business,
+                bill_number=f'BENCH-{number:07d}',
+                vehicle=rng.choice(vehicles),
+                party=rng.choice(parties),
+                driver=rng.choice(drivers),
+                bill_date=today - timedelta(days=rng.randrange(options['days'])),
+                from_location='Pune',
+                to_location='Mumbai',
+                rent_amount=rent,
+                advance_amount=advance,
+                commission_charge=rent // 20,
+            ))
+        Bill.objects.bulk_create(bills, batch_size=2000)
+        rebuild_business_rollups(business.pk)
+        return business
+
+    def run_benchmark(self, business, options):
+        from AdminApp.concurrency import DASHBOARD_QUERY_WORKERS
+        from AdminApp.views import (
+            DASHBOARD_BLOCKS, acompute_dashboard, compute_dashboard, compute_dashboard_block,
+        )
+
+        end_date = timezone.now().date()
+        start_date = end_date - timedelta(days=options['days'])
+        cache = caches['default']
+
+        def timed(run):
+            durations = []
+            for _ in range(options['repeat']):
+                cache.clear()
+                started = time.perf_counter()
+                run()
+                durations.append((time.perf_counter() - started) * 1000)
+            return durations
+
+        # Worker threads need the seeded rows committed, which they are outside any atomic block
+        sync_times = timed(lambda: compute_dashboard(business, start_date, end_date))
+        # What dashboard_data_api awaits
+        async_times = timed(lambda: asyncio.run(acompute_dashboard(business, start_date, end_date)))
+
+        # The best concurrent result is bounded by the slowest single block
+        block_times = {}
+        cache.clear()
+        for name in DASHBOARD_BLOCKS:
+            started = time.perf_counter()
+            compute_dashboard_block(name, business, start_date, end_date)
+            block_times[name] = (time.perf_counter() - started) * 1000
+        slowest = max(block_times, key=block_times.get)
+        self.stdout.write(f"CPUs available: {os.cpu_count()}, dashboard workers: {DASHBOARD_QUERY_WORKERS}")
+        self.stdout.write(
+            f"Slowest block: {slowest} {block_times[slowest]:.1f} ms, "
+            f"sum of blocks {sum(block_times.values()):.1f} ms"
+        )
+
+        for label, durations in (('sync', sync_times), ('async', async_times)):
+            self.stdout.write(
+                f"{label:>5}: median {statistics.median(durations):8.1f} ms  "
+                f"min {min(durations):8.1f} ms  max {max(durations):8.1f} ms"
+            )
+        speedup = statistics.median(sync_times) / statistics.median(async_times)
+        self.stdout.write(self.style.SUCCESS(f"Concurrent speedup: {speedup:.2f}x"))
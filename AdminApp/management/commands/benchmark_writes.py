@@ -0,0 +1,120 @@
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections
+from django.test.utils import override_settings
+from django.utils import timezone
+
+
+# (label, SQLite options, write queue) compared by the benchmark
+VARIANTS = (
+    ('before', {'init_command': 'PRAGMA journal_mode=DELETE; PRAGMA synchronous=FULL', 'transaction_mode': None}, False),
+    ('pragmas', settings.SQLITE_WRITE_QUEUE_OPTIONS, False),
+    ('queue', settings.SQLITE_WRITE_QUEUE_OPTIONS, True),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure throughput and latency of concurrent bill creation with the old SQLite setup, "
+        "with WAL and immediate transactions, and with the write queue, on a throwaway database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent writers (default 8).')
+        parser.add_argument('--bills', type=int, default=50, help='Bills created per writer (default 50).')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stderr.write('The benchmark creates a temporary SQLite database and needs the sqlite3 backend.')
+            return
+
+        directory = tempfile.mkdtemp()
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        original_test_name = test_settings.get('NAME')
+        original_options = dict(connection.settings_dict['OPTIONS'])
+        # A file database, so every writer thread gets its own connection like in production
+        test_settings['NAME'] = os.path.join(directory, 'benchmark.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            business, vehicle_ids = self.seed(options)
+            self.stdout.write(f"CPUs available: {os.cpu_count()}, {options['threads']} writers x {options['bills']} bills")
+            for label, sqlite_options, queued in VARIANTS:
+                # Connections opened from here on use the variant's options
+                connections.close_all()
+                connection.settings_dict['OPTIONS'].update(sqlite_options)
+                with override_settings(SQLITE_WRITE_QUEUE=queued):
+                    self.report(label, self.run_variant(business, vehicle_ids, options))
+        finally:
+            connection.settings_dict['OPTIONS'] = original_options
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            test_settings['NAME'] = original_test_name
+
+    def seed(self, options):
+        from AdminApp.models import Business, Vehicle
+
+        business = Business.objects.create(
+            business_name='Benchmark Transport', business_label='BENCH', mobile_number='9999999999',
+            max_vehicles=options['threads'],
+        )
+        vehicles = Vehicle.objects.bulk_create([
+            Vehicle(business=business, vehicle_number=f'MH12BM{number:04d}')
+            for number in range(options['threads'])
+        ])
+        return business, [vehicle.pk for vehicle in vehicles]
+
+    def run_variant(self, business, vehicle_ids, options):
+        from AdminApp.models import Bill
+
+        latencies, errors = [], []
+        lock = threading.Lock()
+        barrier = threading.Barrier(options['threads'])
+        today = timezone.now().date()
+
+        def write(vehicle_id):
+            own_latencies, own_errors = [], 0
+            try:
+                barrier.wait()
+                for _ in range(options['bills']):
+                    started = time.perf_counter()
+                    try:
+                        Bill.objects.create(
+                            business=business, vehicle_id=vehicle_id, bill_date=today,
+                            from_location='Pune', to_location='Mumbai', rent_amount=1000,
+                        )
+                    except OperationalError:
+                        own_errors += 1
+                        continue
+                    own_latencies.append((time.perf_counter() - started) * 1000)
+            finally:
+                connection.close()
+                with lock:
+                    latencies.extend(own_latencies)
+                    errors.append(own_errors)
+
+        threads = [threading.Thread(target=write, args=(vehicle_id,)) for vehicle_id in vehicle_ids]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return latencies, sum(errors), time.perf_counter() - started
+
+    def report(self, label, result):
+        latencies, errors, elapsed = result
+        if not latencies:
+            self.stdout.write(self.style.ERROR(f"{label:>7}: every write failed ({errors} errors)"))
+            return
+        latencies.sort()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        self.stdout.write(
+            f"{label:>7}: {len(latencies) / elapsed:8.1f} bills/s  "
+            f"p50 {statistics.median(latencies):7.1f} ms  p99 {p99:7.1f} ms  "
+            f"locked errors {errors}"
+        )
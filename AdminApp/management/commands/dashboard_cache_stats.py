@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from AdminApp.dashboard_cache import get_cache_stats, reset_cache_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Show report dashboard cache hit and miss counts. Needs a shared cache backend "
+        "(e.g. file based); with local memory the counts live in each server process "
+        "and are shown on the dashboard to system admins instead."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Reset the counters after showing them.')
+
+    def handle(self, *args, **options):
+        stats = get_cache_stats()
+        self.stdout.write(
+            f"Hits: {stats['hits']}  Misses: {stats['misses']}  Hit rate: {stats['hit_rate']}%"
+        )
+        if options['reset']:
+            reset_cache_stats()
+            self.stdout.write(self.style.SUCCESS('Counters reset.'))
@@ -0,0 +1,61 @@
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN QUERY PLAN for the changelist, filter, search, dashboard and export queries "
+        "on a throwaway database, report full table scans and compare the plans with the snapshot."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--update', action='store_true', help='Write the plans to the snapshot file.')
+        parser.add_argument('--check', action='store_true', help='Fail if any plan differs from the snapshot.')
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan, not only the changes.')
+
+    def handle(self, *args, **options):
+        from AdminApp.query_plans import (
+            SNAPSHOT_PATH, TENANT_TABLES, collect_plans, diff_plans, full_scans, load_snapshot,
+            save_snapshot, seed_plan_data,
+        )
+
+        if connection.vendor != 'sqlite':
+            raise CommandError('The plans are SQLite EXPLAIN QUERY PLAN output and need the sqlite3 backend.')
+
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        original_test_name = test_settings.get('NAME')
+        # A file database built by the migrations, so the plans use the real indexes
+        test_settings['NAME'] = os.path.join(tempfile.mkdtemp(), 'plans.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            plans = collect_plans(seed_plan_data())
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            test_settings['NAME'] = original_test_name
+
+        snapshot = load_snapshot()
+        changed = diff_plans(snapshot, plans)
+        for name, scenario_plans in plans.items():
+            if name not in changed and not options['verbose_plans']:
+                continue
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{name}{' (changed)' if name in changed else ''}"))
+            for plan in scenario_plans:
+                self.stdout.write('\n'.join(f'  {line}' for line in plan))
+                self.stdout.write('')
+
+        for name, table in full_scans(plans):
+            style = self.style.ERROR if table in TENANT_TABLES else self.style.WARNING
+            self.stdout.write(style(f"{name}: full scan of {table}"))
+
+        if options['update']:
+            save_snapshot(plans)
+            self.stdout.write(f"Plans of {len(plans)} scenario(s) written to {SNAPSHOT_PATH.name}")
+        elif options['check'] and changed:
+            raise CommandError(
+                f"{len(changed)} scenario(s) changed plans: {', '.join(changed)}. "
+                "Review them and run with --update."
+            )
+        self.stdout.write(self.style.SUCCESS('Done.'))
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from AdminApp.models import Business
+from AdminApp.dashboard_cache import invalidate_business_dashboards
+from AdminApp.rollups import (
+    DEFAULT_CHUNK_SIZE, rebuild_business_rollups, verify_business_rollups,
+)
+
+
+class Command(BaseCommand):
+    help = "Rebuild or verify BillDailyRollup rows from raw bills, in chunks of bill dates"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--business', type=int, action='append', dest='businesses',
+            help='Business id to process (repeatable). Defaults to all businesses.'
+        )
+        parser.add_argument(
+            '--verify', action='store_true',
+            help='Only compare rollups with raw bills and report mismatching days.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help=f'Number of bill dates aggregated per query (default {DEFAULT_CHUNK_SIZE}).'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        if chunk_size < 1:
+            raise CommandError('--chunk-size must be at least 1.')
+
+        businesses = Business.objects.order_by('pk')
+        if options['businesses']:
+            businesses = businesses.filter(pk__in=options['businesses'])
+
+        total_mismatches = 0
+        for business in businesses:
+            if options['verify']:
+                mismatches = verify_business_rollups(business.pk, chunk_size)
+                total_mismatches += len(mismatches)
+                if mismatches:
+                    self.stdout.write(self.style.WARNING(
+                        f"{business}: {len(mismatches)} day(s) out of sync, "
+                        f"first {mismatches[0]}, last {mismatches[-1]}"
+                    ))
+                else:
+                    self.stdout.write(f"{business}: OK")
+            else:
+                written = rebuild_business_rollups(business.pk, chunk_size)
+                invalidate_business_dashboards([business.pk])
+                self.stdout.write(f"{business}: {written} rollup day(s) rebuilt")
+
+        if options['verify'] and total_mismatches:
+            raise CommandError(f'{total_mismatches} rollup day(s) out of sync. Run without --verify to repair.')
+        self.stdout.write(self.style.SUCCESS('Done.'))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from AdminApp.quotas import reconcile_business_quotas, verify_business_quotas
+
+
+class Command(BaseCommand):
+    help = "Verify or repair the vehicle and staff counters of businesses against the real rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--business', type=int, action='append', dest='businesses',
+            help='Business id to process (repeatable). Defaults to all businesses.'
+        )
+        parser.add_argument(
+            '--verify', action='store_true',
+            help='Only report counters that differ from the real counts.'
+        )
+
+    def handle(self, *args, **options):
+        drift = verify_business_quotas(options['businesses'])
+        for business, counter, stored, actual in drift:
+            self.stdout.write(self.style.WARNING(f"{business}: {counter} is {stored}, should be {actual}"))
+
+        if options['verify']:
+            if drift:
+                raise CommandError(f'{len(drift)} counter(s) out of sync. Run without --verify to repair.')
+        elif drift:
+            reconcile_business_quotas(options['businesses'])
+            self.stdout.write(f"{len(drift)} counter(s) repaired")
+        self.stdout.write(self.style.SUCCESS('Done.'))
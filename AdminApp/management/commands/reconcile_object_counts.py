@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from AdminApp.object_counts import (
+    rebuild_object_counts, rebuild_related_counts, verify_object_counts, verify_related_counts,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Verify or repair the per-business row counts used by admin changelists, and the bill "
+        "and vehicle counts of vehicles, parties, drivers and owners, against the real rows"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--business', type=int, action='append', dest='businesses',
+            help='Business id to process (repeatable). Defaults to all businesses.'
+        )
+        parser.add_argument(
+            '--verify', action='store_true',
+            help='Only report counts that differ from the real counts.'
+        )
+
+    def handle(self, *args, **options):
+        drift = verify_object_counts(options['businesses'])
+        for business_id, model, stored, actual in drift:
+            self.stdout.write(self.style.WARNING(
+                f"{business_id}: {model._meta.verbose_name_plural} is {stored}, should be {actual}"
+            ))
+        related_drift = verify_related_counts(options['businesses'])
+        for business_id, obj, counter, stored, actual in related_drift:
+            self.stdout.write(self.style.WARNING(
+                f"{business_id}: {counter} of {obj._meta.verbose_name} {obj.pk} is {stored}, should be {actual}"
+            ))
+
+        total = len(drift) + len(related_drift)
+        if options['verify']:
+            if total:
+                raise CommandError(f'{total} count(s) out of sync. Run without --verify to repair.')
+        elif total:
+            if drift:
+                rebuild_object_counts(options['businesses'])
+            if related_drift:
+                rebuild_related_counts(options['businesses'])
+            self.stdout.write(f"{total} count(s) repaired")
+        self.stdout.write(self.style.SUCCESS('Done.'))
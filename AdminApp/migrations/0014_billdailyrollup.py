@@ -0,0 +1,66 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def backfill_rollups(apps, schema_editor):
+    Bill = apps.get_model('AdminApp', 'Bill')
+    BillDailyRollup = apps.get_model('AdminApp', 'BillDailyRollup')
+    amount_fields = (
+        'rent_amount', 'advance_amount', 'pending_amount',
+        'commission_charge', 'commission_received', 'commission_pending',
+    )
+    daily = Bill.objects.order_by().values('business_id', 'bill_date').annotate(
+        bill_count=Count('id'),
+        paid_count=Count('id', filter=Q(pending_amount=0)),
+        partial_count=Count('id', filter=Q(advance_amount__gt=0, pending_amount__gt=0)),
+        pending_count=Count('id', filter=Q(advance_amount=0, pending_amount__gt=0)),
+        **{field: Sum(field, default=0) for field in amount_fields}
+    )
+    BillDailyRollup.objects.bulk_create(
+        [BillDailyRollup(**values) for values in daily],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AdminApp', '0013_delete_adminlink'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='business',
+            name='max_vehicles',
+            field=models.IntegerField(default=10),
+        ),
+        migrations.CreateModel(
+            name='BillDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bill_date', models.DateField()),
+                ('bill_count', models.IntegerField(default=0)),
+                ('rent_amount', models.DecimalField(decimal_places=0, default=0, max_digits=14)),
+                ('advance_amount', models.DecimalField(decimal_places=0, default=0, max_digits=14)),
+                ('pending_amount', models.DecimalField(decimal_places=0, default=0, max_digits=14)),
+                ('commission_charge', models.DecimalField(decimal_places=0, default=0, max_digits=14)),
+                ('commission_received', models.DecimalField(decimal_places=0, default=0, max_digits=14)),
+                ('commission_pending', models.DecimalField(decimal_places=0, default=0, max_digits=14)),
+                ('paid_count', models.IntegerField(default=0)),
+                ('partial_count', models.IntegerField(default=0)),
+                ('pending_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bill_rollups', to='AdminApp.business')),
+            ],
+            options={
+                'verbose_name': 'Bill Daily Rollup',
+                'verbose_name_plural': 'Bill Daily Rollups',
+                'ordering': ['business', 'bill_date'],
+                'constraints': [models.UniqueConstraint(fields=('business', 'bill_date'), name='unique_bill_rollup_business_date')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
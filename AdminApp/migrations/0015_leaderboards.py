@@ -0,0 +1,53 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AdminApp', '0014_billdailyrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardWindow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(choices=[('this_month', 'This Month'), ('last_30_days', 'Last 30 Days'), ('this_year', 'This Year')], max_length=20)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('built_at', models.DateTimeField(auto_now=True)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_windows', to='AdminApp.business')),
+            ],
+            options={
+                'verbose_name': 'Leaderboard Window',
+                'verbose_name_plural': 'Leaderboard Windows',
+            },
+        ),
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('vehicle', 'Vehicle'), ('party', 'Party')], max_length=10)),
+                ('bill_count', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=0, default=0, max_digits=14)),
+                ('party', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='AdminApp.party')),
+                ('vehicle', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='AdminApp.vehicle')),
+                ('window', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='AdminApp.leaderboardwindow')),
+            ],
+            options={
+                'verbose_name': 'Leaderboard Entry',
+                'verbose_name_plural': 'Leaderboard Entries',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardwindow',
+            constraint=models.UniqueConstraint(fields=('business', 'name'), name='unique_leaderboard_window_business_name'),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['window', 'kind', '-revenue'], name='leaderboard_window_rank_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:48
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AdminApp', '0015_leaderboards'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(choices=[('add', 'Added'), ('change', 'Changed'), ('delete', 'Deleted'), ('bulk', 'Bulk Action')], max_length=10)),
+                ('object_id', models.CharField(blank=True, max_length=50, null=True)),
+                ('object_repr', models.CharField(blank=True, max_length=200)),
+                ('object_count', models.IntegerField(default=1)),
+                ('message', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity_entries', to='AdminApp.business')),
+                ('content_type', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='contenttypes.contenttype')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Activity Entry',
+                'verbose_name_plural': 'Activity Entries',
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['business', '-created_at', '-id'], name='activity_business_feed_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AdminApp', '0016_activityentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BillSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('financial_year', models.IntegerField(default=0)),
+                ('last_number', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Bill Sequence',
+                'verbose_name_plural': 'Bill Sequences',
+            },
+        ),
+        migrations.AlterField(
+            model_name='bill',
+            name='bill_number',
+            field=models.CharField(db_index=True, editable=False, max_length=20),
+        ),
+        migrations.AddConstraint(
+            model_name='bill',
+            constraint=models.UniqueConstraint(fields=('business', 'bill_number'), name='unique_bill_number_per_business'),
+        ),
+        migrations.AddField(
+            model_name='billsequence',
+            name='business',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bill_sequences', to='AdminApp.business'),
+        ),
+        migrations.AddConstraint(
+            model_name='billsequence',
+            constraint=models.UniqueConstraint(fields=('business', 'financial_year'), name='unique_bill_sequence_business_year'),
+        ),
+    ]
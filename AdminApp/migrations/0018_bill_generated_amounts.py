@@ -0,0 +1,43 @@
+# Generated by Django 5.2.8 on 2026-10-17 21:40
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AdminApp', '0017_billsequence'),
+    ]
+
+    # A column cannot be altered into a generated one, so the computed amounts
+    # are dropped and added back; the database fills them for existing rows
+    operations = [
+        migrations.RemoveField(
+            model_name='bill',
+            name='pending_amount',
+        ),
+        migrations.RemoveField(
+            model_name='bill',
+            name='commission_pending',
+        ),
+        migrations.AddField(
+            model_name='bill',
+            name='pending_amount',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(models.F('rent_amount'), '-', models.F('advance_amount')), output_field=models.DecimalField(decimal_places=0, max_digits=10), verbose_name='Pending Amount'),
+        ),
+        migrations.AddField(
+            model_name='bill',
+            name='commission_pending',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(models.Q(('commission_charge__isnull', True), ('commission_charge', 0), _connector='OR'), then=models.Value(0)), default=django.db.models.expressions.CombinedExpression(models.F('commission_charge'), '-', django.db.models.functions.comparison.Coalesce(models.F('commission_received'), models.Value(0))), output_field=models.DecimalField(decimal_places=0, max_digits=10)), output_field=models.DecimalField(decimal_places=0, max_digits=10), verbose_name='Commission Pending'),
+        ),
+        migrations.AddIndex(
+            model_name='bill',
+            index=models.Index(fields=['business', 'pending_amount'], name='bill_business_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bill',
+            index=models.Index(fields=['business', 'commission_pending'], name='bill_business_comm_pending_idx'),
+        ),
+    ]
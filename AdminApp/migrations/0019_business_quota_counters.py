@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-17 22:05
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Business = apps.get_model('AdminApp', 'Business')
+    Vehicle = apps.get_model('AdminApp', 'Vehicle')
+    CustomUser = apps.get_model('AdminApp', 'CustomUser')
+
+    def count(model, **filters):
+        counts = (
+            model.objects.filter(business=OuterRef('pk'), **filters)
+            .order_by().values('business').annotate(count=Count('pk')).values('count')
+        )
+        return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+    Business.objects.update(
+        vehicle_count=count(Vehicle),
+        staff_count=count(CustomUser, role='staff', is_active_staff=True, is_superuser=False),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AdminApp', '0018_bill_generated_amounts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='business',
+            name='staff_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='business',
+            name='vehicle_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
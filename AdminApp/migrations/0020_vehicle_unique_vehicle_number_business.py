@@ -0,0 +1,52 @@
+# Generated by Django 5.2.8 on 2026-10-17 22:30
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def numbered_duplicate(number, suffix, max_length):
+    """number with DUP<suffix> appended, cut short so that both fit in max_length"""
+    tail = f"DUP{suffix}"
+    return f"{number[:max_length - len(tail)]}{tail}"
+
+
+def rename_duplicate_vehicle_numbers(apps, schema_editor):
+    """Suffix repeated numbers within a business with DUP2, DUP3... so the constraint can be added
+
+    Every vehicle and its bills are kept; the renamed ones are easy to find and merge by hand.
+    """
+    Vehicle = apps.get_model('AdminApp', 'Vehicle')
+    duplicates = (
+        Vehicle.objects.order_by().values('business_id', 'vehicle_number')
+        .annotate(count=Count('pk')).filter(count__gt=1)
+    )
+    for duplicate in duplicates:
+        vehicles = Vehicle.objects.filter(
+            business_id=duplicate['business_id'], vehicle_number=duplicate['vehicle_number']
+        ).order_by('pk')
+        taken = set(
+            Vehicle.objects.filter(business_id=duplicate['business_id']).values_list('vehicle_number', flat=True)
+        )
+        max_length = Vehicle._meta.get_field('vehicle_number').max_length
+        suffix = 2
+        for vehicle in list(vehicles)[1:]:
+            while numbered_duplicate(duplicate['vehicle_number'], suffix, max_length) in taken:
+                suffix += 1
+            vehicle.vehicle_number = numbered_duplicate(duplicate['vehicle_number'], suffix, max_length)
+            taken.add(vehicle.vehicle_number)
+            Vehicle.objects.filter(pk=vehicle.pk).update(vehicle_number=vehicle.vehicle_number)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AdminApp', '0019_business_quota_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_duplicate_vehicle_numbers, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='vehicle',
+            constraint=models.UniqueConstraint(fields=('business', 'vehicle_number'), name='unique_vehicle_number_business'),
+        ),
+    ]
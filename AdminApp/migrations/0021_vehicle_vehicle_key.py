@@ -0,0 +1,59 @@
+# Generated by Django 5.2.8 on 2026-10-17 22:55
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def numbered_duplicate(key, suffix, max_length):
+    """key with DUP<suffix> appended, cut short so that both fit in max_length"""
+    tail = f"DUP{suffix}"
+    return f"{key[:max_length - len(tail)]}{tail}"
+
+
+def rename_duplicate_vehicle_keys(apps, schema_editor):
+    """Suffix numbers that only differ by case or separators with DUP2, DUP3..., like 0020 did"""
+    Vehicle = apps.get_model('AdminApp', 'Vehicle')
+    duplicates = (
+        Vehicle.objects.order_by().values('business_id', 'vehicle_key')
+        .annotate(count=Count('pk')).filter(count__gt=1)
+    )
+    for duplicate in duplicates:
+        taken = set(
+            Vehicle.objects.filter(business_id=duplicate['business_id']).values_list('vehicle_key', flat=True)
+        )
+        vehicles = Vehicle.objects.filter(
+            business_id=duplicate['business_id'], vehicle_key=duplicate['vehicle_key']
+        ).order_by('pk')
+        max_length = Vehicle._meta.get_field('vehicle_number').max_length
+        suffix = 2
+        for vehicle in list(vehicles)[1:]:
+            while numbered_duplicate(duplicate['vehicle_key'], suffix, max_length) in taken:
+                suffix += 1
+            number = numbered_duplicate(duplicate['vehicle_key'], suffix, max_length)
+            taken.add(number)
+            Vehicle.objects.filter(pk=vehicle.pk).update(vehicle_number=number)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AdminApp', '0020_vehicle_unique_vehicle_number_business'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='vehicle',
+            name='unique_vehicle_number_business',
+        ),
+        migrations.AddField(
+            model_name='vehicle',
+            name='vehicle_key',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(django.db.models.functions.text.Upper('vehicle_number'), models.Value(' '), models.Value('')), models.Value('-'), models.Value('')), models.Value('.'), models.Value('')), models.Value('/'), models.Value('')), output_field=models.CharField(max_length=20)),
+        ),
+        migrations.RunPython(rename_duplicate_vehicle_keys, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='vehicle',
+            constraint=models.UniqueConstraint(fields=('business', 'vehicle_key'), name='unique_vehicle_key_business'),
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.8 on 2026-10-17 21:30
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import DecimalField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_party_balances(apps, schema_editor):
+    Party = apps.get_model('AdminApp', 'Party')
+    Bill = apps.get_model('AdminApp', 'Bill')
+    pending = (
+        Bill.objects.filter(party=OuterRef('pk'))
+        .order_by().values('party').annotate(total=Sum('pending_amount')).values('total')
+    )
+    output_field = DecimalField(max_digits=14, decimal_places=0)
+    Party.objects.update(
+        outstanding_amount=Coalesce(Subquery(pending, output_field=output_field), Value(0), output_field=output_field)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AdminApp', '0021_vehicle_vehicle_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BillPayment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('rent', 'Rent'), ('commission', 'Commission')], default='rent', max_length=10)),
+                ('amount', models.DecimalField(decimal_places=0, max_digits=10)),
+                ('paid_on', models.DateField(default=django.utils.timezone.localdate)),
+                ('notes', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Bill Payment',
+                'verbose_name_plural': 'Bill Payments',
+                'ordering': ['-paid_on', '-id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='party',
+            name='outstanding_amount',
+            field=models.DecimalField(decimal_places=0, default=0, editable=False, max_digits=14, verbose_name='Outstanding Amount'),
+        ),
+        migrations.AddIndex(
+            model_name='party',
+            index=models.Index(fields=['business', '-outstanding_amount'], name='party_business_outstanding_idx'),
+        ),
+        migrations.AddField(
+            model_name='billpayment',
+            name='bill',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='AdminApp.bill'),
+        ),
+        migrations.AddField(
+            model_name='billpayment',
+            name='business',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bill_payments', to='AdminApp.business'),
+        ),
+        migrations.AddField(
+            model_name='billpayment',
+            name='received_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='billpayment',
+            index=models.Index(fields=['bill', 'kind'], name='bill_payment_bill_kind_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='billpayment',
+            index=models.Index(fields=['business', '-paid_on'], name='bill_payment_business_day_idx'),
+        ),
+        migrations.RunPython(backfill_party_balances, migrations.RunPython.noop),
+    ]
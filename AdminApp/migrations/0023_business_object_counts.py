@@ -0,0 +1,49 @@
+# Generated by Django 5.2.8 on 2026-10-17 21:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+COUNTED_MODELS = ('bill', 'vehicle', 'party', 'driver', 'vehicleowner')
+
+
+def backfill_object_counts(apps, schema_editor):
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    BusinessObjectCount = apps.get_model('AdminApp', 'BusinessObjectCount')
+    for model_name in COUNTED_MODELS:
+        model = apps.get_model('AdminApp', model_name)
+        counts = model.objects.order_by().values_list('business').annotate(count=Count('pk'))
+        if not counts:
+            continue
+        content_type, created = ContentType.objects.get_or_create(app_label='AdminApp', model=model_name)
+        BusinessObjectCount.objects.bulk_create([
+            BusinessObjectCount(business_id=business_id, content_type=content_type, count=count)
+            for business_id, count in counts
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AdminApp', '0022_bill_payments'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BusinessObjectCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.IntegerField(default=0)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='object_counts', to='AdminApp.business')),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.contenttype')),
+            ],
+            options={
+                'verbose_name': 'Business Object Count',
+                'verbose_name_plural': 'Business Object Counts',
+                'constraints': [models.UniqueConstraint(fields=('business', 'content_type'), name='unique_object_count_business_type')],
+            },
+        ),
+        migrations.RunPython(backfill_object_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-17 21:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AdminApp', '0023_business_object_counts'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bill',
+            index=models.Index(fields=['business', '-bill_date', '-id'], name='bill_business_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bill',
+            index=models.Index(fields=['-bill_date', '-id'], name='bill_date_id_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.8 on 2026-10-17 21:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AdminApp', '0024_bill_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bill',
+            index=models.Index(fields=['business', 'party', '-bill_date', '-id'], name='bill_business_party_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bill',
+            index=models.Index(fields=['business', 'vehicle', '-bill_date', '-id'], name='bill_business_vehicle_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bill',
+            index=models.Index(fields=['business', 'driver', '-bill_date', '-id'], name='bill_business_driver_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='driver',
+            index=models.Index(fields=['business', 'driver_name'], name='driver_business_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='driver',
+            index=models.Index(fields=['business', '-created_at'], name='driver_business_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='party',
+            index=models.Index(fields=['business', 'name'], name='party_business_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='party',
+            index=models.Index(fields=['business', '-created_at'], name='party_business_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['business', 'owner'], name='vehicle_business_owner_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['business', '-created_at'], name='vehicle_business_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicleowner',
+            index=models.Index(fields=['business', '-created_at'], name='owner_business_created_idx'),
+        ),
+    ]
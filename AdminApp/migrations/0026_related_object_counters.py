@@ -0,0 +1,54 @@
+# Generated by Django 5.2.8 on 2026-10-17 21:55
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+# (counted model, foreign key, counter model, counter)
+RELATED_COUNTERS = (
+    ('bill', 'vehicle', 'vehicle', 'bill_count'),
+    ('bill', 'party', 'party', 'bill_count'),
+    ('bill', 'driver', 'driver', 'bill_count'),
+    ('vehicle', 'owner', 'vehicleowner', 'vehicle_count'),
+)
+
+
+def backfill_related_counts(apps, schema_editor):
+    for model_name, field, target_name, counter in RELATED_COUNTERS:
+        rows = apps.get_model('AdminApp', model_name).objects.filter(**{field: OuterRef('pk')}).order_by()
+        actual = rows.values(field).annotate(count=Count('pk')).values('count')
+        apps.get_model('AdminApp', target_name).objects.update(
+            **{counter: Coalesce(Subquery(actual, output_field=IntegerField()), 0)}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AdminApp', '0025_tenant_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='driver',
+            name='bill_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Bills'),
+        ),
+        migrations.AddField(
+            model_name='party',
+            name='bill_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Bills'),
+        ),
+        migrations.AddField(
+            model_name='vehicle',
+            name='bill_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Bills'),
+        ),
+        migrations.AddField(
+            model_name='vehicleowner',
+            name='vehicle_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Vehicles'),
+        ),
+        migrations.RunPython(backfill_related_counts, migrations.RunPython.noop),
+    ]
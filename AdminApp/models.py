@@ -1,7 +1,13 @@
-from django.db import models
+from django.conf import settings
+from django.db import IntegrityError, OperationalError, models, router, transaction
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Coalesce, Replace, Upper
 from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
 from django.utils.html import format_html
+from django.utils import timezone
+from .write_queue import serialize_writes
+import copy
 import os
 import re
 
@@ -66,15 +72,205 @@ class StaffPermissionMixin:
     
 
 
+class ChangeTrackingMixin:
+    """Remembers the field values an instance was loaded or last saved with
+
+    Validation can ask has_changed() before running queries, and save() of an
+    existing row only writes the columns that differ (plus auto_now fields).
+    Passing update_fields explicitly turns the automatic selection off.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_values(field_names)
+        return instance
+
+    def _remember_values(self, attnames=None):
+        loaded = getattr(self, '_loaded_values', None) or {}
+        for field in self._meta.concrete_fields:
+            if attnames is not None and field.attname not in attnames:
+                continue
+            if field.attname not in self.__dict__:
+                # Deferred, unknown until it is loaded
+                continue
+            value = self.__dict__[field.attname]
+            # Mutable values (JSONField) could be edited in place
+            loaded[field.attname] = copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+        self._loaded_values = loaded
+
+    def get_changed_fields(self):
+        """Names of the concrete fields that differ from the loaded values"""
+        loaded = getattr(self, '_loaded_values', None)
+        if self._state.adding or loaded is None:
+            return {field.name for field in self._meta.concrete_fields}
+        changed = set()
+        for field in self._meta.concrete_fields:
+            if field.attname not in self.__dict__:
+                continue
+            if field.attname not in loaded or loaded[field.attname] != self.__dict__[field.attname]:
+                changed.add(field.name)
+        return changed
+
+    def has_changed(self, *field_names):
+        """True for new instances, or when any of the fields was modified"""
+        changed = self.get_changed_fields()
+        return any(name in changed for name in field_names)
+
+    def loaded_value(self, attname, default=None):
+        """Value a field had when the instance was loaded or last saved"""
+        return (getattr(self, '_loaded_values', None) or {}).get(attname, default)
+
+    def save(self, *args, **kwargs):
+        if (not self._state.adding and not args and kwargs.get('update_fields') is None
+                and not kwargs.get('force_insert') and getattr(self, '_loaded_values', None) is not None):
+            changed = self.get_changed_fields() - {self._meta.pk.name} - {
+                field.name for field in self._meta.concrete_fields if field.generated
+            }
+            if changed:
+                changed |= {
+                    field.name for field in self._meta.concrete_fields
+                    if getattr(field, 'auto_now', False)
+                }
+            # An empty list makes Django skip the save entirely
+            kwargs['update_fields'] = changed
+        super().save(*args, **kwargs)
+        loaded = getattr(self, '_loaded_values', None) or {}
+        for field in self._meta.concrete_fields:
+            if field.generated:
+                # Computed by the database from what was just written, reload on next access
+                self.__dict__.pop(field.attname, None)
+                loaded.pop(field.attname, None)
+        self._remember_values()
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        # Only the reloaded fields, others may hold unsaved edits
+        self._remember_values({self._meta.get_field(name).attname for name in fields} if fields else None)
+
+
+class UniqueConstraintMixin:
+    """Leaves uniqueness checks to the database's unique constraints
+
+    full_clean() and model forms skip the exists() query each unique
+    constraint would cost. save() instead turns the IntegrityError of a
+    violated constraint into a ValidationError carrying the field errors
+    from unique_error_messages(), so the common write path runs no
+    pre-check queries and two concurrent saves cannot both pass.
+    Needs ChangeTrackingMixin to know which columns a save writes.
+    """
+
+    def unique_error_messages(self):
+        """{constraint field names: {field: message}} for the model's unique constraints"""
+        return {}
+
+    def validate_unique(self, exclude=None):
+        pass
+
+    def validate_constraints(self, exclude=None):
+        pass
+
+    @classmethod
+    def written_fields(cls, field_name):
+        """A field, or for a generated field the fields it is computed from"""
+        field = cls._meta.get_field(field_name)
+        if not field.generated:
+            return {field_name}
+        return {node.name for node in field.expression.flatten() if isinstance(node, F)}
+
+    @classmethod
+    def unique_constraint_fields(cls):
+        """(name, field names) of every unique constraint, unique_together and unique field"""
+        opts = cls._meta
+        constraints = [
+            (constraint.name, tuple(constraint.fields)) for constraint in opts.constraints
+            if isinstance(constraint, models.UniqueConstraint) and constraint.fields
+        ]
+        constraints += [(None, tuple(fields)) for fields in opts.unique_together]
+        constraints += [(None, (field.name,)) for field in opts.local_fields if field.unique and not field.primary_key]
+        return constraints
+
+    def violated_unique_fields(self, error):
+        """Field names of the unique constraint an IntegrityError is about, or None"""
+        message = str(error)
+        constraints = self.unique_constraint_fields()
+        for name, fields in constraints:
+            if name and re.search(rf'\b{re.escape(name)}\b', message):
+                return fields
+        # SQLite only names the columns: "UNIQUE constraint failed: table.a, table.b"
+        match = re.search(r'UNIQUE constraint failed: (.+)', message)
+        if match:
+            columns = {column.strip().split('.')[-1] for column in match.group(1).split(',')}
+            for name, fields in constraints:
+                if {self._meta.get_field(field).column for field in fields} == columns:
+                    return fields
+        return None
+
+    def unique_error(self, error):
+        """The ValidationError a violated unique constraint stands for, or None"""
+        fields = self.violated_unique_fields(error)
+        if fields is None:
+            return None
+        messages = self.unique_error_messages().get(fields)
+        if messages:
+            return ValidationError(messages)
+        # Django's "... with this ... already exists." message
+        return ValidationError({fields[-1]: self.unique_error_message(type(self), fields)})
+
+    def save(self, *args, **kwargs):
+        constrained = {
+            written for name, fields in self.unique_constraint_fields()
+            for field in fields for written in self.written_fields(field)
+        }
+        if not self.has_changed(*constrained):
+            # Nothing a constraint covers is written, no violation possible
+            super().save(*args, **kwargs)
+            return
+
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        try:
+            if transaction.get_connection(using).in_atomic_block:
+                # Keep the surrounding transaction usable after the error
+                with transaction.atomic(using=using):
+                    super().save(*args, **kwargs)
+            else:
+                super().save(*args, **kwargs)
+        except IntegrityError as error:
+            validation_error = self.unique_error(error)
+            if validation_error is None:
+                raise
+            raise validation_error from error
+
+
 def validate_mobile_number(value):
     """Validate that mobile number contains exactly 10 digits"""
     if value and (len(value) != 10 or not value.isdigit()):
         raise ValidationError('Mobile number must be exactly 10 digits.')
 
+# Separators people type inside vehicle numbers, ignored by Vehicle.vehicle_key
+VEHICLE_NUMBER_SEPARATORS = ' -./'
+
+
+def normalize_vehicle_number(value):
+    """Lookup key of a vehicle number: "MH 12-ab 1234" -> "MH12AB1234"""
+    value = (value or '').upper()
+    for separator in VEHICLE_NUMBER_SEPARATORS:
+        value = value.replace(separator, '')
+    return value
+
+
+def vehicle_key_expression():
+    """normalize_vehicle_number() of Vehicle.vehicle_number, computed by the database"""
+    expression = Upper('vehicle_number')
+    for separator in VEHICLE_NUMBER_SEPARATORS:
+        expression = Replace(expression, Value(separator), Value(''))
+    return expression
+
+
 def validate_vehicle_number(value):
     """Basic validation for Indian vehicle numbers"""
     if value:
-        value = value.upper().replace(' ', '')
+        value = normalize_vehicle_number(value)
         # Basic pattern for Indian vehicle numbers: XX99XX9999 or similar
         if len(value) < 8:
             raise ValidationError('Vehicle number seems too short.')
@@ -84,7 +280,7 @@ def validate_vehicle_number(value):
 
 
 
-class Business(models.Model):
+class Business(ChangeTrackingMixin, models.Model):
     BUSINESS_STATUS = [
         ('active', 'Active'),
         ('suspended', 'Suspended'),
@@ -103,6 +299,11 @@ class Business(models.Model):
     status = models.CharField(max_length=20, choices=BUSINESS_STATUS, default='active')
     max_staff_users = models.IntegerField(default=5)  # Simple user limit
     max_vehicles = models.IntegerField(default=10)    # Simple vehicle limit
+
+    # Slots in use, kept by Vehicle and CustomUser saves and deletes
+    # (reconcile_business_quotas repairs them)
+    vehicle_count = models.IntegerField(default=0, editable=False)
+    staff_count = models.IntegerField(default=0, editable=False)
     
     # Business photos
     business_logo = models.ImageField(upload_to='business_logos/', null=True, blank=True)
@@ -111,24 +312,57 @@ class Business(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Counter field and limit field of each quota
+    QUOTAS = {
+        'vehicle': ('vehicle_count', 'max_vehicles'),
+        'staff': ('staff_count', 'max_staff_users'),
+    }
+
     class Meta:
         verbose_name_plural = "Businesses"
 
     def __str__(self):
         return self.business_name
 
+    @classmethod
+    def reserve_quota(cls, business_id, quota):
+        """Take one vehicle or staff slot of a business, False when its limit is reached
+
+        The check and the increment are a single conditional UPDATE, so two
+        concurrent adds can never both get the last slot.
+        """
+        counter, limit = cls.QUOTAS[quota]
+        return bool(
+            cls.objects.filter(pk=business_id, **{f'{counter}__lt': F(limit)})
+            .update(**{counter: F(counter) + 1})
+        )
+
+    @classmethod
+    def release_quota(cls, business_id, quota):
+        """Give back a slot taken with reserve_quota"""
+        counter, limit = cls.QUOTAS[quota]
+        cls.objects.filter(pk=business_id, **{f'{counter}__gt': 0}).update(**{counter: F(counter) - 1})
+
     @property
     def display_name(self):
         return f"{self.business_name} - {self.mobile_number}"
 
     @property
     def total_staff_users(self):
-        """Count active staff users for this business"""
-        return self.customuser_set.filter(role='staff', is_active_staff=True).count()
+        """Active staff users of this business"""
+        return self.staff_count
 
     @property
     def total_vehicles(self):
-        """Count vehicles for this business"""
+        """Vehicles of this business"""
+        return self.vehicle_count
+
+    def count_staff_users(self):
+        """Count active staff users in the database, what staff_count should be"""
+        return self.customuser_set.filter(role='staff', is_active_staff=True, is_superuser=False).count()
+
+    def count_vehicles(self):
+        """Count vehicles in the database, what vehicle_count should be"""
         return self.vehicle_set.count()
 
     @property
@@ -152,7 +386,8 @@ class Business(models.Model):
         """Get the business owner user"""
         return self.customuser_set.filter(role='business_owner').first()
     
-class VehicleOwner(models.Model, RoleBasedAccessMixin):   
+@serialize_writes
+class VehicleOwner(UniqueConstraintMixin, ChangeTrackingMixin, models.Model, RoleBasedAccessMixin):   
     business = models.ForeignKey(Business, on_delete=models.CASCADE)
     owner_name = models.CharField(max_length=255, unique=False)
     owner_mobile_number = models.CharField(max_length=10, validators=[validate_mobile_number])
@@ -163,6 +398,9 @@ class VehicleOwner(models.Model, RoleBasedAccessMixin):
     document2 = models.FileField(upload_to='vehicle_owner_documents/other_documents/', null=True, blank=True)
     owner_photo = models.ImageField(upload_to='vehicle_owner_photos/', null=True, blank=True, verbose_name="Owner Photo")
 
+    # Number of vehicles pointing here, kept current by AdminApp.object_counts
+    vehicle_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Vehicles")
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -186,43 +424,42 @@ class VehicleOwner(models.Model, RoleBasedAccessMixin):
     @property
     def total_vehicles(self):
         """Count of vehicles owned by this owner"""
-        return self.vehicle_set.count()
+        return self.vehicle_count
     
     total_vehicles.fget.short_description = 'Total Vehicles'
 
-    def clean(self):
-        """Enhanced validation that prevents duplicate name + mobile in same business"""
-        super().clean()  # Call parent clean first
-        
-        # Only run validation if we have name, mobile, and business
-        if self.owner_name and self.owner_mobile_number and self.business_id:
-            queryset = VehicleOwner.objects.filter(
-                business_id=self.business_id,
-                owner_name=self.owner_name,
-                owner_mobile_number=self.owner_mobile_number
-            )
-            
-            # Exclude current instance when editing
-            if self.pk:
-                queryset = queryset.exclude(pk=self.pk)
-            
-            if queryset.exists():
-                raise ValidationError({
-                    'owner_mobile_number': 'An owner with this name and mobile number already exists in your business.',
-                    'owner_name': 'An owner with this name and mobile number already exists in your business.'
-                })
+    def unique_error_messages(self):
+        """Duplicate name + mobile in the same business"""
+        duplicate = f'An owner with name "{self.owner_name}" and mobile number {self.owner_mobile_number} already exists in your business.'
+        return {
+            ('business', 'owner_name', 'owner_mobile_number'): {
+                'owner_mobile_number': duplicate,
+                'owner_name': duplicate,
+            },
+        }
 
     objects = BusinessManager()
     
     class Meta:
         unique_together = ['business', 'owner_name', 'owner_mobile_number']
+        indexes = [
+            # Date hierarchy and created filter of the owner list
+            models.Index(fields=['business', '-created_at'], name='owner_business_created_idx'),
+        ]
 
 
 
-class Vehicle(models.Model, RoleBasedAccessMixin): 
+@serialize_writes
+class Vehicle(UniqueConstraintMixin, ChangeTrackingMixin, models.Model, RoleBasedAccessMixin): 
     owner = models.ForeignKey(VehicleOwner, on_delete=models.CASCADE, null=True, blank=True) 
     business = models.ForeignKey(Business, on_delete=models.CASCADE)
     vehicle_number = models.CharField(max_length=20, unique=False)
+    # Normalized number for exact and prefix lookups, see AdminApp.vehicle_lookup
+    vehicle_key = models.GeneratedField(
+        expression=vehicle_key_expression(),
+        output_field=models.CharField(max_length=20),
+        db_persist=True,
+    )
     vehicle_name = models.CharField(max_length=100, null=True, blank=True)
     model_name = models.CharField(max_length=255, null=True, blank=True) 
     notes = models.TextField(null=True, blank=True)
@@ -231,6 +468,9 @@ class Vehicle(models.Model, RoleBasedAccessMixin):
     vehicle_photo1 = models.ImageField(upload_to='vehicle_photos/', null=True, blank=True, verbose_name="Vehicle Photo 1")
     vehicle_photo2 = models.ImageField(upload_to='vehicle_photos/', null=True, blank=True, verbose_name="Vehicle Photo 2")
 
+    # Number of bills pointing here, kept current by AdminApp.object_counts
+    bill_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Bills")
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     objects = BusinessManager()
@@ -257,7 +497,7 @@ class Vehicle(models.Model, RoleBasedAccessMixin):
     @property
     def total_bills(self):
         """Count of bills for this vehicle"""
-        return self.bills.count()
+        return self.bill_count
     
     total_bills.fget.short_description = 'Total Bills'
 
@@ -277,8 +517,9 @@ class Vehicle(models.Model, RoleBasedAccessMixin):
         # Validate and format vehicle number
         self._validate_vehicle_number()
         
-        # Validate owner-business consistency
-        self._validate_owner_business_consistency()
+        # Validate owner-business consistency, it loads the owner and both businesses
+        if self.has_changed('owner', 'business'):
+            self._validate_owner_business_consistency()
          
 
     def _validate_vehicle_number(self):
@@ -304,6 +545,19 @@ class Vehicle(models.Model, RoleBasedAccessMixin):
                     'vehicle_number': 'Vehicle number should contain at least one letter.'
                 })
 
+    def unique_error_messages(self):
+        """Duplicate vehicle number in the same business"""
+        # Only runs after a failed save, the lookup is not on the common path
+        existing = Vehicle.objects.filter(
+            business_id=self.business_id, vehicle_key=normalize_vehicle_number(self.vehicle_number)
+        ).select_related('owner').first()
+        owner_info = f" (Owner: {existing.owner.owner_name})" if existing and existing.owner else ""
+        return {
+            ('business', 'vehicle_key'): {
+                'vehicle_number': f'Vehicle number "{self.vehicle_number}" is already registered in your business{owner_info}.'
+            },
+        }
+
     def _validate_owner_business_consistency(self):
         """Validate owner belongs to the same business as vehicle"""
         if self.owner and self.business_id:
@@ -341,24 +595,45 @@ class Vehicle(models.Model, RoleBasedAccessMixin):
         
         # Ensure vehicle number is properly formatted
         if self.vehicle_number:
-            self.vehicle_number = self.vehicle_number.upper().replace(' ', '')
+            self.vehicle_number = normalize_vehicle_number(self.vehicle_number)
         
-        # Run full validation (including limit checks)
+        # Run full validation
         self.clean()
-        
-        super().save(*args, **kwargs)
+
+        # A new vehicle, or one moved to another business, takes a slot there
+        takes_quota = self.business_id and (self._state.adding or self.has_changed('business'))
+        if not (takes_quota or self.has_changed('owner')):
+            super().save(*args, **kwargs)
+            return
+
+        # The owners' vehicle counts are updated by the post_save signal in the same transaction
+        with transaction.atomic():
+            if takes_quota:
+                if not Business.reserve_quota(self.business_id, 'vehicle'):
+                    raise ValidationError({
+                        'vehicle_number': f'Cannot add more vehicles. Maximum limit of '
+                                          f'{self.business.max_vehicles} reached for your business.'
+                    })
+                if not self._state.adding and self.loaded_value('business_id'):
+                    Business.release_quota(self.loaded_value('business_id'), 'vehicle')
+            super().save(*args, **kwargs)
 
     class Meta:
-        # REMOVE the database constraint - we handle uniqueness in form
-        # constraints = [
-        #     models.UniqueConstraint(
-        #         fields=['business', 'vehicle_number'],
-        #         name='unique_vehicle_number_business'
-        #     ),
-        # ]
-        pass
+        constraints = [
+            # Also the index of vehicle lookups: "MH12 AB1234" and "mh12-ab-1234" are the same vehicle
+            models.UniqueConstraint(
+                fields=['business', 'vehicle_key'],
+                name='unique_vehicle_key_business'
+            ),
+        ]
+        indexes = [
+            # Vehicles of an owner, and the date hierarchy of the vehicle list
+            models.Index(fields=['business', 'owner'], name='vehicle_business_owner_idx'),
+            models.Index(fields=['business', '-created_at'], name='vehicle_business_created_idx'),
+        ]
 
-class Party(models.Model):
+@serialize_writes
+class Party(UniqueConstraintMixin, ChangeTrackingMixin, models.Model):
     business = models.ForeignKey(Business, on_delete=models.CASCADE) 
     name = models.CharField(max_length=255)
     gst_no = models.CharField(max_length=15, unique=True, null=True, blank=True, verbose_name="GST Number")
@@ -369,6 +644,13 @@ class Party(models.Model):
     mobile = models.CharField(max_length=10, null=True, blank=True, validators=[validate_mobile_number])
     alternate_mobile = models.CharField(max_length=10, null=True, blank=True, validators=[validate_mobile_number])
     party_photo = models.ImageField(upload_to='party_photos/', null=True, blank=True, verbose_name="Party Photo")
+    # Sum of the pending rent of the party's bills, kept current by AdminApp.payments
+    outstanding_amount = models.DecimalField(
+        max_digits=14, decimal_places=0, default=0, editable=False, verbose_name="Outstanding Amount"
+    )
+
+    # Number of bills pointing here, kept current by AdminApp.object_counts
+    bill_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Bills")
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -396,31 +678,23 @@ class Party(models.Model):
     @property
     def total_bills(self):
         """Count of bills for this party"""
-        return self.bills.count()
+        return self.bill_count
     
     total_bills.fget.short_description = 'Total Bills'
 
-    def clean(self):
-        """Enhanced validation that prevents duplicate name + mobile in same business"""
-        super().clean()  # Call parent clean first
-        
-        # Only run validation if we have name, mobile, and business
-        if self.name and self.mobile and self.business_id:
-            queryset = Party.objects.filter(
-                business_id=self.business_id,
-                name=self.name,
-                mobile=self.mobile
-            )
-            
-            # Exclude current instance when editing
-            if self.pk:
-                queryset = queryset.exclude(pk=self.pk)
-            
-            if queryset.exists():
-                raise ValidationError({
-                    'mobile': f'A party with name "{self.name}" and mobile number {self.mobile} already exists in your business.',
-                    'name': f'A party with name "{self.name}" and mobile number {self.mobile} already exists in your business.'
-                })
+    def unique_error_messages(self):
+        """Duplicate name + mobile or mobile in the same business, or GST anywhere"""
+        duplicate = f'A party with name "{self.name}" and mobile number {self.mobile} already exists in your business.'
+        return {
+            ('business', 'name', 'mobile'): {'mobile': duplicate, 'name': duplicate},
+            ('business', 'mobile'): {
+                'mobile': f'Mobile {self.mobile} is already registered as primary mobile for another party.'
+            },
+            ('business', 'alternate_mobile'): {
+                'alternate_mobile': 'This mobile is already registered as alternate mobile for another party.'
+            },
+            ('gst_no',): {'gst_no': f'GST number {self.gst_no} is already registered with another party.'},
+        }
 
     def save(self, *args, **kwargs):
         """Ensure business is set and format fields"""
@@ -476,9 +750,17 @@ class Party(models.Model):
                 condition=models.Q(gst_no__isnull=False)
             ),
         ]
+        indexes = [
+            # Parties of a business by outstanding balance, largest first
+            models.Index(fields=['business', '-outstanding_amount'], name='party_business_outstanding_idx'),
+            # Parties of a business by name, and the date hierarchy of the party list
+            models.Index(fields=['business', 'name'], name='party_business_name_idx'),
+            models.Index(fields=['business', '-created_at'], name='party_business_created_idx'),
+        ]
 
 
-class Driver(models.Model):
+@serialize_writes
+class Driver(UniqueConstraintMixin, ChangeTrackingMixin, models.Model):
     business = models.ForeignKey(Business, on_delete=models.CASCADE) 
     driver_name = models.CharField(max_length=255)
     licence = models.FileField(upload_to='driver_documents/licence/', null=True, blank=True)
@@ -491,6 +773,9 @@ class Driver(models.Model):
     driver_photo1 = models.ImageField(upload_to='driver_photos/', null=True, blank=True, verbose_name="Driver Photo 1")
     driver_photo2 = models.ImageField(upload_to='driver_photos/', null=True, blank=True, verbose_name="Driver Photo 2")
 
+    # Number of bills pointing here, kept current by AdminApp.object_counts
+    bill_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Bills")
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -518,7 +803,7 @@ class Driver(models.Model):
     @property
     def total_bills(self):
         """Count of bills for this driver"""
-        return self.bills.count()
+        return self.bill_count
     
     total_bills.fget.short_description = 'Total Bills'
 
@@ -526,11 +811,8 @@ class Driver(models.Model):
         """Comprehensive validation for Driver model"""
         super().clean()
         
-        # Handle mobile validation
+        # Handle mobile validation, duplicates are caught by the constraints
         if self.mobile:
-            # Validate mobile doesn't exist in same business
-            self._validate_mobile_unique('mobile', self.mobile)
-            
             # Validate mobile and alternate_mobile are not same
             if self.mobile == self.alternate_mobile:
                 raise ValidationError({
@@ -554,36 +836,16 @@ class Driver(models.Model):
         #             'alternate_mobile': 'This mobile number is already registered as primary mobile for another driver.'
         #         })
 
-    def _validate_mobile_unique(self, field_name, mobile_value):
-        """Helper method to validate mobile uniqueness"""
-        if not mobile_value or not self.business_id:
-            return
-            
-        # Check against primary mobile numbers
-        mobile_queryset = Driver.objects.filter(
-            business_id=self.business_id,
-            mobile=mobile_value
-        )
-        
-        # Check against alternate mobile numbers  
-        alternate_queryset = Driver.objects.filter(
-            business_id=self.business_id,
-            alternate_mobile=mobile_value
-        )
-        
-        if self.pk:
-            mobile_queryset = mobile_queryset.exclude(pk=self.pk)
-            alternate_queryset = alternate_queryset.exclude(pk=self.pk)
-        
-        if mobile_queryset.exists():
-            raise ValidationError({
-                field_name: f'Mobile number {mobile_value} is already registered as primary mobile for another driver.'
-            })
-        
-        # if alternate_queryset.exists():
-        #     raise ValidationError({
-        #         field_name: f'Mobile number {mobile_value} is already registered as alternate mobile for another driver.'
-        #     })
+    def unique_error_messages(self):
+        """Duplicate primary or alternate mobile in the same business"""
+        return {
+            ('business', 'mobile'): {
+                'mobile': f'Mobile number {self.mobile} is already registered as primary mobile for another driver.'
+            },
+            ('business', 'alternate_mobile'): {
+                'alternate_mobile': f'Mobile number {self.alternate_mobile} is already registered as alternate mobile for another driver.'
+            },
+        }
  
     def save(self, *args, **kwargs):
         """Ensure business is set and validations pass"""
@@ -620,12 +882,17 @@ class Driver(models.Model):
                 condition=models.Q(alternate_mobile__isnull=False)
             ),
         ]
+        indexes = [
+            # Drivers of a business by name, and the date hierarchy of the driver list
+            models.Index(fields=['business', 'driver_name'], name='driver_business_name_idx'),
+            models.Index(fields=['business', '-created_at'], name='driver_business_created_idx'),
+        ]
 
 
 
 
 
-class CustomUser(AbstractUser):
+class CustomUser(ChangeTrackingMixin, AbstractUser):
     ROLE_CHOICES = [
         ('admin', 'System Admin'),
         ('business_owner', 'Business Owner'),
@@ -678,21 +945,41 @@ class CustomUser(AbstractUser):
             if self.role == 'admin' and self.business_id:
                 raise ValidationError({'business': 'System admin cannot be assigned to a business.'})
             
-            # Check staff limit when creating new staff users
-            if (self.role == 'staff' and self.business_id and 
-                not self.pk and self.is_active_staff):  # Only for new active staff
+            # Check staff limit when a user becomes active staff of a business,
+            # save() takes the slot atomically
+            if self.staff_business_id() and self.has_changed('role', 'business', 'is_active_staff'):
                 business = Business.objects.get(pk=self.business_id)
                 if not business.can_add_staff():
-                    print("##################")
-                    raise ValidationError({
-                        'role': f'Staff limit reached for {business.business_name}. '
-                               f'Maximum {business.max_staff_users} staff members allowed. '
-                               f'Current: {business.total_staff_users}.'
-                    })
+                    raise self._staff_limit_error(business)
+
+    def staff_business_id(self, loaded=False):
+        """Business whose staff quota this user takes, as saved when loaded=True"""
+        value = self.loaded_value if loaded else lambda attname: getattr(self, attname)
+        if value('role') == 'staff' and value('is_active_staff') and not value('is_superuser'):
+            return value('business_id')
+        return None
+
+    def _staff_limit_error(self, business):
+        return ValidationError({
+            'role': f'Staff limit reached for {business.business_name}. '
+                   f'Maximum {business.max_staff_users} staff members allowed. '
+                   f'Current: {business.total_staff_users}.'
+        })
 
     def save(self, *args, **kwargs):
         self.clean()
-        super().save(*args, **kwargs)
+        business_id = self.staff_business_id()
+        previous_business_id = None if self._state.adding else self.staff_business_id(loaded=True)
+        if business_id == previous_business_id:
+            super().save(*args, **kwargs)
+            return
+
+        with transaction.atomic():
+            if business_id and not Business.reserve_quota(business_id, 'staff'):
+                raise self._staff_limit_error(Business.objects.get(pk=business_id))
+            if previous_business_id:
+                Business.release_quota(previous_business_id, 'staff')
+            super().save(*args, **kwargs)
 
     def has_perm(self, perm, obj=None):
         if hasattr(self, 'is_superuser') and self.is_superuser:
@@ -706,9 +993,81 @@ class CustomUser(AbstractUser):
 
 
 
-class Bill(models.Model):
+def financial_year(value):
+    """Starting year of the April-March financial year a date falls in"""
+    return value.year if value.month >= 4 else value.year - 1
+
+
+# Tries of the bill sequence UPDATE that each wait up to the SQLite timeout for the write lock
+BILL_SEQUENCE_LOCK_ATTEMPTS = getattr(settings, 'BILL_SEQUENCE_LOCK_ATTEMPTS', 5)
+
+
+class BillSequence(models.Model):
+    """Last bill number handed out for a business, per financial year when enabled
+
+    financial_year is 0 for the single running sequence of a business.
+    """
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='bill_sequences')
+    financial_year = models.IntegerField(default=0)
+    last_number = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Bill Sequence"
+        verbose_name_plural = "Bill Sequences"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['business', 'financial_year'],
+                name='unique_bill_sequence_business_year'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.business} - {self.financial_year or 'all years'}: {self.last_number}"
+
+    @classmethod
+    def allocate(cls, business_id, financial_year=0, count=1, seed=None):
+        """Reserve count consecutive numbers and return them as a range
+
+        The counter row is incremented with a single UPDATE, which locks it
+        until the surrounding transaction ends. Callers must insert their bills
+        in that same transaction so a rollback also gives the numbers back.
+        seed() returns where a sequence that does not exist yet starts counting
+        from. It is only called after the UPDATE, so SQLite already holds the
+        write lock by then.
+
+        SQLite writers poll for the lock, so under load one can keep missing it
+        until the connection timeout. The UPDATE is the first write of the
+        numbering transaction and nothing has been written when it fails, so it
+        is tried again, up to BILL_SEQUENCE_LOCK_ATTEMPTS times.
+        """
+        sequence = cls.objects.filter(business_id=business_id, financial_year=financial_year)
+        with transaction.atomic():
+            for attempt in range(1, BILL_SEQUENCE_LOCK_ATTEMPTS + 1):
+                try:
+                    with transaction.atomic():
+                        updated = sequence.update(last_number=F('last_number') + count)
+                    break
+                except OperationalError as error:
+                    if 'locked' not in str(error) or attempt == BILL_SEQUENCE_LOCK_ATTEMPTS:
+                        raise
+            if not updated:
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(
+                            business_id=business_id, financial_year=financial_year,
+                            last_number=(seed() if seed else 0) + count,
+                        )
+                except IntegrityError:
+                    # Created by a concurrent transaction in the meantime
+                    sequence.update(last_number=F('last_number') + count)
+            last_number = sequence.values_list('last_number', flat=True).get()
+        return range(last_number - count + 1, last_number + 1)
+
+
+@serialize_writes
+class Bill(ChangeTrackingMixin, models.Model):
     business = models.ForeignKey(Business, on_delete=models.CASCADE)
-    bill_number = models.CharField(max_length=20, unique=True, editable=False, db_index=True)
+    bill_number = models.CharField(max_length=20, editable=False, db_index=True)
     party = models.ForeignKey('Party', on_delete=models.SET_NULL, related_name='bills', verbose_name="Party Name", null=True, blank=True)
     driver = models.ForeignKey('Driver', on_delete=models.SET_NULL, null=True, blank=True, related_name='bills', verbose_name="Driver")
     vehicle = models.ForeignKey('Vehicle', on_delete=models.CASCADE, related_name='bills', verbose_name="Vehicle")
@@ -719,11 +1078,26 @@ class Bill(models.Model):
     material_type = models.CharField(max_length=255, null=True, blank=True, verbose_name="Type of Material")
     rent_amount = models.DecimalField(max_digits=10, decimal_places=0,default=0, verbose_name="Rent Amount")
     advance_amount = models.DecimalField(max_digits=10, decimal_places=0,default=0, verbose_name="Advance Amount")
-    pending_amount = models.DecimalField(max_digits=10, decimal_places=0, default=0, verbose_name="Pending Amount")
+    # Computed by the database, so queryset.update() of the amounts keeps it right
+    pending_amount = models.GeneratedField(
+        expression=F('rent_amount') - F('advance_amount'),
+        output_field=models.DecimalField(max_digits=10, decimal_places=0),
+        db_persist=True,
+        verbose_name="Pending Amount",
+    )
     commission = models.DecimalField(max_digits=10, decimal_places=0, null=True, blank=True, default=0, verbose_name="Commission %")
     commission_charge = models.DecimalField(max_digits=10, decimal_places=0, null=True, blank=True, default=0, verbose_name="Commission Amount")
     commission_received = models.DecimalField(max_digits=10, decimal_places=0, null=True, blank=True, default=0, verbose_name="Commission Received")
-    commission_pending = models.DecimalField(max_digits=10, decimal_places=0, null=True, blank=True, default=0, verbose_name="Commission Pending")
+    commission_pending = models.GeneratedField(
+        expression=Case(
+            When(Q(commission_charge__isnull=True) | Q(commission_charge=0), then=Value(0)),
+            default=F('commission_charge') - Coalesce(F('commission_received'), Value(0)),
+            output_field=models.DecimalField(max_digits=10, decimal_places=0),
+        ),
+        output_field=models.DecimalField(max_digits=10, decimal_places=0),
+        db_persist=True,
+        verbose_name="Commission Pending",
+    )
     
     notes = models.TextField(null=True, blank=True, verbose_name="Additional Notes")
     
@@ -745,6 +1119,25 @@ class Bill(models.Model):
         ordering = ['-bill_date']  # Remove '-created_at' since it's not in ordering anymore
         verbose_name = "Bill"
         verbose_name_plural = "Bills"
+        constraints = [
+            # Numbers come from a per-business BillSequence, businesses may share a prefix
+            models.UniqueConstraint(
+                fields=['business', 'bill_number'],
+                name='unique_bill_number_per_business'
+            ),
+        ]
+        indexes = [
+            # Payment and commission status filters of the bill list
+            models.Index(fields=['business', 'pending_amount'], name='bill_business_pending_idx'),
+            models.Index(fields=['business', 'commission_pending'], name='bill_business_comm_pending_idx'),
+            # Keyset pages of the bill list, newest first, per business and across businesses
+            models.Index(fields=['business', '-bill_date', '-id'], name='bill_business_date_id_idx'),
+            models.Index(fields=['-bill_date', '-id'], name='bill_date_id_idx'),
+            # Party, vehicle and driver filters of the bill list, in list order
+            models.Index(fields=['business', 'party', '-bill_date', '-id'], name='bill_business_party_date_idx'),
+            models.Index(fields=['business', 'vehicle', '-bill_date', '-id'], name='bill_business_vehicle_date_idx'),
+            models.Index(fields=['business', 'driver', '-bill_date', '-id'], name='bill_business_driver_date_idx'),
+        ]
 
     # ... rest of your Bill model methods remain the same
 
@@ -800,85 +1193,277 @@ class Bill(models.Model):
     trip_route.fget.short_description = 'Trip Route'
 
     def clean(self):
-        """Enhanced validation for bill data"""
-        # Auto-calculate pending amount
-        self.pending_amount = self.rent_amount - self.advance_amount
-        
-        # Auto-calculate commission charge if commission percentage is provided
+        """Enhanced validation for bill data, shared by BillForm and bulk creation"""
+        self.calculate_commission_charge()
+
+        errors = {}
+        if (self.advance_amount or 0) > (self.rent_amount or 0):
+            errors['advance_amount'] = 'Advance amount cannot exceed rent amount.'
+        if (self.commission_received or 0) > (self.commission_charge or 0):
+            errors['commission_received'] = 'Commission received cannot exceed commission charge.'
+        if self.commission_received_date and not self.commission_received:
+            errors['commission_received_date'] = (
+                'Commission received date cannot be set without commission received amount.'
+            )
+        if errors:
+            raise ValidationError(errors)
+
+    def calculate_commission_charge(self):
+        """Auto-calculate commission charge if commission percentage is provided"""
+        # pending_amount and commission_pending are computed by the database
         if self.commission and self.commission > 0 and not self.commission_charge:
             self.commission_charge = (self.rent_amount * self.commission) / 100
-        
-        # Auto-calculate commission pending
-        if self.commission_charge:
-            self.commission_pending = self.commission_charge - (self.commission_received or 0)
  
-    def save(self, *args, **kwargs):
-        # Only generate bill number if it's a new record and bill_number is empty
-        if not self.pk and not self.bill_number:
-            try:
-                # Generate a prefix from business label
-                if self.business and self.business.business_label:
-                    words = self.business.business_label.strip().split()
-
-                    if len(words) == 1:
-                        # Single word → take first 3 letters
-                        business_prefix = words[0][:3].upper()
-                    elif len(words) == 2:
-                        # Two words → take first letter of each
-                        business_prefix = (words[0][0] + words[1][0]).upper()
-                    else:
-                        # Three or more → take first letter of each up to 3 letters
-                        business_prefix = ''.join(w[0] for w in words[:3]).upper()
-                else:
-                    business_prefix = "BILL"
-
-                # Find the last bill for this business with proper error handling
-                try:
-                    last_bill = Bill.objects.filter(business=self.business).order_by('-id').first()
-                    if last_bill and last_bill.bill_number:
-                        try:
-                            # Extract number from format like "ABC-0001"
-                            last_number_str = last_bill.bill_number.split('-')[-1]
-                            last_number = int(last_number_str)
-                            next_number = last_number + 1
-                        except (ValueError, IndexError):
-                            next_number = 1
-                    else:
-                        next_number = 1
-                except Exception as e:
-                    # Fallback if there's any issue querying the database
-                    print(f"DEBUG: Error getting last bill: {e}")
-                    next_number = 1
-
-                # Generate bill number and ensure uniqueness
-                max_attempts = 10
-                for attempt in range(max_attempts):
-                    bill_number_candidate = f"{business_prefix}-{str(next_number).zfill(4)}"
-                    
-                    # Check if this bill number already exists
-                    if not Bill.objects.filter(bill_number=bill_number_candidate).exists():
-                        self.bill_number = bill_number_candidate
-                        break
-                        
-                    next_number += 1
-                else:
-                    # If we exhausted all attempts, use a timestamp-based fallback
-                    import time
-                    timestamp = int(time.time())
-                    self.bill_number = f"{business_prefix}-{timestamp}"
-
-            except Exception as e:
-                # Ultimate fallback
-                import time
-                timestamp = int(time.time())
-                self.bill_number = f"BILL-{timestamp}"
-                print(f"DEBUG: Error generating bill number, using fallback: {e}")
+    @property
+    def bill_number_prefix(self):
+        """Prefix of this bill's numbers, taken from the business label"""
+        words = self.business.business_label.strip().split() if self.business_id else []
+        if not words:
+            return "BILL"
+        if len(words) == 1:
+            # Single word → take first 3 letters
+            return words[0][:3].upper()
+        # Two or more words → first letter of each, up to 3 letters
+        return ''.join(w[0] for w in words[:3]).upper()
+
+    def bill_number_sequence(self):
+        """(financial_year, number head) of the sequence this bill is numbered from"""
+        prefix = self.bill_number_prefix
+        if not getattr(settings, 'BILL_NUMBER_PER_FINANCIAL_YEAR', False):
+            return 0, f"{prefix}-"
+        year = financial_year(self.bill_date)
+        return year, f"{prefix}-{year % 100:02d}{(year + 1) % 100:02d}-"
+
+    def _bill_number_seed(self, head):
+        """Highest number already used under head, for bills created before BillSequence"""
+        seed = 0
+        numbers = Bill.objects.filter(
+            business_id=self.business_id, bill_number__startswith=head
+        ).values_list('bill_number', flat=True)
+        for bill_number in numbers.iterator():
+            suffix = bill_number[len(head):]
+            # Skip the old timestamp fallback numbers
+            if suffix.isdigit() and len(suffix) < 10:
+                seed = max(seed, int(suffix))
+        return seed
+
+    def assign_bill_numbers(self, bills):
+        """Give every bill of the same business and sequence as this one a new number
+
+        Must run in the transaction that inserts the bills.
+        """
+        year, head = self.bill_number_sequence()
+        numbers = BillSequence.allocate(
+            self.business_id, year, len(bills), lambda: self._bill_number_seed(head)
+        )
+        for bill, number in zip(bills, numbers):
+            bill.bill_number = f"{head}{str(number).zfill(4)}"
 
+    def save(self, *args, **kwargs):
         # Ensure calculations are done before saving
-        self.clean()
-        super().save(*args, **kwargs)
+        self.calculate_commission_charge()
+
+        # has_changed() is also True for new bills, which always take the transaction below
+        if not self.has_changed('vehicle', 'party', 'driver'):
+            super().save(*args, **kwargs)
+            return
+
+        # The bill counts of the vehicle, party and driver are updated by the
+        # post_save signals and commit or roll back with the bill
+        with transaction.atomic():
+            # Only generate bill number if it's a new record and bill_number is empty.
+            # The number is taken inside the insert transaction, so concurrent saves
+            # wait on the sequence row and a failed insert does not leave a gap
+            if not (self.pk or self.bill_number):
+                self.assign_bill_numbers([self])
+            super().save(*args, **kwargs)
 
 
     def get_business(self):
         return self.business
- 
\ No newline at end of file
+ 
+
+class BillPayment(models.Model):
+    """A rent or commission receipt against a bill
+
+    Recorded through AdminApp.payments, which adds it to the bill's received
+    amount in the same transaction.
+    """
+    KIND_CHOICES = [
+        ('rent', 'Rent'),
+        ('commission', 'Commission'),
+    ]
+
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='bill_payments')
+    bill = models.ForeignKey('Bill', on_delete=models.CASCADE, related_name='payments')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default='rent')
+    amount = models.DecimalField(max_digits=10, decimal_places=0)
+    paid_on = models.DateField(default=timezone.localdate)
+    received_by = models.ForeignKey('CustomUser', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    notes = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Bill Payment"
+        verbose_name_plural = "Bill Payments"
+        ordering = ['-paid_on', '-id']
+        indexes = [
+            # Payment history of a bill
+            models.Index(fields=['bill', 'kind'], name='bill_payment_bill_kind_idx'),
+            # Receipts of a business by day
+            models.Index(fields=['business', '-paid_on'], name='bill_payment_business_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.bill} - {self.get_kind_display()} {self.amount} on {self.paid_on}"
+
+
+class BillDailyRollup(models.Model):
+    """Per-business daily bill totals, kept in sync with Bill by AdminApp.rollups"""
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='bill_rollups')
+    bill_date = models.DateField()
+
+    bill_count = models.IntegerField(default=0)
+    rent_amount = models.DecimalField(max_digits=14, decimal_places=0, default=0)
+    advance_amount = models.DecimalField(max_digits=14, decimal_places=0, default=0)
+    pending_amount = models.DecimalField(max_digits=14, decimal_places=0, default=0)
+    commission_charge = models.DecimalField(max_digits=14, decimal_places=0, default=0)
+    commission_received = models.DecimalField(max_digits=14, decimal_places=0, default=0)
+    commission_pending = models.DecimalField(max_digits=14, decimal_places=0, default=0)
+
+    # Payment status split, same rules as Bill.payment_status
+    paid_count = models.IntegerField(default=0)
+    partial_count = models.IntegerField(default=0)
+    pending_count = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Bill Daily Rollup"
+        verbose_name_plural = "Bill Daily Rollups"
+        ordering = ['business', 'bill_date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['business', 'bill_date'],
+                name='unique_bill_rollup_business_date'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.business} - {self.bill_date} ({self.bill_count} bills)"
+
+
+class LeaderboardWindow(models.Model):
+    """A standard date window whose vehicle and party totals are materialized"""
+    WINDOW_CHOICES = [
+        ('this_month', 'This Month'),
+        ('last_30_days', 'Last 30 Days'),
+        ('this_year', 'This Year'),
+    ]
+
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='leaderboard_windows')
+    name = models.CharField(max_length=20, choices=WINDOW_CHOICES)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    built_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Leaderboard Window"
+        verbose_name_plural = "Leaderboard Windows"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['business', 'name'],
+                name='unique_leaderboard_window_business_name'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.business} - {self.get_name_display()} ({self.start_date} to {self.end_date})"
+
+
+class LeaderboardEntry(models.Model):
+    """Bill count and revenue of one vehicle or party within a LeaderboardWindow
+
+    Party entries with no party hold the bills without a party.
+    """
+    KIND_CHOICES = [
+        ('vehicle', 'Vehicle'),
+        ('party', 'Party'),
+    ]
+
+    window = models.ForeignKey(LeaderboardWindow, on_delete=models.CASCADE, related_name='entries')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    vehicle = models.ForeignKey(Vehicle, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    party = models.ForeignKey(Party, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    bill_count = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=0, default=0)
+
+    class Meta:
+        verbose_name = "Leaderboard Entry"
+        verbose_name_plural = "Leaderboard Entries"
+        indexes = [
+            # Top N of a window is an index range scan of N rows
+            models.Index(fields=['window', 'kind', '-revenue'], name='leaderboard_window_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.window} - {self.vehicle or self.party or 'Unknown'}: {self.revenue}"
+
+
+class BusinessObjectCount(models.Model):
+    """Number of rows a business has of one model, kept by AdminApp.object_counts
+
+    Lets admin changelists show totals without a COUNT(*) over the table.
+    """
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='object_counts')
+    content_type = models.ForeignKey('contenttypes.ContentType', on_delete=models.CASCADE, related_name='+')
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Business Object Count"
+        verbose_name_plural = "Business Object Counts"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['business', 'content_type'],
+                name='unique_object_count_business_type'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.business} - {self.content_type}: {self.count}"
+
+
+class ActivityEntry(models.Model):
+    """Admin activity of one business, shown in its dashboard feed
+
+    Written alongside the global admin LogEntry, but scoped to a business and
+    with one entry per bulk action instead of one per object.
+    """
+    ACTION_CHOICES = [
+        ('add', 'Added'),
+        ('change', 'Changed'),
+        ('delete', 'Deleted'),
+        ('bulk', 'Bulk Action'),
+    ]
+
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='activity_entries')
+    user = models.ForeignKey('CustomUser', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    content_type = models.ForeignKey('contenttypes.ContentType', on_delete=models.SET_NULL, null=True, blank=True)
+    object_id = models.CharField(max_length=50, null=True, blank=True)
+    object_repr = models.CharField(max_length=200, blank=True)
+    object_count = models.IntegerField(default=1)
+    message = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Activity Entry"
+        verbose_name_plural = "Activity Entries"
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # Newest-first feed pages of a business, see AdminApp.activity
+            models.Index(fields=['business', '-created_at', '-id'], name='activity_business_feed_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.business} - {self.get_action_display()} {self.object_repr}"
@@ -0,0 +1,165 @@
+from collections import Counter, defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from .models import Bill, BusinessObjectCount, Driver, Party, Vehicle, VehicleOwner
+
+
+# Business-owned models whose rows are counted per business
+COUNTED_MODELS = (Bill, Vehicle, Party, Driver, VehicleOwner)
+
+# Counter column kept on the target of each counted foreign key, {model: {foreign key: counter}}
+RELATED_COUNTERS = {
+    Bill: {'vehicle': 'bill_count', 'party': 'bill_count', 'driver': 'bill_count'},
+    Vehicle: {'owner': 'vehicle_count'},
+}
+
+
+def _counts(model):
+    return BusinessObjectCount.objects.filter(content_type=ContentType.objects.get_for_model(model))
+
+
+def adjust_object_counts(model, business_ids, sign=1):
+    """Add one per inserted row, or with sign=-1 subtract one per deleted row
+
+    business_ids holds the business of every row. A missing count is created
+    from a real COUNT on insert; deletes never create one, since the business
+    itself may be being deleted.
+    """
+    for business_id, count in Counter(business_id for business_id in business_ids if business_id).items():
+        counts = _counts(model).filter(business_id=business_id)
+        if counts.update(count=F('count') + sign * count) or sign < 0:
+            continue
+        try:
+            with transaction.atomic():
+                BusinessObjectCount.objects.create(
+                    business_id=business_id,
+                    content_type=ContentType.objects.get_for_model(model),
+                    # Already includes the rows just inserted
+                    count=model._base_manager.filter(business_id=business_id).count(),
+                )
+        except IntegrityError:
+            # Created meanwhile by another transaction
+            counts.update(count=F('count') + count)
+
+
+def get_object_count(model, business_id=None):
+    """Stored number of rows of a model for one business, or for all of them"""
+    counts = _counts(model)
+    if business_id is not None:
+        counts = counts.filter(business_id=business_id)
+    return counts.aggregate(total=Sum('count', default=0))['total']
+
+
+def _actual_counts(model, business_ids=None):
+    rows = model._base_manager.order_by()
+    if business_ids:
+        rows = rows.filter(business_id__in=business_ids)
+    return dict(rows.values_list('business').annotate(count=Count('pk')))
+
+
+def verify_object_counts(business_ids=None):
+    """(business id, model, stored, actual) of every count that drifted"""
+    drift = []
+    for model in COUNTED_MODELS:
+        counts = _counts(model)
+        if business_ids:
+            counts = counts.filter(business_id__in=business_ids)
+        stored = dict(counts.values_list('business_id', 'count'))
+        actual = _actual_counts(model, business_ids)
+        for business_id in sorted(set(stored) | set(actual)):
+            if stored.get(business_id, 0) != actual.get(business_id, 0):
+                drift.append((business_id, model, stored.get(business_id, 0), actual.get(business_id, 0)))
+    return drift
+
+
+def rebuild_object_counts(business_ids=None):
+    """Recount every counted model of the businesses, all businesses by default"""
+    for model in COUNTED_MODELS:
+        content_type = ContentType.objects.get_for_model(model)
+        actual = _actual_counts(model, business_ids)
+        counts = _counts(model).exclude(business_id__in=actual)
+        if business_ids:
+            counts = counts.filter(business_id__in=business_ids)
+        counts.update(count=0)
+        BusinessObjectCount.objects.bulk_create(
+            [
+                BusinessObjectCount(business_id=business_id, content_type=content_type, count=count)
+                for business_id, count in actual.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['business', 'content_type'],
+            update_fields=['count'],
+        )
+
+
+def _related_counters():
+    for model, counters in RELATED_COUNTERS.items():
+        for name, counter in counters.items():
+            yield model, model._meta.get_field(name), counter
+
+
+def related_values(model, obj):
+    """{attname: id} of the counted foreign keys of a row"""
+    attnames = (model._meta.get_field(name).attname for name in RELATED_COUNTERS[model])
+    return {attname: getattr(obj, attname) for attname in attnames}
+
+
+def adjust_related_counts(model, rows, sign=1):
+    """Add one to the counters of the objects each row points at, or with sign=-1 subtract one
+
+    rows are instances of model or {attname: id} dicts, which may hold only
+    the foreign keys that changed.
+    """
+    for name, counter in RELATED_COUNTERS[model].items():
+        field = model._meta.get_field(name)
+        ids = Counter(
+            row.get(field.attname) if isinstance(row, dict) else getattr(row, field.attname)
+            for row in rows
+        )
+        ids.pop(None, None)
+        by_amount = defaultdict(list)
+        for pk, count in ids.items():
+            by_amount[count].append(pk)
+        # One UPDATE per distinct amount, so a bulk insert stays a handful of queries
+        for count, pks in by_amount.items():
+            field.related_model._base_manager.filter(pk__in=sorted(pks)).update(
+                **{counter: F(counter) + sign * count}
+            )
+
+
+def _actual_related_count(model, field):
+    rows = model._base_manager.filter(**{field.attname: OuterRef('pk')}).order_by()
+    return Coalesce(
+        Subquery(rows.values(field.attname).annotate(count=Count('pk')).values('count'),
+                 output_field=IntegerField()),
+        0,
+    )
+
+
+def _related_targets(field, business_ids=None):
+    targets = field.related_model._base_manager.order_by()
+    if business_ids:
+        targets = targets.filter(business_id__in=business_ids)
+    return targets
+
+
+def verify_related_counts(business_ids=None):
+    """(business id, object, counter, stored, actual) of every related counter that drifted"""
+    drift = []
+    for model, field, counter in _related_counters():
+        targets = _related_targets(field, business_ids).annotate(
+            actual=_actual_related_count(model, field)
+        ).exclude(**{counter: F('actual')}).order_by('business_id', 'pk')
+        for obj in targets:
+            drift.append((obj.business_id, obj, counter, getattr(obj, counter), obj.actual))
+    return drift
+
+
+def rebuild_related_counts(business_ids=None):
+    """Recount the bills and vehicles of every counted object of the businesses"""
+    for model, field, counter in _related_counters():
+        _related_targets(field, business_ids).update(**{counter: _actual_related_count(model, field)})
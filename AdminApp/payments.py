@@ -0,0 +1,195 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import DecimalField, F, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Bill, BillPayment, Party
+from .rollups import bill_rollup_keys, refresh_rollups
+from .dashboard_cache import invalidate_business_dashboards
+from .write_queue import run_serialized
+
+
+# Bill column each kind of payment adds to, and the generated column it must not exceed
+RECEIVED_FIELDS = {
+    'rent': ('advance_amount', 'pending_amount'),
+    'commission': ('commission_received', 'commission_pending'),
+}
+
+PAYMENT_FIELDS = ('bill', 'kind', 'amount', 'paid_on', 'notes')
+
+
+def pending_amount(rent_amount, advance_amount):
+    """What a bill with these amounts still owes, as its pending_amount column computes it"""
+    return Decimal(rent_amount or 0) - Decimal(advance_amount or 0)
+
+
+def adjust_party_balances(changes):
+    """Add signed changes of bills' pending amounts to their parties' outstanding_amount
+
+    changes are (party id, amount) pairs. Increments are F() expressions, so
+    concurrent writes add up, with one UPDATE per distinct total; the bills of
+    a party are never summed again.
+    """
+    totals = defaultdict(Decimal)
+    for party_id, amount in changes:
+        if party_id:
+            totals[party_id] += amount
+    by_amount = defaultdict(list)
+    for party_id, amount in totals.items():
+        if amount:
+            by_amount[amount].append(party_id)
+    for amount, party_ids in by_amount.items():
+        Party.objects.filter(pk__in=sorted(party_ids)).update(outstanding_amount=F('outstanding_amount') + amount)
+
+
+def verify_party_balances(business_id):
+    """(party id, stored, actual) of the parties of a business whose balance drifted"""
+    parties = Party.objects.filter(business_id=business_id).annotate(
+        actual=Coalesce(Sum('bills__pending_amount'), Value(0), output_field=DecimalField(max_digits=14, decimal_places=0))
+    )
+    return [
+        (party.pk, party.outstanding_amount, party.actual)
+        for party in parties.order_by('pk') if party.outstanding_amount != party.actual
+    ]
+
+
+def _add_to_bills(payments):
+    """Add the payments to their bills' received amounts, one UPDATE per distinct increment
+
+    Increments are F() expressions, so concurrent payments add up, and each
+    UPDATE only matches bills with enough left to pay. Raises ValidationError
+    if any bill would be overpaid.
+    """
+    totals = defaultdict(lambda: defaultdict(Decimal))
+    paid_on = {}
+    for payment in payments:
+        totals[payment.bill_id][payment.kind] += payment.amount
+        if payment.kind == 'commission':
+            paid_on[payment.bill_id] = max(payment.paid_on, paid_on.get(payment.bill_id, payment.paid_on))
+
+    increments = defaultdict(list)
+    for bill_id, amounts in totals.items():
+        key = tuple(sorted(amounts.items())) + (paid_on.get(bill_id),)
+        increments[key].append(bill_id)
+
+    for key, bill_ids in increments.items():
+        *amounts, commission_date = key
+        bills = Bill.objects.filter(pk__in=bill_ids)
+        values = {}
+        for kind, amount in amounts:
+            received, pending = RECEIVED_FIELDS[kind]
+            bills = bills.filter(**{f'{pending}__gte': amount})
+            values[received] = Coalesce(F(received), Value(0)) + amount
+        if commission_date:
+            values['commission_received_date'] = commission_date
+        if bills.update(**values) != len(bill_ids):
+            raise ValidationError('Payment is more than the pending amount of the bill.')
+
+
+def save_payments(payments):
+    """Insert payments with bulk_create and apply them to their bills in one transaction
+
+    The bills' received and pending amounts, their rollups and their parties'
+    outstanding balances are all updated before it commits.
+    """
+    payments = list(payments)
+    if not payments:
+        return payments
+    for payment in payments:
+        payment.business_id = payment.business_id or payment.bill.business_id
+    return run_serialized(lambda: _save_payments(payments))
+
+
+def _save_payments(payments):
+    with transaction.atomic():
+        BillPayment.objects.bulk_create(payments)
+        _add_to_bills(payments)
+
+        bills = Bill.objects.filter(pk__in={payment.bill_id for payment in payments})
+        refresh_rollups(bill_rollup_keys(bills))
+        parties = dict(bills.values_list('pk', 'party_id'))
+        # Rent payments lower what the bill, and so its party, still owes
+        adjust_party_balances(
+            (parties[payment.bill_id], -payment.amount) for payment in payments if payment.kind == 'rent'
+        )
+        invalidate_business_dashboards({payment.business_id for payment in payments})
+    return payments
+
+
+def build_payment(business, values, bills, user=None):
+    """An unsaved, validated BillPayment for one row, or raise ValidationError
+
+    bills maps the ids of the business's bills named by the rows to the bills.
+    """
+    unknown = set(values) - set(PAYMENT_FIELDS)
+    if unknown:
+        raise ValidationError({field: 'Unknown field.' for field in sorted(unknown)})
+
+    errors = {}
+    try:
+        bill = bills[int(values.get('bill'))]
+    except (TypeError, ValueError, KeyError):
+        errors['bill'] = f'No bill {values.get("bill")} in this business.'
+        bill = None
+
+    payment = BillPayment(
+        business=business, bill=bill, received_by=user,
+        **{field: values[field] for field in ('kind', 'amount', 'paid_on', 'notes') if field in values}
+    )
+    try:
+        payment.clean_fields(exclude=['bill', 'business', 'received_by'])
+    except ValidationError as error:
+        errors.update({field: ' '.join(messages) for field, messages in error.message_dict.items()})
+    if 'amount' not in errors and payment.amount <= 0:
+        errors['amount'] = 'Must be more than 0.'
+    if errors:
+        raise ValidationError(errors)
+    return payment
+
+
+def record_payments(business, rows, user=None):
+    """Record payments of a business from dicts of field values, all or none
+
+    Returns (payments, errors); errors maps the index of every invalid row to
+    its field errors, and nothing is saved unless it is empty.
+    """
+    bill_ids = set()
+    for values in rows:
+        try:
+            bill_ids.add(int(values.get('bill')))
+        except (AttributeError, TypeError, ValueError):
+            pass
+    bills = Bill.objects.filter(business=business, pk__in=bill_ids).in_bulk()
+
+    payments, errors = [], {}
+    for index, values in enumerate(rows):
+        if not isinstance(values, dict):
+            errors[index] = {'__all__': ['Each payment must be an object.']}
+            continue
+        try:
+            payments.append(build_payment(business, values, bills, user))
+        except ValidationError as error:
+            errors[index] = error.message_dict
+    if errors:
+        return [], errors
+    try:
+        return save_payments(payments), {}
+    except ValidationError as error:
+        return [], {'__all__': error.messages}
+
+
+def pay_in_full(bills, kind, paid_on, user=None, notes=''):
+    """Record a payment of the whole pending amount of every bill that still owes one"""
+    received, pending = RECEIVED_FIELDS[kind]
+    payments = [
+        BillPayment(
+            business_id=business_id, bill_id=bill_id, kind=kind, amount=amount,
+            paid_on=paid_on, received_by=user, notes=notes,
+        )
+        for bill_id, business_id, amount in bills.filter(**{f'{pending}__gt': 0}).order_by()
+        .values_list('pk', 'business_id', pending)
+    ]
+    return save_payments(payments)
@@ -0,0 +1,180 @@
+import json
+import re
+from datetime import date
+from pathlib import Path
+
+from django.contrib import admin
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import RequestFactory
+
+from .models import Bill, Business, CustomUser, Driver, Party, Vehicle, VehicleOwner
+
+
+# Plans of every scenario as last reviewed, compared by tests and by explain_queries --check
+SNAPSHOT_PATH = Path(__file__).with_name('query_plans.json')
+
+# Tables holding per-business rows, which tenant queries must never scan whole
+TENANT_TABLES = {
+    model._meta.db_table for model in (Bill, Vehicle, Party, Driver, VehicleOwner)
+}
+
+# "SCAN AdminApp_bill" reads the whole table; "SCAN ... USING INDEX" walks an index in order
+# and "SCAN subquery" reads rows a subquery already produced
+FULL_SCAN = re.compile(r'^SCAN (?!subquery)(\w+)(?: AS \w+)?$')
+
+PLAN_DATE = date(2025, 6, 1)
+
+
+def seed_plan_data():
+    """The small business every scenario runs against, created in the current database"""
+    business = Business.objects.create(business_name='Plan Transport', business_label='PLAN', mobile_number='9999999999')
+    owner = VehicleOwner.objects.create(business=business, owner_name='Plan Owner', owner_mobile_number='9999999998')
+    vehicle = Vehicle.objects.create(business=business, owner=owner, vehicle_number='MH12PL0001')
+    party = Party.objects.create(business=business, name='Plan Traders')
+    driver = Driver.objects.create(business=business, driver_name='Plan Driver')
+    Vehicle.objects.create(business=business, owner=owner, vehicle_number='MH12PL0002')
+    # Two alike bills, so every bill filter matches more rows than a one-row page holds
+    for _ in range(2):
+        bill = Bill.objects.create(
+            business=business, vehicle=vehicle, party=party, driver=driver, bill_date=PLAN_DATE,
+            from_location='Pune', to_location='Mumbai', rent_amount=1000,
+        )
+    user = CustomUser.objects.create_user(
+        username='plan-owner', role='business_owner', business=business, is_staff=True
+    )
+    return {'business': business, 'user': user, 'vehicle': vehicle, 'party': party, 'driver': driver, 'bill': bill}
+
+
+def changelist(model, per_page=None, **params):
+    """Scenario building the admin changelist of a model as the business owner, with query parameters
+
+    per_page shrinks the page, a filtered list that fills it runs the capped COUNT.
+    """
+    def run(data):
+        request = RequestFactory().get('/', {name: value(data) if callable(value) else value
+                                             for name, value in params.items()})
+        request.user = data['user']
+        model_admin = admin.site._registry[model]
+        if per_page:
+            model_admin.list_per_page = per_page
+        try:
+            cl = model_admin.get_changelist_instance(request)
+        finally:
+            model_admin.__dict__.pop('list_per_page', None)
+        list(cl.result_list)
+    return run
+
+
+def dashboard(data):
+    from .views import DASHBOARD_BLOCKS, compute_dashboard_block
+
+    for block in DASHBOARD_BLOCKS:
+        compute_dashboard_block(block, data['business'], PLAN_DATE.replace(day=1), PLAN_DATE)
+
+
+def filter_choices(field, query):
+    """Scenario searching the choices of a changelist filter as the business owner"""
+    def run(data):
+        from .filter_choices import search_choices
+
+        search_choices(field, data['user'], query)
+    return run
+
+
+def bill_export(data):
+    from .admin import BillResource
+
+    request = RequestFactory().get('/')
+    request.user = data['user']
+    BillResource().export(admin.site._registry[Bill].get_export_queryset(request))
+
+
+# (name, callable(seeded data)) of the queries whose plans are reviewed
+SCENARIOS = (
+    ('bill_changelist', changelist(Bill)),
+    # The page after the newer bill holds the older one, sought by the (bill_date, id) cursor
+    ('bill_changelist_next_page', changelist(Bill, per_page=1, _after=lambda data: f"{PLAN_DATE}~{data['bill'].pk}")),
+    ('bill_date_hierarchy', changelist(Bill, per_page=1, bill_date__year=PLAN_DATE.year, bill_date__month=PLAN_DATE.month)),
+    ('bill_filter_party', changelist(Bill, per_page=1, party__id__exact=lambda data: data['party'].pk)),
+    ('bill_filter_vehicle', changelist(Bill, per_page=1, vehicle__id__exact=lambda data: data['vehicle'].pk)),
+    ('bill_filter_driver', changelist(Bill, per_page=1, driver__id__exact=lambda data: data['driver'].pk)),
+    ('bill_filter_pending', changelist(Bill, per_page=1, payment_status='pending')),
+    ('bill_filter_commission_pending', changelist(Bill, per_page=1, commission_status='pending')),
+    ('bill_search', changelist(Bill, per_page=1, q='MH12')),
+    ('vehicle_changelist', changelist(Vehicle)),
+    ('vehicle_search', changelist(Vehicle, per_page=1, q='MH12')),
+    ('party_changelist', changelist(Party)),
+    ('driver_changelist', changelist(Driver)),
+    ('owner_changelist', changelist(VehicleOwner)),
+    ('filter_choices_party', filter_choices('party', 'Plan')),
+    ('filter_choices_vehicle', filter_choices('vehicle', 'MH12')),
+    ('filter_choices_driver', filter_choices('driver', 'Plan')),
+    ('dashboard', dashboard),
+    ('bill_export', bill_export),
+)
+
+
+def capture_selects(call, using=DEFAULT_DB_ALIAS):
+    """(sql, params) of every SELECT run by call()"""
+    queries = []
+
+    def record(execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith('SELECT'):
+            queries.append((sql, params))
+        return execute(sql, params, many, context)
+
+    with connections[using].execute_wrapper(record):
+        call()
+    return queries
+
+
+def explain(sql, params=(), using=DEFAULT_DB_ALIAS):
+    """Detail lines of SQLite's EXPLAIN QUERY PLAN, indented by depth"""
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        rows = cursor.fetchall()
+    depth = {0: -1}
+    lines = []
+    for node, parent, _, detail in rows:
+        depth[node] = depth.get(parent, -1) + 1
+        lines.append('  ' * depth[node] + detail)
+    return lines
+
+
+def collect_plans(data, using=DEFAULT_DB_ALIAS):
+    """{scenario: distinct query plans} of every scenario, in the order they ran"""
+    plans = {}
+    for name, scenario in SCENARIOS:
+        plans[name] = []
+        for sql, params in capture_selects(lambda: scenario(data), using):
+            plan = explain(sql, params, using)
+            if plan not in plans[name]:
+                plans[name].append(plan)
+    return plans
+
+
+def full_scans(plans, tables=None):
+    """(scenario, table) of every whole-table scan, only of the given tables if any"""
+    scans = []
+    for name, scenario_plans in plans.items():
+        for plan in scenario_plans:
+            for line in plan:
+                match = FULL_SCAN.match(line.strip())
+                if match and (tables is None or match.group(1) in tables) and (name, match.group(1)) not in scans:
+                    scans.append((name, match.group(1)))
+    return scans
+
+
+def load_snapshot():
+    if not SNAPSHOT_PATH.exists():
+        return {}
+    return json.loads(SNAPSHOT_PATH.read_text())
+
+
+def save_snapshot(plans):
+    SNAPSHOT_PATH.write_text(json.dumps(plans, indent=2) + '\n')
+
+
+def diff_plans(snapshot, plans):
+    """Names of the scenarios whose plans differ from the snapshot"""
+    return [name for name in sorted(set(snapshot) | set(plans)) if snapshot.get(name) != plans.get(name)]
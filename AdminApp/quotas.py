@@ -0,0 +1,36 @@
+from .models import Business, CustomUser, Vehicle
+from .subqueries import count_subquery
+
+
+def actual_quota_counts():
+    """What each Business quota counter should hold, counted from the rows it tracks"""
+    return {
+        'vehicle_count': count_subquery(Vehicle),
+        'staff_count': count_subquery(CustomUser, role='staff', is_active_staff=True, is_superuser=False),
+    }
+
+
+def verify_business_quotas(business_ids=None):
+    """(business, counter, stored, actual) for every counter that drifted"""
+    counts = actual_quota_counts()
+    businesses = Business.objects.order_by('pk').annotate(
+        **{f'actual_{counter}': count for counter, count in counts.items()}
+    )
+    if business_ids:
+        businesses = businesses.filter(pk__in=business_ids)
+
+    drift = []
+    for business in businesses:
+        for counter in counts:
+            stored, actual = getattr(business, counter), getattr(business, f'actual_{counter}')
+            if stored != actual:
+                drift.append((business, counter, stored, actual))
+    return drift
+
+
+def reconcile_business_quotas(business_ids=None):
+    """Reset the quota counters to the counted values in one UPDATE, return the rows updated"""
+    businesses = Business.objects.all()
+    if business_ids:
+        businesses = businesses.filter(pk__in=business_ids)
+    return businesses.update(**actual_quota_counts())
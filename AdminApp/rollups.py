@@ -0,0 +1,128 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from .models import Bill, BillDailyRollup
+from .dashboard import BILL_TOTAL_FIELDS, PAYMENT_STATUSES
+
+
+ROLLUP_AMOUNT_FIELDS = tuple(BILL_TOTAL_FIELDS.values())
+ROLLUP_COUNT_FIELDS = ('bill_count',) + tuple(counter for label, counter, condition in PAYMENT_STATUSES)
+ROLLUP_FIELDS = ROLLUP_COUNT_FIELDS + ROLLUP_AMOUNT_FIELDS
+
+# Keep the IN (...) lists comfortably under SQLite's bound parameter limit
+DEFAULT_CHUNK_SIZE = 500
+
+
+def rollup_aggregates():
+    """Aggregate expressions producing every BillDailyRollup value from bills"""
+    aggregates = {'bill_count': Count('id')}
+    for label, counter, condition in PAYMENT_STATUSES:
+        aggregates[counter] = Count('id', filter=condition)
+    for field in ROLLUP_AMOUNT_FIELDS:
+        aggregates[field] = Sum(field, default=0)
+    return aggregates
+
+
+def aggregate_daily(bills):
+    """Group bills by (business, bill_date) into rollup values"""
+    return (
+        bills.order_by()
+        .values('business_id', 'bill_date')
+        .annotate(**rollup_aggregates())
+    )
+
+
+def bill_rollup_keys(bills):
+    """Distinct (business_id, bill_date) pairs touched by a bill queryset"""
+    return set(bills.order_by().values_list('business_id', 'bill_date').distinct())
+
+
+def _dates_by_business(keys):
+    dates_by_business = defaultdict(set)
+    for business_id, bill_date in keys:
+        if business_id and bill_date:
+            dates_by_business[business_id].add(bill_date)
+    return dates_by_business
+
+
+def _chunks(values, chunk_size):
+    values = sorted(values)
+    for start in range(0, len(values), chunk_size):
+        yield values[start:start + chunk_size]
+
+
+def _write_rollups(business_id, dates):
+    """Recompute and store the rollup rows of one business for the given dates"""
+    bills = Bill.objects.filter(business_id=business_id, bill_date__in=dates)
+    rows = [
+        BillDailyRollup(**{**values, 'business_id': business_id})
+        for values in aggregate_daily(bills)
+    ]
+
+    with transaction.atomic():
+        # Days that no longer have any bill lose their row
+        BillDailyRollup.objects.filter(
+            business_id=business_id, bill_date__in=dates
+        ).exclude(
+            bill_date__in=[row.bill_date for row in rows]
+        ).delete()
+
+        if rows:
+            BillDailyRollup.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=['business', 'bill_date'],
+                update_fields=list(ROLLUP_FIELDS) + ['updated_at'],
+            )
+    return len(rows)
+
+
+def refresh_rollups(keys, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Recompute the rollup rows for (business_id, bill_date) keys from raw bills"""
+    written = 0
+    for business_id, dates in _dates_by_business(keys).items():
+        for chunk in _chunks(dates, chunk_size):
+            written += _write_rollups(business_id, chunk)
+    return written
+
+
+def rebuild_business_rollups(business_id, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Rebuild every rollup row of a business, including stale ones"""
+    dates = set(Bill.objects.filter(business_id=business_id).order_by()
+                .values_list('bill_date', flat=True).distinct())
+    dates |= set(BillDailyRollup.objects.filter(business_id=business_id)
+                 .values_list('bill_date', flat=True))
+    return refresh_rollups({(business_id, bill_date) for bill_date in dates}, chunk_size)
+
+
+def verify_business_rollups(business_id, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Compare stored rollups of a business with raw bills, returning the mismatching dates"""
+    stored_dates = set(BillDailyRollup.objects.filter(business_id=business_id)
+                       .values_list('bill_date', flat=True))
+    bill_dates = set(Bill.objects.filter(business_id=business_id).order_by()
+                     .values_list('bill_date', flat=True).distinct())
+
+    mismatches = []
+    for chunk in _chunks(stored_dates | bill_dates, chunk_size):
+        expected = {
+            values['bill_date']: values
+            for values in aggregate_daily(
+                Bill.objects.filter(business_id=business_id, bill_date__in=chunk)
+            )
+        }
+        stored = {
+            values['bill_date']: values
+            for values in BillDailyRollup.objects.filter(
+                business_id=business_id, bill_date__in=chunk
+            ).values('bill_date', *ROLLUP_FIELDS)
+        }
+        for bill_date in chunk:
+            expected_values = expected.get(bill_date)
+            stored_values = stored.get(bill_date)
+            if expected_values is None or stored_values is None:
+                mismatches.append(bill_date)
+            elif any(expected_values[field] != stored_values[field] for field in ROLLUP_FIELDS):
+                mismatches.append(bill_date)
+    return mismatches
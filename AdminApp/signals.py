@@ -1,13 +1,189 @@
-# Add this in signals.py or at the bottom of models.py
-from django.db.models.signals import post_save
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
-from .models import Company, CompanySettings
 
-@receiver(post_save, sender=Company)
-def create_company_settings(sender, instance, created, **kwargs):
+from .models import Business, Bill, Vehicle, Party, Driver, VehicleOwner, CustomUser
+from .rollups import refresh_rollups
+from .leaderboards import refresh_leaderboards, reset_business_leaderboards
+from .dashboard_cache import invalidate_business_dashboards
+from .payments import adjust_party_balances, pending_amount
+from .object_counts import adjust_object_counts, adjust_related_counts, related_values
+
+
+# Bill fields the rollups, leaderboards and party balances are computed from
+AGGREGATED_BILL_FIELDS = {
+    'business', 'bill_date', 'vehicle', 'party', 'rent_amount', 'advance_amount',
+    'pending_amount', 'commission_charge', 'commission_received', 'commission_pending',
+}
+BILL_STATE_FIELDS = ('business_id', 'bill_date', 'vehicle_id', 'party_id')
+# Bill fields the outstanding balance of its party moves with
+BILL_BALANCE_FIELDS = ('party_id', 'rent_amount', 'advance_amount')
+
+# Default of loaded_value() telling a field that was not loaded from a NULL one
+NOT_LOADED = object()
+
+
+@receiver(pre_save, sender=Bill)
+def remember_bill_previous_state(sender, instance, raw=False, **kwargs):
+    """Remember where an edited bill was counted before, in case it moves"""
+    instance._previous_state = None
+    if instance.pk and not raw and not instance._state.adding:
+        if all(instance.loaded_value(attname) is not None for attname in ('business_id', 'bill_date', 'vehicle_id')):
+            # Known from when the bill was loaded, no query needed
+            instance._previous_state = tuple(instance.loaded_value(attname) for attname in BILL_STATE_FIELDS)
+        else:
+            instance._previous_state = Bill.objects.filter(pk=instance.pk).values_list(
+                *BILL_STATE_FIELDS
+            ).first()
+
+
+def _bill_state(bill):
+    return (bill.business_id, bill.bill_date, bill.vehicle_id, bill.party_id)
+
+
+@receiver(pre_save, sender=Bill)
+def remember_bill_previous_balance(sender, instance, raw=False, **kwargs):
+    """Remember what an edited bill added to its party's balance, to apply the difference"""
+    instance._previous_balance = None
+    if raw or instance._state.adding or not instance.pk:
+        return
+    previous = {attname: instance.loaded_value(attname, NOT_LOADED) for attname in BILL_BALANCE_FIELDS}
+    if NOT_LOADED in previous.values():
+        previous = Bill._base_manager.filter(pk=instance.pk).values(*BILL_BALANCE_FIELDS).first()
+    instance._previous_balance = previous
+
+
+def _party_balance_changes(instance, update_fields):
+    """(party id, amount) changes of party balances a saved bill makes"""
+    previous = getattr(instance, '_previous_balance', None)
+    current = {attname: getattr(instance, attname) for attname in BILL_BALANCE_FIELDS}
+    if not previous:
+        return [(current['party_id'], pending_amount(current['rent_amount'], current['advance_amount']))]
+    if update_fields is not None:
+        # Fields left out of the save were not written, whatever the instance holds
+        written = {Bill._meta.get_field(name).attname for name in update_fields}
+        current = {attname: value if attname in written else previous[attname] for attname, value in current.items()}
+    return [
+        (previous['party_id'], -pending_amount(previous['rent_amount'], previous['advance_amount'])),
+        (current['party_id'], pending_amount(current['rent_amount'], current['advance_amount'])),
+    ]
+
+
+@receiver(post_save, sender=Bill)
+def update_bill_aggregates_on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not AGGREGATED_BILL_FIELDS & set(update_fields):
+        # e.g. only notes or photos changed, the totals are still right
+        invalidate_business_dashboards([instance.business_id])
+        return
+    states = {_bill_state(instance)}
+    previous_state = getattr(instance, '_previous_state', None)
+    if previous_state:
+        states.add(previous_state)
+    keys = {(business_id, bill_date) for business_id, bill_date, vehicle_id, party_id in states}
+    refresh_rollups(keys)
+    refresh_leaderboards(states)
+    adjust_party_balances(_party_balance_changes(instance, update_fields))
+    invalidate_business_dashboards(business_id for business_id, bill_date in keys)
+
+
+@receiver(post_delete, sender=Bill)
+def update_bill_aggregates_on_delete(sender, instance, **kwargs):
+    refresh_rollups({(instance.business_id, instance.bill_date)})
+    refresh_leaderboards({_bill_state(instance)})
+    adjust_party_balances([(instance.party_id, -pending_amount(instance.rent_amount, instance.advance_amount))])
+    invalidate_business_dashboards([instance.business_id])
+
+
+@receiver(post_delete, sender=Party)
+def reset_leaderboards_on_party_delete(sender, instance, **kwargs):
+    # Bills of a deleted party are moved to "no party" by SET_NULL, which sends no signals
+    reset_business_leaderboards([instance.business_id])
+
+
+@receiver(post_delete, sender=Vehicle)
+def release_vehicle_quota(sender, instance, **kwargs):
+    Business.release_quota(instance.business_id, 'vehicle')
+
+
+@receiver(post_delete, sender=CustomUser)
+def release_staff_quota(sender, instance, **kwargs):
+    business_id = instance.staff_business_id()
+    if business_id:
+        Business.release_quota(business_id, 'staff')
+
+
+@receiver(post_save, sender=Vehicle)
+@receiver(post_save, sender=Party)
+@receiver(post_save, sender=Driver)
+@receiver(post_save, sender=VehicleOwner)
+@receiver(post_delete, sender=Vehicle)
+@receiver(post_delete, sender=Party)
+@receiver(post_delete, sender=Driver)
+@receiver(post_delete, sender=VehicleOwner)
+def invalidate_dashboards_on_master_data_change(sender, instance, **kwargs):
+    invalidate_business_dashboards([instance.business_id])
+
+
+@receiver(post_save, sender=Bill)
+@receiver(post_save, sender=Vehicle)
+@receiver(post_save, sender=Party)
+@receiver(post_save, sender=Driver)
+@receiver(post_save, sender=VehicleOwner)
+def count_saved_object(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
     if created:
-        CompanySettings.objects.get_or_create(company=instance)
+        adjust_object_counts(sender, [instance.business_id])
+        return
+    previous_business_id = instance.loaded_value('business_id')
+    if previous_business_id and previous_business_id != instance.business_id:
+        adjust_object_counts(sender, [previous_business_id], -1)
+        adjust_object_counts(sender, [instance.business_id])
+
+
+@receiver(post_delete, sender=Bill)
+@receiver(post_delete, sender=Vehicle)
+@receiver(post_delete, sender=Party)
+@receiver(post_delete, sender=Driver)
+@receiver(post_delete, sender=VehicleOwner)
+def count_deleted_object(sender, instance, **kwargs):
+    adjust_object_counts(sender, [instance.business_id], -1)
+
+
+@receiver(pre_save, sender=Bill)
+@receiver(pre_save, sender=Vehicle)
+def remember_counted_relations(sender, instance, raw=False, **kwargs):
+    """Remember which objects counted an edited bill or vehicle, in case it moves"""
+    instance._previous_relations = None
+    if raw or instance._state.adding or not instance.pk:
+        return
+    previous = {attname: instance.loaded_value(attname, NOT_LOADED) for attname in related_values(sender, instance)}
+    if NOT_LOADED in previous.values():
+        previous = sender._base_manager.filter(pk=instance.pk).values(*previous).first()
+    instance._previous_relations = previous
+
+
+@receiver(post_save, sender=Bill)
+@receiver(post_save, sender=Vehicle)
+def count_related_on_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if created:
+        adjust_related_counts(sender, [instance])
+        return
+    previous = getattr(instance, '_previous_relations', None) or {}
+    current = related_values(sender, instance)
+    moved = {attname for attname, value in previous.items() if current[attname] != value}
+    if update_fields is not None:
+        # Foreign keys left out of the save were not written, whatever the instance holds
+        moved &= {sender._meta.get_field(name).attname for name in update_fields}
+    if moved:
+        adjust_related_counts(sender, [{attname: previous[attname] for attname in moved}], -1)
+        adjust_related_counts(sender, [{attname: current[attname] for attname in moved}])
+
 
-@receiver(post_save, sender=Company)
-def save_company_settings(sender, instance, **kwargs):
-    instance.settings.save()
\ No newline at end of file
+@receiver(post_delete, sender=Bill)
+@receiver(post_delete, sender=Vehicle)
+def count_related_on_delete(sender, instance, **kwargs):
+    adjust_related_counts(sender, [instance], -1)
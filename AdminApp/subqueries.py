@@ -0,0 +1,14 @@
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(model, business_field='business', **filters):
+    """Correlated COUNT(*) of a model's rows for the outer business, narrowed by filters"""
+    counts = (
+        model.objects.filter(**{business_field: OuterRef('pk')}, **filters)
+        .order_by()
+        .values(business_field)
+        .annotate(count=Count('pk'))
+        .values('count')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
@@ -1,3 +1,2050 @@
-from django.test import TestCase
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, OperationalError, connection, connections, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import F, QuerySet, Sum
+from django.contrib.admin import site as admin_site
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .models import (
+    Business, Bill, BillDailyRollup, BillPayment, BusinessObjectCount, Vehicle, Party, Driver, VehicleOwner, CustomUser,
+    LeaderboardWindow, LeaderboardEntry, ActivityEntry, BillSequence, financial_year,
+)
+from .activity import get_activity_page, record_activity
+from .bulk_actions import pk_chunks
+from .bulk_bills import create_bills
+from .payments import record_payments, verify_party_balances
+from .dashboard import (
+    OVERVIEW_DEFAULT_SORT, build_revenue_series, get_bill_metrics, get_business_overview,
+    get_dashboard_metrics, get_entity_counts, get_metric_deltas, get_period_metrics,
+    get_rollup_metrics, pick_granularity, previous_period,
+)
+from .dashboard_cache import get_cached_dashboard_data, get_cache_stats
+from .concurrency import arun_concurrently, run_concurrently
+from .object_counts import get_object_count, rebuild_related_counts, verify_object_counts, verify_related_counts
+from .filter_choices import FILTER_CHOICES_LIMIT, get_filter_choices
+from .query_plans import TENANT_TABLES, collect_plans, diff_plans, full_scans, load_snapshot, seed_plan_data
+from .leaderboards import get_current_window, get_live_top_entries, get_top_entries
+from .rollups import verify_business_rollups
+from .vehicle_lookup import lookup_vehicles
+from .views import acompute_dashboard, compute_dashboard, dashboard_queries
+from .write_queue import get_write_queue, run_serialized
+
+
+def create_business(label='ACME', **kwargs):
+    return Business.objects.create(
+        business_name=kwargs.pop('business_name', f'{label} Transport'),
+        business_label=label,
+        mobile_number='9876543210',
+        **kwargs
+    )
+
+
+def create_bill(business, vehicle, bill_date, rent, advance=0, commission_charge=0,
+                commission_received=0, **kwargs):
+    return Bill.objects.create(
+        business=business,
+        vehicle=vehicle,
+        bill_date=bill_date,
+        from_location='Pune',
+        to_location='Mumbai',
+        rent_amount=Decimal(rent),
+        advance_amount=Decimal(advance),
+        commission_charge=Decimal(commission_charge),
+        commission_received=Decimal(commission_received),
+        **kwargs
+    )
+
+
+class FileDatabaseTestCase(TransactionTestCase):
+    """Runs on a copy of the test database in a temporary file
+
+    Threads writing to the shared in-memory test database fail at once with
+    "database table is locked"; on a file they wait for the lock like in
+    production.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        directory = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, directory, ignore_errors=True)
+        path = os.path.join(directory, 'test.sqlite3')
+        connection.ensure_connection()
+        target = sqlite3.connect(path)
+        connection.connection.backup(target)
+        target.close()
+        # Closing the in-memory database would drop it, keep it for the following tests
+        memory_name, memory_connection = connection.settings_dict['NAME'], connection.connection
+        connection.connection = None
+        connection.settings_dict['NAME'] = path
+
+        def restore():
+            connections.close_all()
+            connection.settings_dict['NAME'] = memory_name
+            connection.connection = memory_connection
+
+        cls.addClassCleanup(restore)
+        super().setUpClass()
+
+
+class DashboardMetricsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = create_business()
+        cls.other_business = create_business('OTHER')
+        cls.owner = VehicleOwner.objects.create(
+            business=cls.business, owner_name='Ramesh', owner_mobile_number='9000000001'
+        )
+        cls.vehicle = Vehicle.objects.create(
+            business=cls.business, owner=cls.owner, vehicle_number='MH12AB1234'
+        )
+        cls.party = Party.objects.create(business=cls.business, name='Shree Traders', mobile='9000000002')
+        Driver.objects.create(business=cls.business, driver_name='Suresh', mobile='9000000003')
+
+        other_vehicle = Vehicle.objects.create(business=cls.other_business, vehicle_number='MH14XY9999')
+        Party.objects.create(business=cls.other_business, name='Elsewhere')
+
+        cls.today = date(2025, 6, 30)
+        # Paid, partially paid and pending bills, plus one outside the range
+        create_bill(cls.business, cls.vehicle, cls.today, 1000, 1000, 100, 100, party=cls.party)
+        create_bill(cls.business, cls.vehicle, cls.today - timedelta(days=3), 2000, 500, 200, 50)
+        create_bill(cls.business, cls.vehicle, cls.today - timedelta(days=10), 3000, 0, 300)
+        create_bill(cls.business, cls.vehicle, cls.today - timedelta(days=90), 5000, 0)
+        create_bill(cls.other_business, other_vehicle, cls.today, 7000, 0)
+
+    def setUp(self):
+        caches['default'].clear()
+
+    def filtered_bills(self):
+        return Bill.objects.filter(
+            business=self.business,
+            bill_date__range=[self.today - timedelta(days=30), self.today]
+        )
+
+    def test_bill_metrics_match_individual_aggregates(self):
+        bills = self.filtered_bills()
+        metrics = get_bill_metrics(bills)
+
+        self.assertEqual(metrics['total_bills'], bills.count())
+        self.assertEqual(metrics['total_revenue'], bills.aggregate(Sum('rent_amount'))['rent_amount__sum'])
+        self.assertEqual(metrics['total_advance'], bills.aggregate(Sum('advance_amount'))['advance_amount__sum'])
+        self.assertEqual(metrics['total_pending'], bills.aggregate(Sum('pending_amount'))['pending_amount__sum'])
+        self.assertEqual(metrics['total_commission'], bills.aggregate(Sum('commission_charge'))['commission_charge__sum'])
+        self.assertEqual(
+            metrics['total_commission_received'],
+            bills.aggregate(Sum('commission_received'))['commission_received__sum']
+        )
+        self.assertEqual(
+            metrics['total_commission_pending'],
+            bills.aggregate(Sum('commission_pending'))['commission_pending__sum']
+        )
+        self.assertEqual(metrics['payment_status_data'], {
+            'Paid': bills.filter(pending_amount=0).count(),
+            'Partially Paid': bills.filter(advance_amount__gt=0, pending_amount__gt=0).count(),
+            'Pending': bills.filter(advance_amount=0, pending_amount__gt=0).count(),
+        })
+        self.assertEqual(metrics['payment_status_data'], {'Paid': 1, 'Partially Paid': 1, 'Pending': 1})
+
+    def test_bill_metrics_use_one_query(self):
+        with self.assertNumQueries(1):
+            get_bill_metrics(self.filtered_bills())
+
+    def test_empty_range_returns_zeros(self):
+        metrics = get_bill_metrics(Bill.objects.none())
+        self.assertEqual(metrics['total_bills'], 0)
+        self.assertEqual(metrics['total_revenue'], 0)
+        self.assertEqual(metrics['payment_status_data'], {'Paid': 0, 'Partially Paid': 0, 'Pending': 0})
+
+    def test_entity_counts_are_scoped_to_business(self):
+        with self.assertNumQueries(1):
+            counts = get_entity_counts(self.business)
+        self.assertEqual(counts, {
+            'total_vehicles': 1,
+            'total_parties': 1,
+            'total_drivers': 1,
+            'total_owners': 1,
+        })
+
+    def test_dashboard_metrics_use_two_queries(self):
+        with self.assertNumQueries(2):
+            metrics = get_dashboard_metrics(
+                self.business, self.today - timedelta(days=30), self.today
+            )
+        self.assertEqual(metrics['total_bills'], 3)
+        self.assertEqual(metrics['total_revenue'], 6000)
+        self.assertEqual(metrics['total_pending'], 4500)
+        self.assertEqual(metrics['total_vehicles'], 1)
+        self.assertEqual(metrics['comparison']['end_date'], self.today - timedelta(days=31))
+        self.assertEqual(metrics['comparison']['deltas']['total_revenue']['change'], 6000)
+
+    def test_previous_period_comparison_in_one_query(self):
+        start_date = self.today - timedelta(days=9)
+        self.assertEqual(previous_period(start_date, self.today),
+                         (self.today - timedelta(days=19), self.today - timedelta(days=10)))
+
+        with self.assertNumQueries(1):
+            current, previous = get_period_metrics(self.business, start_date, self.today)
+        self.assertEqual((current['total_bills'], current['total_revenue']), (2, 3000))
+        self.assertEqual((previous['total_bills'], previous['total_revenue']), (1, 3000))
+        self.assertEqual(previous['payment_status_data'], {'Paid': 0, 'Partially Paid': 0, 'Pending': 1})
+
+        deltas = get_metric_deltas(current, previous)
+        self.assertEqual(deltas['total_bills'], {'previous': 1, 'change': 1, 'percent': 100.0})
+        self.assertEqual(deltas['total_pending']['change'], 1500 - 3000)
+        self.assertEqual(deltas['total_pending']['percent'], -50.0)
+        # Nothing to compare against
+        self.assertIsNone(deltas['total_commission_received']['percent'])
+
+    def test_report_dashboard_context(self):
+        user = CustomUser.objects.create_user(
+            username='owner', password='pass', role='business_owner', business=self.business
+        )
+        self.client.force_login(user)
+        response = self.client.get('/report-dashboard/', {
+            'start_date': (self.today - timedelta(days=30)).isoformat(),
+            'end_date': self.today.isoformat(),
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_bills'], 3)
+        self.assertEqual(response.context['total_revenue'], 6000)
+        self.assertEqual(response.context['total_parties'], 1)
+        self.assertEqual(response.context['payment_status_data']['Pending'], 1)
+
+        self.assertContains(response, '/api/dashboard-data/')
+        self.assertContains(response, 'vs previous period')
+
+
+class BillDailyRollupTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = create_business()
+        cls.vehicle = Vehicle.objects.create(business=cls.business, vehicle_number='MH12AB1234')
+        cls.day = date(2025, 6, 1)
+
+    def assertRollupsInSync(self):
+        self.assertEqual(verify_business_rollups(self.business.pk), [])
+
+    def test_rollup_follows_create_edit_and_delete(self):
+        bill = create_bill(self.business, self.vehicle, self.day, 1000, 400, 100)
+        create_bill(self.business, self.vehicle, self.day, 500, 500)
+
+        rollup = BillDailyRollup.objects.get(business=self.business, bill_date=self.day)
+        self.assertEqual(rollup.bill_count, 2)
+        self.assertEqual(rollup.rent_amount, 1500)
+        self.assertEqual(rollup.pending_amount, 600)
+        self.assertEqual((rollup.paid_count, rollup.partial_count, rollup.pending_count), (1, 1, 0))
+
+        # Moving a bill to another day updates both days
+        bill.bill_date = self.day + timedelta(days=1)
+        bill.save()
+        self.assertEqual(BillDailyRollup.objects.get(bill_date=self.day).bill_count, 1)
+        self.assertEqual(BillDailyRollup.objects.get(bill_date=bill.bill_date).rent_amount, 1000)
+        self.assertRollupsInSync()
+
+        bill.delete()
+        self.assertFalse(BillDailyRollup.objects.filter(bill_date=bill.bill_date).exists())
+        self.assertRollupsInSync()
+
+    def test_admin_bulk_actions_refresh_rollups(self):
+        create_bill(self.business, self.vehicle, self.day, 1000, 0, 100)
+        create_bill(self.business, self.vehicle, self.day + timedelta(days=2), 2000, 500, 200)
+        admin_user = CustomUser.objects.create_superuser(username='root', password='pass')
+        self.client.force_login(admin_user)
+
+        selected = list(Bill.objects.values_list('pk', flat=True))
+
+        # The pending filter no longer matches the bill once it is paid
+        response = self.client.post('/admin/AdminApp/bill/?payment_status=pending', {
+            'action': 'mark_as_paid',
+            '_selected_action': selected,
+        })
+        self.assertEqual(response.status_code, 302)
+        totals = get_rollup_metrics(BillDailyRollup.objects.filter(business=self.business))
+        self.assertEqual(totals['total_pending'], 1500)
+        self.assertEqual(totals['payment_status_data'], {'Paid': 1, 'Partially Paid': 1, 'Pending': 0})
+        self.assertRollupsInSync()
+
+        response = self.client.post('/admin/AdminApp/bill/', {
+            'action': 'mark_commission_received',
+            '_selected_action': selected,
+        })
+        self.assertEqual(response.status_code, 302)
+        totals = get_rollup_metrics(BillDailyRollup.objects.filter(business=self.business))
+        self.assertEqual(totals['total_commission_pending'], 0)
+        self.assertEqual(totals['total_commission_received'], 300)
+        self.assertRollupsInSync()
+
+    def test_rebuild_command_repairs_drift(self):
+        create_bill(self.business, self.vehicle, self.day, 1000)
+        # Simulate writes that bypassed the signals
+        Bill.objects.filter(business=self.business).update(rent_amount=3000)
+        BillDailyRollup.objects.create(business=self.business, bill_date=self.day - timedelta(days=5), bill_count=1)
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_bill_rollups', verify=True, stdout=StringIO())
+
+        call_command('rebuild_bill_rollups', chunk_size=1, stdout=StringIO())
+        self.assertRollupsInSync()
+        self.assertEqual(BillDailyRollup.objects.get(business=self.business).rent_amount, 3000)
+
+
+class RevenueSeriesTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = create_business()
+        cls.vehicle = Vehicle.objects.create(business=cls.business, vehicle_number='MH12AB1234')
+        # Monday 2 June 2025
+        cls.start = date(2025, 6, 2)
+        create_bill(cls.business, cls.vehicle, cls.start, 1000, 100)
+        create_bill(cls.business, cls.vehicle, cls.start + timedelta(days=2), 500)
+        create_bill(cls.business, cls.vehicle, cls.start + timedelta(days=9), 700, 700)
+        create_bill(cls.business, cls.vehicle, date(2025, 8, 15), 300)
+
+    def rollups(self, end):
+        return BillDailyRollup.objects.filter(business=self.business, bill_date__range=[self.start, end])
+
+    def test_daily_series_fills_gaps(self):
+        end = self.start + timedelta(days=9)
+        with self.assertNumQueries(1):
+            series = build_revenue_series(self.rollups(end), self.start, end, 'day')
+        self.assertEqual(len(series['labels']), 10)
+        self.assertEqual(series['labels'][0], '2025-06-02')
+        self.assertEqual(series['revenue'], [1000, 0, 500, 0, 0, 0, 0, 0, 0, 700])
+        self.assertEqual(series['advance'][0], 100)
+
+    def test_weekly_and_monthly_buckets(self):
+        end = date(2025, 8, 31)
+        weekly = build_revenue_series(self.rollups(end), self.start, end, 'week')
+        self.assertEqual(weekly['labels'][:2], ['2025-06-02', '2025-06-09'])
+        self.assertEqual(weekly['revenue'][:3], [1500, 700, 0])
+        self.assertEqual(sum(weekly['revenue']), 2500)
+
+        monthly = build_revenue_series(self.rollups(end), self.start, end, 'month')
+        self.assertEqual(monthly['labels'], ['2025-06', '2025-07', '2025-08'])
+        self.assertEqual(monthly['revenue'], [2200, 0, 300])
+
+    def test_series_from_bills_matches_rollups(self):
+        end = date(2025, 8, 31)
+        bills = Bill.objects.filter(business=self.business, bill_date__range=[self.start, end])
+        self.assertEqual(
+            build_revenue_series(bills, self.start, end, 'week'),
+            build_revenue_series(self.rollups(end), self.start, end, 'week'),
+        )
+
+    def test_granularity_is_picked_from_span(self):
+        self.assertEqual(pick_granularity(self.start, self.start + timedelta(days=30)), 'day')
+        self.assertEqual(pick_granularity(self.start, self.start + timedelta(days=180)), 'week')
+        two_years = build_revenue_series(
+            self.rollups(self.start + timedelta(days=730)), self.start, self.start + timedelta(days=730)
+        )
+        self.assertEqual(two_years['granularity'], 'month')
+        self.assertEqual(len(two_years['labels']), 25)
+
+
+class BusinessOverviewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.day = date(2025, 6, 10)
+        cls.businesses = []
+        for number, rent in enumerate([3000, 1000, 2000]):
+            business = create_business(f'B{number}', business_name=f'Business {number}')
+            vehicle = Vehicle.objects.create(business=business, vehicle_number=f'MH12AB{number:04d}')
+            create_bill(business, vehicle, cls.day, rent, 0, 100)
+            create_bill(business, vehicle, cls.day - timedelta(days=90), 9000)
+            cls.businesses.append(business)
+        cls.idle = create_business('IDLE', business_name='Idle Business')
+        cls.admin = CustomUser.objects.create_user(username='admin', password='pass', role='admin')
+
+    def overview(self, sort=OVERVIEW_DEFAULT_SORT):
+        return list(get_business_overview(self.day - timedelta(days=30), self.day, sort))
+
+    def test_totals_for_every_business_in_one_query(self):
+        with self.assertNumQueries(1):
+            rows = self.overview()
+        self.assertEqual([row['business_name'] for row in rows],
+                         ['Business 0', 'Business 2', 'Business 1', 'Idle Business'])
+        self.assertEqual(rows[0]['total_revenue'], 3000)
+        self.assertEqual(rows[0]['total_bills'], 1)
+        self.assertEqual(rows[0]['total_commission_pending'], 100)
+        # Businesses without bills in the range are listed with zeros
+        self.assertEqual(rows[-1]['total_revenue'], 0)
+        self.assertEqual(rows[-1]['total_bills'], 0)
+
+    def test_sorting(self):
+        rows = self.overview('business_name')
+        self.assertEqual(rows[0]['business_name'], 'Business 0')
+        self.assertEqual(rows[-1]['business_name'], 'Idle Business')
+        self.assertEqual(self.overview('total_revenue')[0]['business_name'], 'Idle Business')
+        # Unknown keys must not reach order_by()
+        self.assertEqual(self.overview('password')[0]['business_name'], 'Business 0')
+
+    def test_view_is_paged_and_admin_only(self):
+        self.client.force_login(self.admin)
+        with patch('AdminApp.views.OVERVIEW_PAGE_SIZE', 3):
+            response = self.client.get('/report-dashboard/overview/', {
+                'start_date': (self.day - timedelta(days=30)).isoformat(),
+                'end_date': self.day.isoformat(),
+                'sort': 'total_bills',
+                'page': 2,
+            })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['page'].paginator.count, 4)
+        self.assertEqual([row['business_name'] for row in response.context['rows']], ['Business 2'])
+
+        owner = CustomUser.objects.create_user(
+            username='owner', password='pass', role='business_owner', business=self.businesses[0]
+        )
+        self.client.force_login(owner)
+        self.assertEqual(self.client.get('/report-dashboard/overview/').status_code, 403)
+
+
+class LeaderboardTests(TestCase):
+
+    def setUp(self):
+        caches['default'].clear()
+        self.today = timezone.now().date()
+        self.business = create_business()
+        self.vehicles = [
+            Vehicle.objects.create(business=self.business, vehicle_number=f'MH12AB{number:04d}')
+            for number in range(3)
+        ]
+        self.parties = [
+            Party.objects.create(business=self.business, name=name) for name in ('Alpha', 'Beta')
+        ]
+        create_bill(self.business, self.vehicles[0], self.today, 1000, party=self.parties[0])
+        create_bill(self.business, self.vehicles[1], self.today, 3000, party=self.parties[1])
+        create_bill(self.business, self.vehicles[1], self.today - timedelta(days=5), 500)
+        create_bill(self.business, self.vehicles[2], self.today - timedelta(days=400), 9000)
+        self.start_date = self.today - timedelta(days=30)
+
+    def assert_matches_live(self, kind, start_date=None, limit=10):
+        start_date = start_date or self.start_date
+        bills = Bill.objects.filter(business=self.business, bill_date__range=[start_date, self.today])
+        expected = get_live_top_entries(bills, kind, limit)
+        self.assertEqual(get_top_entries(self.business, kind, start_date, self.today, limit), expected)
+        return expected
+
+    def test_standard_windows_match_live_query(self):
+        rows = self.assert_matches_live('vehicle')
+        self.assertEqual(rows, [
+            {'label': 'MH12AB0001', 'bill_count': 2, 'revenue': 3500},
+            {'label': 'MH12AB0000', 'bill_count': 1, 'revenue': 1000},
+        ])
+        rows = self.assert_matches_live('party')
+        self.assertEqual([row['label'] for row in rows], ['Beta', 'Alpha', 'Unknown Party'])
+        self.assert_matches_live('vehicle', self.today.replace(day=1))
+        self.assert_matches_live('party', self.today.replace(month=1, day=1))
+
+    def test_custom_range_is_not_materialized(self):
+        self.assertIsNone(get_top_entries(self.business, 'vehicle', self.start_date, self.today - timedelta(days=1), 10))
+        self.assertFalse(LeaderboardWindow.objects.exists())
+
+    def test_top_n_read_is_two_queries_once_built(self):
+        get_top_entries(self.business, 'vehicle', self.start_date, self.today, 10)
+        with self.assertNumQueries(2):
+            get_top_entries(self.business, 'vehicle', self.start_date, self.today, 1)
+
+    def test_entries_follow_bill_changes(self):
+        self.assert_matches_live('vehicle')
+        bill = create_bill(self.business, self.vehicles[2], self.today, 5000, party=self.parties[0])
+        self.assertEqual(self.assert_matches_live('vehicle')[0]['label'], 'MH12AB0002')
+
+        bill.vehicle = self.vehicles[0]
+        bill.party = None
+        bill.save()
+        self.assertEqual(self.assert_matches_live('vehicle')[0]['revenue'], 6000)
+        self.assert_matches_live('party')
+
+        bill.delete()
+        self.assert_matches_live('vehicle')
+        self.assert_matches_live('party')
+
+    def test_deleting_a_party_moves_its_bills_to_unknown(self):
+        self.assert_matches_live('party')
+        self.parties[1].delete()
+        rows = self.assert_matches_live('party')
+        self.assertEqual(rows[0], {'label': 'Unknown Party', 'bill_count': 2, 'revenue': 3500})
+
+    def test_window_rebuilds_when_the_day_changes(self):
+        window = get_current_window(self.business.pk, 'last_30_days')
+        LeaderboardWindow.objects.filter(pk=window.pk).update(
+            start_date=window.start_date - timedelta(days=1), end_date=window.end_date - timedelta(days=1)
+        )
+        LeaderboardEntry.objects.all().delete()
+        self.assert_matches_live('vehicle')
+
+
+class ActivityFeedTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = create_business()
+        cls.other_business = create_business('OTHER')
+        cls.vehicle = Vehicle.objects.create(business=cls.business, vehicle_number='MH12AB1234')
+        cls.admin = CustomUser.objects.create_superuser(username='root', password='pass')
+
+    def setUp(self):
+        caches['default'].clear()
+
+    def test_admin_log_hooks_write_scoped_entries(self):
+        request = RequestFactory().get('/')
+        request.user = self.admin
+        vehicle_admin = admin_site._registry[Vehicle]
+        vehicle_admin.log_addition(request, self.vehicle, [{'added': {}}])
+        vehicle_admin.log_change(request, self.vehicle, 'Changed status.')
+
+        entries, cursor = get_activity_page(self.business)
+        self.assertEqual([entry.action for entry in entries], ['change', 'add'])
+        self.assertEqual(entries[0].object_repr, str(self.vehicle))
+        self.assertEqual(entries[0].user, self.admin)
+        self.assertIsNone(cursor)
+        self.assertEqual(get_activity_page(self.other_business), ([], None))
+
+    def test_bulk_actions_write_one_entry_per_business(self):
+        other_vehicle = Vehicle.objects.create(business=self.other_business, vehicle_number='MH14XY9999')
+        for rent in (1000, 2000, 3000):
+            create_bill(self.business, self.vehicle, date(2025, 6, 1), rent)
+        create_bill(self.other_business, other_vehicle, date(2025, 6, 1), 500)
+        self.client.force_login(self.admin)
+
+        response = self.client.post('/admin/AdminApp/bill/', {
+            'action': 'mark_as_paid',
+            '_selected_action': list(Bill.objects.values_list('pk', flat=True)),
+        })
+        self.assertEqual(response.status_code, 302)
+        entries, cursor = get_activity_page(self.business)
+        self.assertEqual(len(entries), 1)
+        self.assertEqual((entries[0].action, entries[0].object_count), ('bulk', 3))
+        self.assertEqual(entries[0].message, 'Marked as paid')
+        self.assertEqual(get_activity_page(self.other_business)[0][0].object_count, 1)
+
+        parties = [Party.objects.create(business=self.business, name=f'Party {number}') for number in range(2)]
+        response = self.client.post('/admin/AdminApp/party/', {
+            'action': 'delete_selected',
+            '_selected_action': [party.pk for party in parties],
+            'post': 'yes',
+        })
+        self.assertEqual(response.status_code, 302)
+        latest = get_activity_page(self.business, limit=1)[0][0]
+        self.assertEqual((latest.action, latest.object_count, latest.object_repr), ('bulk', 2, '2 Parties'))
+
+    def test_keyset_pages_cover_every_entry_once(self):
+        # Entries sharing a timestamp must not be skipped or repeated across pages
+        created_at = timezone.now()
+        ActivityEntry.objects.bulk_create([
+            ActivityEntry(business=self.business, action='add', object_repr=str(number),
+                          created_at=created_at - timedelta(minutes=number // 3))
+            for number in range(10)
+        ])
+        ActivityEntry.objects.create(business=self.other_business, action='add', created_at=created_at)
+
+        seen, cursor = [], None
+        while True:
+            with self.assertNumQueries(1):
+                entries, cursor = get_activity_page(self.business, cursor, limit=4)
+            seen.extend(entries)
+            if cursor is None:
+                break
+        self.assertEqual(len(seen), 10)
+        self.assertEqual(len({entry.pk for entry in seen}), 10)
+        self.assertEqual(seen, sorted(seen, key=lambda entry: (entry.created_at, entry.pk), reverse=True))
+
+    def test_api_pages_and_dashboard_use_the_business_feed(self):
+        for number in range(12):
+            record_activity(self.business.pk, self.admin, 'change', self.vehicle)
+        record_activity(self.other_business.pk, self.admin, 'change', self.vehicle, 'Other tenant')
+        self.client.force_login(self.admin)
+
+        response = self.client.get('/report-dashboard/', {'business': self.business.pk})
+        self.assertEqual(len(response.context['recent_actions']), 10)
+        self.assertNotContains(response, 'Other tenant')
+
+        payload = self.client.get('/api/activity/', {
+            'business': self.business.pk, 'cursor': response.context['activity_cursor'],
+        }).json()
+        self.assertEqual(len(payload['entries']), 2)
+        self.assertIsNone(payload['next_cursor'])
+
+
+class DashboardCacheTestsMixin:
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = create_business()
+        cls.other_business = create_business('OTHER')
+        cls.vehicle = Vehicle.objects.create(business=cls.business, vehicle_number='MH12AB1234')
+        cls.day = date(2025, 6, 1)
+        create_bill(cls.business, cls.vehicle, cls.day, 1000)
+
+    def setUp(self):
+        caches['default'].clear()
+        self.computed = 0
+
+    def cached(self, business=None):
+        def compute():
+            self.computed += 1
+            return get_dashboard_metrics(business or self.business, self.day, self.day)
+        return get_cached_dashboard_data(business or self.business, self.day, self.day, compute)
+
+    def test_second_request_is_a_hit(self):
+        first = self.cached()
+        with self.assertNumQueries(0):
+            second = self.cached()
+        self.assertEqual(first, second)
+        self.assertEqual(self.computed, 1)
+        self.assertEqual(get_cache_stats(), {'hits': 1, 'misses': 1, 'hit_rate': 50.0})
+
+    def test_bill_write_invalidates_only_its_business(self):
+        self.cached()
+        self.cached(self.other_business)
+        with self.captureOnCommitCallbacks(execute=True):
+            create_bill(self.business, self.vehicle, self.day, 500)
+
+        self.assertEqual(self.cached()['total_revenue'], 1500)
+        self.cached(self.other_business)
+        self.assertEqual(self.computed, 3)
+
+    def test_master_data_write_invalidates(self):
+        self.cached()
+        with self.captureOnCommitCallbacks(execute=True):
+            Party.objects.create(business=self.business, name='New Party')
+        self.assertEqual(self.cached()['total_parties'], 1)
+        self.assertEqual(self.computed, 2)
+
+    def test_version_bumps_wait_for_commit(self):
+        self.cached()
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            create_bill(self.business, self.vehicle, self.day, 500)
+        self.cached()
+        self.assertEqual(self.computed, 1)
+        for callback in callbacks:
+            callback()
+        self.cached()
+        self.assertEqual(self.computed, 2)
+
+    def test_bulk_admin_action_invalidates(self):
+        self.cached()
+        admin_user = CustomUser.objects.create_superuser(username='root', password='pass')
+        self.client.force_login(admin_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/admin/AdminApp/bill/', {
+                'action': 'mark_as_paid',
+                '_selected_action': list(Bill.objects.values_list('pk', flat=True)),
+            })
+        self.assertEqual(self.cached()['total_pending'], 0)
+
+
+@override_settings(CACHES={'default': {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'dashboard-cache-tests',
+}})
+class LocMemDashboardCacheTests(DashboardCacheTestsMixin, TestCase):
+    pass
+
+
+class FileBasedDashboardCacheTests(DashboardCacheTestsMixin, TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cache_dir = tempfile.mkdtemp()
+        cls.enterClassContext(override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': cls.cache_dir,
+        }}))
+        cls.addClassCleanup(shutil.rmtree, cls.cache_dir, True)
+        super().setUpClass()
+
+
+class DashboardDataApiTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = create_business()
+        cls.other_business = create_business('OTHER')
+        cls.vehicle = Vehicle.objects.create(business=cls.business, vehicle_number='MH12AB1234')
+        cls.day = date(2025, 6, 10)
+        create_bill(cls.business, cls.vehicle, cls.day, 1000, 400)
+        cls.user = CustomUser.objects.create_user(
+            username='owner', password='pass', role='business_owner', business=cls.business
+        )
+
+    def setUp(self):
+        caches['default'].clear()
+        self.client.force_login(self.user)
+        self.params = {'start_date': '2025-06-01', 'end_date': '2025-06-30'}
+
+    def get(self, **extra):
+        return self.client.get('/api/dashboard-data/', {**self.params, **extra.pop('params', {})}, **extra)
+
+    def test_returns_every_block(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        blocks = response.json()['blocks']
+        self.assertEqual(set(blocks), {
+            'metrics', 'revenue_chart_data', 'payment_status_chart_data',
+            'vehicle_performance_data', 'party_activity_data',
+        })
+        self.assertEqual(blocks['metrics']['total_bills'], 1)
+        self.assertEqual(blocks['revenue_chart_data']['datasets'][0]['data'][9], 1000)
+
+    def test_single_block_and_granularity(self):
+        response = self.get(params={'block': 'revenue_chart_data', 'granularity': 'week'})
+        blocks = response.json()['blocks']
+        self.assertEqual(list(blocks), ['revenue_chart_data'])
+        self.assertEqual(blocks['revenue_chart_data']['granularity'], 'week')
+
+        self.assertEqual(self.get(params={'block': 'nope'}).status_code, 400)
+
+    def test_conditional_get_returns_304_until_data_changes(self):
+        response = self.get(params={'block': 'metrics'})
+        etag = response['ETag']
+        self.assertTrue(etag)
+
+        # Session, user and business lookups only, nothing is computed
+        with self.assertNumQueries(3):
+            response = self.get(params={'block': 'metrics'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # Another block has its own ETag
+        self.assertNotEqual(self.get(params={'block': 'party_activity_data'})['ETag'], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            create_bill(self.business, self.vehicle, self.day, 500)
+        response = self.get(params={'block': 'metrics'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['blocks']['metrics']['total_bills'], 2)
+
+    def test_owners_cannot_read_other_businesses(self):
+        response = self.get(params={'business': self.other_business.pk})
+        self.assertEqual(response.json()['business'], self.business.pk)
+
+
+class ConcurrentDashboardTests(FileDatabaseTestCase):
+
+    def setUp(self):
+        caches['default'].clear()
+        self.business = create_business()
+        vehicle = Vehicle.objects.create(business=self.business, vehicle_number='MH12AB1234')
+        party = Party.objects.create(business=self.business, name='Shree Traders')
+        self.day = date(2025, 6, 10)
+        for offset in range(5):
+            create_bill(self.business, vehicle, self.day - timedelta(days=offset), 1000 * (offset + 1), party=party)
+
+    def compute(self, variant):
+        caches['default'].clear()
+        return variant(self.business, self.day - timedelta(days=30), self.day)
+
+    def test_concurrent_and_sequential_blocks_agree(self):
+        expected = self.compute(compute_dashboard)
+        self.assertEqual(expected['metrics']['total_revenue'], 15000)
+        with patch('AdminApp.concurrency.DASHBOARD_QUERY_WORKERS', 2):
+            self.assertEqual(self.compute(lambda *args: run_concurrently(dashboard_queries(*args))), expected)
+            self.assertEqual(self.compute(async_to_sync(acompute_dashboard)), expected)
+
+    def test_run_concurrently_uses_worker_threads_outside_transactions(self):
+        calls = {str(number): lambda: threading.current_thread().name for number in range(3)}
+
+        with patch('AdminApp.concurrency.DASHBOARD_QUERY_WORKERS', 2):
+            names = run_concurrently(calls)
+            self.assertTrue(all(name.startswith('dashboard-query') for name in names.values()))
+
+            # Inside a transaction the workers could not see uncommitted rows
+            with transaction.atomic():
+                names = run_concurrently(calls)
+            self.assertEqual(set(names.values()), {threading.current_thread().name})
+
+    def test_arun_concurrently_uses_worker_threads_outside_transactions(self):
+        calls = {str(number): lambda: threading.current_thread().name for number in range(3)}
+
+        with patch('AdminApp.concurrency.DASHBOARD_QUERY_WORKERS', 2):
+            names = async_to_sync(arun_concurrently)(calls)
+            self.assertTrue(all(name.startswith('dashboard-query') for name in names.values()))
+
+            with transaction.atomic():
+                names = async_to_sync(arun_concurrently)(calls)
+            self.assertEqual(set(names.values()), {threading.current_thread().name})
+
+
+class BillSequenceTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = create_business('ACME')
+        cls.vehicle = Vehicle.objects.create(business=cls.business, vehicle_number='MH12AB1234')
+
+    def test_numbers_are_consecutive_per_business(self):
+        other_business = create_business('ACMX')
+        other_vehicle = Vehicle.objects.create(business=other_business, vehicle_number='MH14XY9999')
+        numbers = [create_bill(self.business, self.vehicle, date(2025, 6, 1), 100).bill_number for i in range(3)]
+        self.assertEqual(numbers, ['ACM-0001', 'ACM-0002', 'ACM-0003'])
+        # Both labels give the ACM prefix, but each business counts on its own
+        self.assertEqual(create_bill(other_business, other_vehicle, date(2025, 6, 1), 100).bill_number, 'ACM-0001')
+
+    def test_numbering_continues_after_existing_bills(self):
+        bill = create_bill(self.business, self.vehicle, date(2025, 6, 1), 100)
+        Bill.objects.filter(pk=bill.pk).update(bill_number='ACM-0041')
+        create_bill(self.business, self.vehicle, date(2025, 6, 1), 100)
+        BillSequence.objects.all().delete()
+        # Old timestamp fallbacks are not taken as the last number
+        Bill.objects.filter(pk=bill.pk).update(bill_number='ACM-1729000000')
+        Bill.objects.create(business=self.business, vehicle=self.vehicle, bill_date=date(2025, 6, 1),
+                            from_location='Pune', to_location='Mumbai', bill_number='ACM-0041')
+        self.assertEqual(create_bill(self.business, self.vehicle, date(2025, 6, 1), 100).bill_number, 'ACM-0042')
+
+    def test_locked_sequence_update_is_tried_again(self):
+        update = QuerySet.update
+        calls = []
+
+        def update_once_locked(queryset, **kwargs):
+            calls.append(queryset.model)
+            if len(calls) == 1:
+                raise OperationalError('database is locked')
+            return update(queryset, **kwargs)
+
+        with patch.object(QuerySet, 'update', update_once_locked):
+            self.assertEqual(BillSequence.allocate(self.business.pk, count=2), range(1, 3))
+        self.assertEqual(calls, [BillSequence, BillSequence])
+
+    def test_failed_insert_gives_the_number_back(self):
+        create_bill(self.business, self.vehicle, date(2025, 6, 1), 100)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            create_bill(self.business, None, date(2025, 6, 1), 100)
+        self.assertEqual(create_bill(self.business, self.vehicle, date(2025, 6, 1), 100).bill_number, 'ACM-0002')
+
+    @override_settings(BILL_NUMBER_PER_FINANCIAL_YEAR=True)
+    def test_financial_year_sequences(self):
+        self.assertEqual(financial_year(date(2025, 3, 31)), 2024)
+        self.assertEqual(financial_year(date(2025, 4, 1)), 2025)
+        numbers = [
+            create_bill(self.business, self.vehicle, bill_date, 100).bill_number
+            for bill_date in (date(2025, 3, 31), date(2025, 4, 1), date(2025, 4, 2))
+        ]
+        self.assertEqual(numbers, ['ACM-2425-0001', 'ACM-2526-0001', 'ACM-2526-0002'])
+
+
+class BulkBillCreationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = create_business('ACME')
+        cls.vehicle = Vehicle.objects.create(business=cls.business, vehicle_number='MH12AB1234')
+        cls.party = Party.objects.create(business=cls.business, name='Shree Traders')
+        other_business = create_business('OTHER')
+        cls.other_vehicle = Vehicle.objects.create(business=other_business, vehicle_number='MH14XY9999')
+
+    def setUp(self):
+        caches['default'].clear()
+
+    def row(self, **values):
+        return {
+            'vehicle': self.vehicle.pk, 'party': self.party.pk, 'bill_date': '2025-06-01',
+            'from_location': 'Pune', 'to_location': 'Mumbai', 'rent_amount': '1000',
+            'advance_amount': '400', 'commission': '5', **values,
+        }
+
+    def test_valid_rows_are_created_and_invalid_rows_reported(self):
+        rows = [
+            self.row(),
+            self.row(vehicle=self.other_vehicle.pk),
+            self.row(rent_amount='lots', bill_date=None),
+            self.row(bill_date='2025-06-02', commission_received='20'),
+            self.row(bill_number='X-1'),
+            'not a row',
+        ]
+        result = create_bills(self.business, rows, user=None)
+
+        self.assertEqual([bill.bill_number for bill in result.created], ['ACM-0001', 'ACM-0002'])
+        self.assertEqual(sorted(result.errors), [1, 2, 4, 5])
+        self.assertIn('vehicle', result.errors[1])
+        self.assertEqual(set(result.errors[2]), {'rent_amount', 'bill_date'})
+        self.assertIn('bill_number', result.errors[4])
+
+        bill = Bill.objects.get(bill_number='ACM-0002')
+        self.assertEqual((bill.pending_amount, bill.commission_charge, bill.commission_pending), (600, 50, 30))
+        self.assertEqual(verify_business_rollups(self.business.pk), [])
+        self.assertEqual(ActivityEntry.objects.get(business=self.business).object_count, 2)
+        # Numbering carries on from the reserved block
+        self.assertEqual(create_bill(self.business, self.vehicle, date(2025, 6, 1), 100).bill_number, 'ACM-0003')
+
+    def test_rows_breaking_the_bill_form_amount_rules_are_rejected(self):
+        rows = [
+            self.row(rent_amount='100', advance_amount='500'),
+            self.row(commission_received='80'),
+            self.row(commission_received_date='2025-06-05'),
+            self.row(),
+        ]
+        result = create_bills(self.business, rows, user=None)
+
+        self.assertEqual([bill.bill_number for bill in result.created], ['ACM-0001'])
+        self.assertEqual(sorted(result.errors), [0, 1, 2])
+        self.assertEqual(result.errors[0], {'advance_amount': ['Advance amount cannot exceed rent amount.']})
+        self.assertEqual(set(result.errors[1]), {'commission_received'})
+        self.assertEqual(set(result.errors[2]), {'commission_received_date'})
+        self.assertFalse(Bill.objects.filter(pending_amount__lt=0).exists())
+
+    def test_queries_grow_with_chunks_not_rows(self):
+        create_bills(self.business, [self.row()], chunk_size=50)
+
+        def count_queries(rows):
+            with CaptureQueriesContext(connection) as queries:
+                result = create_bills(self.business, rows, chunk_size=50)
+            self.assertEqual(len(result.created), len(rows))
+            return len(queries)
+
+        # Both sizes fit in one INSERT under SQLite's bound parameter limit
+        self.assertEqual(count_queries([self.row()] * 5), count_queries([self.row()] * 30))
+
+    def test_a_failing_chunk_does_not_stop_the_others(self):
+        original = Bill.objects.bulk_create
+        calls = []
+
+        def fail_second_chunk(bills, **kwargs):
+            calls.append(len(bills))
+            if len(calls) == 2:
+                raise IntegrityError('simulated')
+            return original(bills, **kwargs)
+
+        with patch.object(Bill.objects, 'bulk_create', side_effect=fail_second_chunk):
+            result = create_bills(self.business, [self.row()] * 5, chunk_size=2)
+        self.assertEqual(sorted(result.errors), [2, 3])
+        self.assertEqual([bill.bill_number for bill in result.created], ['ACM-0001', 'ACM-0002', 'ACM-0003'])
+        self.assertEqual(Bill.objects.count(), 3)
+
+    def test_api(self):
+        user = CustomUser.objects.create_user(
+            username='owner', password='pass', role='business_owner', business=self.business
+        )
+        self.client.force_login(user)
+        response = self.client.post('/api/bills/bulk/', {'bills': [self.row(), self.row(vehicle='')]},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['created'][0]['bill_number'], 'ACM-0001')
+        self.assertEqual(response.json()['errors'], [{'row': 1, 'errors': {'vehicle': ['This field is required.']}}])
+        self.assertEqual(self.client.post('/api/bills/bulk/', 'nope', content_type='application/json').status_code, 400)
+
+
+class ChunkedBulkActionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = create_business('ACME')
+        cls.vehicle = Vehicle.objects.create(business=cls.business, vehicle_number='MH12AB1234')
+        for day in range(7):
+            create_bill(cls.business, cls.vehicle, date(2025, 6, 1) + timedelta(days=day), 1000, 200, 100)
+        cls.admin = CustomUser.objects.create_superuser(username='root', password='pass')
+
+    def setUp(self):
+        caches['default'].clear()
+        self.client.force_login(self.admin)
+
+    def test_pk_chunks_survive_rows_leaving_the_queryset(self):
+        pending = Bill.objects.filter(pending_amount__gt=0)
+        pks = sorted(pending.values_list('pk', flat=True))
+        ranges = []
+        for first, last in pk_chunks(pending, 3):
+            ranges.append((first, last))
+            pending.filter(pk__gte=first, pk__lte=last).update(advance_amount=F('rent_amount'))
+        self.assertEqual(ranges, [(pks[0], pks[2]), (pks[3], pks[5]), (pks[6], pks[6])])
+
+    def test_actions_commit_chunk_by_chunk(self):
+        with patch('AdminApp.admin.BillAdmin.bulk_action_chunk_size', 3), \
+                CaptureQueriesContext(connection) as queries:
+            # Paid bills leave the filter while the later chunks still run
+            response = self.client.post('/admin/AdminApp/bill/?payment_status=partial', {
+                'action': 'mark_as_paid',
+                '_selected_action': list(Bill.objects.values_list('pk', flat=True)),
+            })
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Bill.objects.filter(pending_amount__gt=0).exists())
+
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "AdminApp_bill"')]
+        self.assertEqual(len(updates), 3)
+        self.assertEqual(verify_business_rollups(self.business.pk), [])
+        self.assertEqual(
+            sorted(ActivityEntry.objects.filter(message='Marked as paid').values_list('object_count', flat=True)),
+            [1, 3, 3]
+        )
+
+        progress = self.client.get('/api/bulk-actions/progress/').json()
+        self.assertEqual(
+            {key: progress[key] for key in ('action', 'done', 'total', 'chunks', 'finished')},
+            {'action': 'mark_as_paid', 'done': 7, 'total': 7, 'chunks': 3, 'finished': True}
+        )
+
+    def test_progress_is_reported_per_user(self):
+        self.assertEqual(self.client.get('/api/bulk-actions/progress/').status_code, 404)
+        self.client.post('/admin/AdminApp/bill/', {
+            'action': 'mark_commission_received',
+            '_selected_action': list(Bill.objects.values_list('pk', flat=True)[:2]),
+        })
+        self.assertEqual(self.client.get('/api/bulk-actions/progress/').json()['done'], 2)
+        self.assertEqual(Bill.objects.filter(commission_pending=0).count(), 2)
+
+
+class ObjectCountTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = create_business('ACME')
+        cls.other = create_business('ZETA')
+        cls.vehicle = Vehicle.objects.create(business=cls.business, vehicle_number='MH12AB1234')
+        for day in range(7):
+            create_bill(cls.business, cls.vehicle, date(2025, 6, 1) + timedelta(days=day), 1000, 200)
+        cls.user = CustomUser.objects.create_user(
+            username='owner', password='pass', role='business_owner', business=cls.business, is_staff=True
+        )
+
+    def setUp(self):
+        caches['default'].clear()
+        self.client.force_login(self.user)
+
+    def test_counts_follow_inserts_deletes_and_moves(self):
+        self.assertEqual(get_object_count(Bill, self.business.pk), 7)
+        create_bills(self.business, [{
+            'vehicle': self.vehicle.pk, 'bill_date': '2025-06-09',
+            'from_location': 'Pune', 'to_location': 'Mumbai', 'rent_amount': '400',
+        }] * 2)
+        self.assertEqual(get_object_count(Bill, self.business.pk), 9)
+
+        party = Party.objects.create(business=self.business, name='Shree Traders')
+        party.business = self.other
+        party.save()
+        self.assertEqual((get_object_count(Party, self.business.pk), get_object_count(Party, self.other.pk)), (0, 1))
+
+        # Deleting the vehicle deletes its bills too
+        self.vehicle.delete()
+        self.assertEqual((get_object_count(Vehicle), get_object_count(Bill)), (0, 0))
+        self.assertEqual(verify_object_counts(), [])
+
+    def test_unfiltered_changelist_does_not_count_bills(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/admin/AdminApp/bill/')
+        self.assertEqual(response.context['cl'].result_count, 7)
+        self.assertEqual(response.context['cl'].full_result_count, 7)
+        self.assertFalse([
+            query['sql'] for query in queries
+            if 'COUNT(' in query['sql'] and 'FROM "AdminApp_bill"' in query['sql']
+        ])
+
+    def test_filtered_single_page_is_not_counted(self):
+        with patch('AdminApp.admin.ADMIN_COUNT_CAP', 3), CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/admin/AdminApp/bill/?payment_status=partial')
+        self.assertEqual(response.context['cl'].result_count, 7)
+        self.assertEqual(len(response.context['cl'].result_list), 7)
+        self.assertFalse(response.context['cl'].count_is_capped)
+        self.assertNotContains(response, 'Count all')
+        self.assertFalse([
+            query['sql'] for query in queries
+            if 'COUNT(' in query['sql'] and 'FROM "AdminApp_bill"' in query['sql']
+        ])
+
+    def test_filtered_counts_are_capped_until_asked_for(self):
+        with patch('AdminApp.admin.ADMIN_COUNT_CAP', 3), patch('AdminApp.admin.BillAdmin.list_per_page', 2):
+            response = self.client.get('/admin/AdminApp/bill/?payment_status=partial')
+            self.assertEqual(str(response.context['cl'].result_count), '3+')
+            self.assertTrue(response.context['cl'].count_is_capped)
+            self.assertContains(response, 'Count all')
+
+            response = self.client.get('/admin/AdminApp/bill/?payment_status=partial&_count=1')
+            self.assertEqual(response.context['cl'].result_count, 7)
+            self.assertFalse(response.context['cl'].count_is_capped)
+            self.assertNotContains(response, 'Count all')
+
+    def test_reconcile_command_repairs_drift(self):
+        BusinessObjectCount.objects.filter(business=self.business).update(count=50)
+        self.assertEqual(len(verify_object_counts([self.business.pk])), 2)
+        with self.assertRaises(CommandError):
+            call_command('reconcile_object_counts', '--verify', stdout=StringIO())
+        call_command('reconcile_object_counts', stdout=StringIO())
+        self.assertEqual(verify_object_counts(), [])
+        self.assertEqual(get_object_count(Bill, self.business.pk), 7)
+
+
+class RelatedCounterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = create_business('ACME')
+        cls.owner = VehicleOwner.objects.create(business=cls.business, owner_name='Ravi', owner_mobile_number='9812345678')
+        cls.vehicle = Vehicle.objects.create(business=cls.business, owner=cls.owner, vehicle_number='MH12AB1234')
+        cls.party = Party.objects.create(business=cls.business, name='Shree Traders')
+        cls.driver = Driver.objects.create(business=cls.business, driver_name='Suresh')
+        for day in range(3):
+            create_bill(cls.business, cls.vehicle, date(2025, 6, 1) + timedelta(days=day), 1000,
+                        party=cls.party, driver=cls.driver)
+        cls.user = CustomUser.objects.create_user(
+            username='owner', password='pass', role='business_owner', business=cls.business, is_staff=True
+        )
+
+    def counts(self, *objects):
+        for obj in objects:
+            obj.refresh_from_db()
+        return [obj.total_vehicles if isinstance(obj, VehicleOwner) else obj.total_bills for obj in objects]
+
+    def test_counters_follow_bill_inserts_moves_and_deletes(self):
+        self.assertEqual(self.counts(self.vehicle, self.party, self.driver, self.owner), [3, 3, 3, 1])
+        other_vehicle = Vehicle.objects.create(business=self.business, vehicle_number='MH12CD5678')
+        other_party = Party.objects.create(business=self.business, name='Om Logistics')
+
+        bill = Bill.objects.filter(vehicle=self.vehicle).first()
+        bill.vehicle = other_vehicle
+        bill.party = other_party
+        bill.driver = None
+        bill.save()
+        self.assertEqual(self.counts(self.vehicle, other_vehicle, self.party, other_party, self.driver), [2, 1, 2, 1, 2])
+
+        # Saving other fields leaves the counters alone
+        bill.notes = 'Fragile'
+        bill.save()
+        Bill.objects.get(pk=bill.pk).save()
+        self.assertEqual(self.counts(self.vehicle, other_vehicle), [2, 1])
+
+        bill.delete()
+        self.assertEqual(self.counts(other_vehicle, other_party), [0, 0])
+
+        create_bills(self.business, [{
+            'vehicle': other_vehicle.pk, 'party': self.party.pk, 'bill_date': '2025-06-09',
+            'from_location': 'Pune', 'to_location': 'Mumbai', 'rent_amount': '400',
+        }] * 2)
+        self.assertEqual(self.counts(other_vehicle, self.party), [2, 4])
+        self.assertEqual(verify_related_counts(), [])
+
+    def test_owner_counter_follows_vehicles(self):
+        other_owner = VehicleOwner.objects.create(business=self.business, owner_name='Anil', owner_mobile_number='9812345679')
+        self.vehicle.owner = other_owner
+        self.vehicle.save()
+        self.assertEqual(self.counts(self.owner, other_owner), [0, 1])
+
+        # Deleting the vehicle also deletes its bills, and with them their counts
+        self.vehicle.delete()
+        self.assertEqual(self.counts(other_owner, self.party, self.driver), [0, 0, 0])
+        self.assertEqual(verify_related_counts(), [])
+
+    def test_counter_update_rolls_back_with_the_bill(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            create_bill(self.business, self.vehicle, date(2025, 6, 9), 1000, party=self.party)
+            raise IntegrityError
+        self.assertEqual(self.counts(self.vehicle, self.party), [3, 3])
+
+    def test_list_badges_do_not_count_bills_per_row(self):
+        for number in range(4):
+            Vehicle.objects.create(business=self.business, owner=self.owner, vehicle_number=f'MH14XY{number:04}')
+        self.client.force_login(self.user)
+        for url, table in (('vehicle', 'AdminApp_bill'), ('party', 'AdminApp_bill'),
+                           ('driver', 'AdminApp_bill'), ('vehicleowner', 'AdminApp_vehicle')):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(f'/admin/AdminApp/{url}/')
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse([
+                query['sql'] for query in queries
+                if 'COUNT(' in query['sql'] and f'FROM "{table}"' in query['sql']
+            ], url)
+        self.assertContains(self.client.get('/admin/AdminApp/vehicleowner/'), '5 Vehicles')
+
+    def test_rebuild_repairs_drift(self):
+        Vehicle.objects.filter(pk=self.vehicle.pk).update(bill_count=9)
+        VehicleOwner.objects.filter(pk=self.owner.pk).update(vehicle_count=0)
+        drift = verify_related_counts([self.business.pk])
+        self.assertEqual([(obj, counter, stored, actual) for business_id, obj, counter, stored, actual in drift],
+                         [(self.vehicle, 'bill_count', 9, 3), (self.owner, 'vehicle_count', 0, 1)])
+        with self.assertRaises(CommandError):
+            call_command('reconcile_object_counts', '--verify', stdout=StringIO())
+        call_command('reconcile_object_counts', stdout=StringIO())
+        self.assertEqual(verify_related_counts(), [])
+        rebuild_related_counts()
+        self.assertEqual(self.counts(self.vehicle, self.owner), [3, 1])
+
+
+class KeysetPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = create_business('ACME')
+        cls.vehicle = Vehicle.objects.create(business=cls.business, vehicle_number='MH12AB1234')
+        # Several bills a day, so pages split days and the id breaks the ties
+        for number in range(24):
+            create_bill(cls.business, cls.vehicle, date(2025, 5, 30) + timedelta(days=number % 4), 1000, number % 2 * 1000)
+        create_bill(create_business('ZETA'), cls.vehicle, date(2025, 6, 1), 1000)
+        cls.user = CustomUser.objects.create_user(
+            username='owner', password='pass', role='business_owner', business=cls.business, is_staff=True
+        )
+
+    def setUp(self):
+        caches['default'].clear()
+        self.client.force_login(self.user)
+        patcher = patch('AdminApp.admin.BillAdmin.list_per_page', 5)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def walk(self, query, link='next_page_url'):
+        """Result pks of every page reached by following a link from the query, and the last changelist"""
+        pages = []
+        while query is not None:
+            cl = self.client.get(f'/admin/AdminApp/bill/{query}').context['cl']
+            self.assertTrue(cl.keyset)
+            pages.append([bill.pk for bill in cl.result_list])
+            query = getattr(cl, link)
+        return pages, cl
+
+    def test_next_and_previous_pages_follow_bill_date_and_id(self):
+        expected = list(Bill.objects.filter(business=self.business).order_by('-bill_date', '-pk').values_list('pk', flat=True))
+        pages = [expected[start:start + 5] for start in range(0, len(expected), 5)]
+
+        forward, last = self.walk('')
+        self.assertEqual(forward, pages)
+        backward, first = self.walk(last.previous_page_url, 'previous_page_url')
+        self.assertEqual(backward, pages[-2::-1])
+        self.assertIsNone(first.previous_page_url)
+
+    def test_deep_pages_seek_instead_of_offset(self):
+        cl = self.client.get('/admin/AdminApp/bill/').context['cl']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/admin/AdminApp/bill/{cl.next_page_url}')
+        self.assertContains(response, '« Previous')
+        self.assertContains(response, 'Next »')
+        bill_queries = [query['sql'] for query in queries if 'FROM "AdminApp_bill"' in query['sql']]
+        self.assertTrue(bill_queries)
+        self.assertFalse([sql for sql in bill_queries if 'OFFSET' in sql])
+
+        plan = Bill.objects.filter(business=self.business).order_by('-bill_date', '-pk').values('pk')[:6].explain()
+        self.assertIn('bill_business_date_id_idx', plan)
+
+    def test_filters_and_date_hierarchy_are_kept(self):
+        query = '?bill_date__year=2025&bill_date__month=5&payment_status=pending'
+        cl = self.client.get(f'/admin/AdminApp/bill/{query}').context['cl']
+        self.assertIn('payment_status=pending', cl.next_page_url)
+        pages, last = self.walk(query)
+        self.assertEqual(len(pages), 2)
+        expected = Bill.objects.filter(
+            business=self.business, bill_date__month=5, advance_amount=0
+        ).order_by('-bill_date', '-pk').values_list('pk', flat=True)
+        self.assertEqual(sum(pages, []), list(expected))
+
+    def test_sorted_columns_and_bad_cursors_fall_back(self):
+        cl = self.client.get('/admin/AdminApp/bill/?o=1').context['cl']
+        self.assertFalse(cl.keyset)
+        self.assertEqual(len(cl.result_list), 5)
+
+        response = self.client.get('/admin/AdminApp/bill/?_after=yesterday~1')
+        self.assertRedirects(response, '/admin/AdminApp/bill/?e=1', fetch_redirect_response=False)
+
+
+class QueryPlanTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_plan_data()
+
+    def setUp(self):
+        caches['default'].clear()
+
+    def test_plans_match_the_snapshot(self):
+        changed = diff_plans(load_snapshot(), collect_plans(self.data))
+        self.assertEqual(changed, [], 'Query plans changed, review them with "manage.py explain_queries"')
+
+    def test_tenant_tables_are_never_scanned_whole(self):
+        self.assertEqual(full_scans(collect_plans(self.data), TENANT_TABLES), [])
+
+
+class FilterChoicesTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = create_business('ACME')
+        cls.other = create_business('ZETA')
+        cls.vehicle = Vehicle.objects.create(business=cls.business, vehicle_number='MH12AB1234')
+        cls.parties = [Party.objects.create(business=cls.business, name=f'Trader {number:02d}') for number in range(30)]
+        Party.objects.create(business=cls.other, name='Trader Elsewhere')
+        create_bill(cls.business, cls.vehicle, date(2025, 6, 1), 1000, party=cls.parties[3])
+        create_bill(cls.business, cls.vehicle, date(2025, 6, 2), 1000, party=cls.parties[4])
+        cls.user = CustomUser.objects.create_user(
+            username='owner', password='pass', role='business_owner', business=cls.business, is_staff=True
+        )
+
+    def setUp(self):
+        caches['default'].clear()
+        self.client.force_login(self.user)
+
+    def test_changelist_does_not_load_filter_choices(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/admin/AdminApp/bill/')
+        self.assertContains(response, 'data-url="/api/filter-choices/party/"')
+        self.assertFalse([query['sql'] for query in queries if 'FROM "AdminApp_party"' in query['sql']])
+
+        response = self.client.get(f'/admin/AdminApp/bill/?party__id__exact={self.parties[3].pk}')
+        self.assertEqual(response.context['cl'].result_count, 1)
+        self.assertContains(response, f'<option value="{self.parties[3].pk}" selected>Trader 03</option>', html=True)
+
+    def test_choices_are_searched_within_the_business(self):
+        results = self.client.get('/api/filter-choices/party/', {'q': 'trader'}).json()['results']
+        self.assertEqual(len(results), FILTER_CHOICES_LIMIT)
+        self.assertEqual(results[0], {'id': self.parties[0].pk, 'text': 'Trader 00'})
+
+        results = self.client.get('/api/filter-choices/party/', {'q': 'elsewhere'}).json()['results']
+        self.assertEqual(results, [])
+        results = self.client.get('/api/filter-choices/vehicle/', {'q': 'mh 12'}).json()['results']
+        self.assertEqual([result['id'] for result in results], [self.vehicle.pk])
+        self.assertEqual(self.client.get('/api/filter-choices/business/').json()['results'], [])
+        self.assertEqual(self.client.get('/api/filter-choices/owner/').status_code, 404)
+
+    def test_choices_are_cached_until_the_business_changes(self):
+        self.assertEqual(len(get_filter_choices('party', self.user, '3')), 3)
+        with self.assertNumQueries(0):
+            get_filter_choices('party', self.user, '3')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Party.objects.create(business=self.business, name='Trader 33')
+        self.assertEqual(len(get_filter_choices('party', self.user, '3')), 4)
+
+    def test_system_admins_search_every_business(self):
+        self.client.force_login(CustomUser.objects.create_superuser(username='root', password='pass'))
+        response = self.client.get(f'/admin/AdminApp/vehicle/?business__id__exact={self.other.pk}')
+        self.assertContains(response, 'data-url="/api/filter-choices/business/"')
+        self.assertContains(response, f'<option value="{self.other.pk}" selected>{self.other}</option>', html=True)
+
+        results = self.client.get('/api/filter-choices/party/', {'q': 'elsewhere'}).json()['results']
+        self.assertEqual(results, [{'id': results[0]['id'], 'text': f'Trader Elsewhere ({self.other})'}])
+
+
+class BillPaymentTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = create_business('ACME')
+        cls.vehicle = Vehicle.objects.create(business=cls.business, vehicle_number='MH12AB1234')
+        cls.party = Party.objects.create(business=cls.business, name='Shree Traders')
+        cls.other_party = Party.objects.create(business=cls.business, name='Other Traders')
+        cls.user = CustomUser.objects.create_user(
+            username='owner', password='pass', role='business_owner', business=cls.business, is_staff=True
+        )
+
+    def setUp(self):
+        caches['default'].clear()
+        self.bill = create_bill(self.business, self.vehicle, date(2025, 6, 1), 1000, 200, 100, party=self.party)
+
+    def assertBalancesInSync(self):
+        self.assertEqual(verify_party_balances(self.business.pk), [])
+        self.assertEqual(verify_business_rollups(self.business.pk), [])
+
+    def outstanding(self, party):
+        return Party.objects.get(pk=party.pk).outstanding_amount
+
+    def test_partial_payments_are_recorded_and_applied(self):
+        self.assertEqual(self.outstanding(self.party), 800)
+        payments, errors = record_payments(self.business, [
+            {'bill': self.bill.pk, 'amount': '300', 'paid_on': '2025-06-05'},
+            {'bill': self.bill.pk, 'amount': '200', 'paid_on': '2025-06-09', 'notes': 'Cash'},
+            {'bill': self.bill.pk, 'kind': 'commission', 'amount': '60', 'paid_on': '2025-06-10'},
+        ], user=self.user)
+        self.assertEqual(errors, {})
+        self.assertEqual(len(payments), 3)
+
+        bill = Bill.objects.get(pk=self.bill.pk)
+        self.assertEqual((bill.advance_amount, bill.pending_amount), (700, 300))
+        self.assertEqual((bill.commission_received, bill.commission_pending), (60, 40))
+        self.assertEqual(bill.commission_received_date, date(2025, 6, 10))
+        self.assertEqual(
+            list(bill.payments.values_list('kind', 'amount', 'received_by')),
+            [('commission', 60, self.user.pk), ('rent', 200, self.user.pk), ('rent', 300, self.user.pk)]
+        )
+        self.assertEqual(self.outstanding(self.party), 300)
+        self.assertBalancesInSync()
+
+    def test_invalid_payments_record_nothing(self):
+        other_bill = create_bill(create_business('ZETA'), self.vehicle, date(2025, 6, 1), 1000)
+        payments, errors = record_payments(self.business, [
+            {'bill': self.bill.pk, 'amount': '100'},
+            {'bill': other_bill.pk, 'amount': '100'},
+            {'bill': self.bill.pk, 'amount': '0', 'kind': 'refund'},
+        ])
+        self.assertEqual(payments, [])
+        self.assertEqual(errors[1], {'bill': [f'No bill {other_bill.pk} in this business.']})
+        self.assertEqual(set(errors[2]), {'amount', 'kind'})
+
+        # More than is pending, together
+        payments, errors = record_payments(self.business, [
+            {'bill': self.bill.pk, 'amount': '500'},
+            {'bill': self.bill.pk, 'amount': '500'},
+        ])
+        self.assertEqual(errors, {'__all__': ['Payment is more than the pending amount of the bill.']})
+        self.assertFalse(BillPayment.objects.exists())
+        self.assertEqual(Bill.objects.get(pk=self.bill.pk).advance_amount, 200)
+
+    def test_bill_changes_move_party_balances(self):
+        self.bill.party = self.other_party
+        self.bill.rent_amount = 1500
+        self.bill.save()
+        self.assertEqual((self.outstanding(self.party), self.outstanding(self.other_party)), (0, 1300))
+
+        create_bills(self.business, [{
+            'vehicle': self.vehicle.pk, 'party': self.party.pk, 'bill_date': '2025-06-02',
+            'from_location': 'Pune', 'to_location': 'Mumbai', 'rent_amount': '400',
+        }])
+        self.assertEqual(self.outstanding(self.party), 400)
+
+        self.bill.delete()
+        self.assertEqual(self.outstanding(self.other_party), 0)
+        self.assertBalancesInSync()
+
+    def test_party_balances_are_adjusted_not_recomputed(self):
+        # A drifted balance keeps its drift, only the change of the bill is applied
+        Party.objects.filter(pk=self.party.pk).update(outstanding_amount=F('outstanding_amount') + 5)
+        self.bill.rent_amount = 1100
+        with CaptureQueriesContext(connection) as queries:
+            self.bill.save()
+        self.assertEqual(self.outstanding(self.party), 905)
+        self.assertFalse([
+            query['sql'] for query in queries
+            if 'UPDATE "AdminApp_party"' in query['sql'] and 'SUM(' in query['sql']
+        ])
+        record_payments(self.business, [{'bill': self.bill.pk, 'amount': '100', 'paid_on': '2025-06-05'}])
+        self.assertEqual(self.outstanding(self.party), 805)
+        self.assertEqual(verify_party_balances(self.business.pk), [(self.party.pk, 805, 800)])
+
+    def test_bill_form_leaves_received_amounts_to_payments(self):
+        self.client.force_login(self.user)
+        response = self.client.get(f'/admin/AdminApp/bill/{self.bill.pk}/change/')
+        self.assertNotContains(response, 'name="advance_amount"')
+        self.assertNotContains(response, 'name="commission_received"')
+        self.assertContains(self.client.get('/admin/AdminApp/bill/add/'), 'name="advance_amount"')
+
+        request = RequestFactory().get('/')
+        request.user = self.user
+        form_class = admin_site._registry[Bill].get_form(request, self.bill)
+        data = {name: value for name, value in Bill.objects.filter(pk=self.bill.pk).values()[0].items()}
+        data.update(vehicle=self.vehicle.pk, party=self.party.pk, rent_amount='150', advance_amount='999')
+        form = form_class(data, instance=self.bill)
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.non_field_errors(), ['Advance amount cannot exceed rent amount.'])
+
+    def test_outstanding_parties_come_from_the_index(self):
+        plan = Party.objects.filter(business=self.business).order_by('-outstanding_amount')[:10].explain()
+        self.assertIn('party_business_outstanding_idx', plan)
+
+    def test_admin_actions_write_the_ledger(self):
+        paid = create_bill(self.business, self.vehicle, date(2025, 6, 2), 500, 500, party=self.party)
+        self.client.force_login(self.user)
+        self.client.post('/admin/AdminApp/bill/', {
+            'action': 'mark_as_paid', '_selected_action': [self.bill.pk, paid.pk],
+        })
+        self.client.post('/admin/AdminApp/bill/', {
+            'action': 'mark_commission_received', '_selected_action': [self.bill.pk, paid.pk],
+        })
+        self.assertEqual(
+            list(BillPayment.objects.order_by('pk').values_list('bill', 'kind', 'amount', 'received_by')),
+            [(self.bill.pk, 'rent', 800, self.user.pk), (self.bill.pk, 'commission', 100, self.user.pk)]
+        )
+        self.assertEqual(self.outstanding(self.party), 0)
+        self.assertBalancesInSync()
+
+        response = self.client.get(f'/admin/AdminApp/bill/{self.bill.pk}/change/')
+        self.assertContains(response, 'Marked commission as received')
+
+    def test_payments_api(self):
+        self.client.force_login(self.user)
+        response = self.client.post('/api/bills/payments/', {
+            'payments': [{'bill': self.bill.pk, 'amount': '800', 'paid_on': '2025-06-05'}],
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['created'][0]['amount'], '800')
+        self.assertEqual(Bill.objects.get(pk=self.bill.pk).pending_amount, 0)
+
+        response = self.client.post('/api/bills/payments/', {
+            'payments': [{'bill': self.bill.pk, 'amount': '1'}],
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+class GeneratedAmountTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = create_business('ACME')
+        cls.vehicle = Vehicle.objects.create(business=cls.business, vehicle_number='MH12AB1234')
+
+    def setUp(self):
+        caches['default'].clear()
+
+    def test_amounts_follow_saves(self):
+        bill = create_bill(self.business, self.vehicle, date(2025, 6, 1), 1000, 400, 100, 30)
+        self.assertEqual((bill.pending_amount, bill.commission_pending), (600, 70))
+
+        bill.advance_amount = 1000
+        bill.commission_charge = 0
+        bill.save()
+        self.assertEqual((bill.pending_amount, bill.commission_pending), (0, 0))
+        self.assertEqual(bill.payment_status, 'Paid')
+
+        bill.commission_charge = None
+        bill.save()
+        self.assertEqual(Bill.objects.get().commission_pending, 0)
+
+    def test_bulk_updates_stay_consistent(self):
+        create_bill(self.business, self.vehicle, date(2025, 6, 1), 1000, 0, 100)
+        create_bill(self.business, self.vehicle, date(2025, 6, 2), 2000, 500, 200, 50)
+        bills = Bill.objects.filter(business=self.business)
+
+        bills.update(advance_amount=F('rent_amount'), commission_received=F('commission_charge'))
+        self.assertEqual(set(bills.values_list('pending_amount', 'commission_pending')), {(0, 0)})
+
+        bills.update(rent_amount=F('rent_amount') + 100)
+        self.assertEqual(sorted(bills.values_list('pending_amount', flat=True)), [100, 100])
+
+    def test_payment_status_filter_uses_index(self):
+        # Unordered, as counted by the changelist; ordered pages seek bill_business_date_id_idx
+        plan = Bill.objects.filter(business=self.business, pending_amount__gt=0).order_by().explain()
+        self.assertIn('bill_business_pending_idx', plan)
+        plan = Bill.objects.filter(business=self.business, commission_pending=0).order_by().explain()
+        self.assertIn('bill_business_comm_pending_idx', plan)
+
+
+class ChangeTrackingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = create_business('ACME', max_staff_users=1)
+        owner = VehicleOwner.objects.create(business=cls.business, owner_name='Ramesh', owner_mobile_number='9000000001')
+        Vehicle.objects.create(business=cls.business, owner=owner, vehicle_number='MH12AB1234')
+        Party.objects.create(business=cls.business, name='Shree Traders', mobile='9000000002')
+        Driver.objects.create(business=cls.business, driver_name='Suresh', mobile='9000000003')
+
+    def setUp(self):
+        caches['default'].clear()
+
+    def save_queries(self, instance):
+        with CaptureQueriesContext(connection) as queries:
+            instance.save()
+        return [query['sql'] for query in queries]
+
+    def test_unchanged_save_writes_nothing(self):
+        for model in (Vehicle, Party, Driver, VehicleOwner):
+            self.assertEqual(self.save_queries(model.objects.get()), [])
+
+    def test_only_modified_columns_are_written(self):
+        vehicle = Vehicle.objects.get()
+        vehicle.notes = 'Serviced'
+        queries = self.save_queries(vehicle)
+        # No owner or business lookups, a single narrow UPDATE
+        self.assertEqual(len(queries), 1)
+        self.assertIn('"notes"', queries[0])
+        self.assertIn('"updated_at"', queries[0])
+        self.assertNotIn('"vehicle_number"', queries[0])
+        self.assertFalse(vehicle.has_changed('notes'))
+        self.assertEqual(Vehicle.objects.get().notes, 'Serviced')
+
+    def test_saves_run_no_uniqueness_queries(self):
+        party = Party.objects.get()
+        party.gst_no = '27ABCDE1234F1Z5'
+        party.mobile = '9000000009'
+        queries = self.save_queries(party)
+        # Constrained columns are written in a savepoint, without looking for duplicates first
+        self.assertEqual([query.split()[0] for query in queries], ['SAVEPOINT', 'UPDATE', 'RELEASE'])
+
+        driver = Driver.objects.get()
+        driver.driver_name = 'Suresh Patil'
+        self.assertEqual(len(self.save_queries(driver)), 1)
+        driver.mobile = '9000000008'
+        self.assertEqual([query.split()[0] for query in self.save_queries(driver)], ['SAVEPOINT', 'UPDATE', 'RELEASE'])
+
+    def test_in_place_json_edits_are_detected(self):
+        user = CustomUser.objects.create_user(username='admin', password='pass', role='admin')
+        user = CustomUser.objects.get(pk=user.pk)
+        user.permissions['reports'] = True
+        self.assertEqual(user.get_changed_fields(), {'permissions'})
+        user.save()
+        self.assertEqual(CustomUser.objects.get(pk=user.pk).permissions, {'reports': True})
+
+    def test_staff_limit_applies_when_a_user_becomes_staff(self):
+        CustomUser.objects.create_user(username='staff1', password='pass', role='staff', business=self.business)
+        owner = CustomUser.objects.create_user(username='owner', password='pass', role='business_owner',
+                                               business=self.business)
+        owner = CustomUser.objects.get(pk=owner.pk)
+        owner.first_name = 'Anil'
+        owner.save()
+        owner.role = 'staff'
+        with self.assertRaises(ValidationError):
+            owner.save()
+
+    def test_bill_edits_outside_the_totals_skip_the_rollups(self):
+        vehicle = Vehicle.objects.get()
+        create_bill(self.business, vehicle, date(2025, 6, 1), 1000)
+        bill = Bill.objects.get()
+        bill.notes = 'Delivered late'
+        queries = self.save_queries(bill)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('billdailyrollup', ' '.join(queries).lower())
+
+        bill.rent_amount = 1500
+        bill.save()
+        self.assertEqual(Bill.objects.get().pending_amount, 1500)
+        self.assertEqual(BillDailyRollup.objects.get().rent_amount, 1500)
+
+        # Moving the bill to another day is tracked without re-reading it
+        bill.bill_date = date(2025, 6, 2)
+        bill.save()
+        self.assertEqual(list(BillDailyRollup.objects.values_list('bill_date', flat=True)), [date(2025, 6, 2)])
+
+
+class UniqueConstraintTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = create_business('ACME')
+        cls.other = create_business('ZETA')
+        cls.owner = VehicleOwner.objects.create(business=cls.business, owner_name='Ramesh', owner_mobile_number='9000000001')
+        Vehicle.objects.create(business=cls.business, owner=cls.owner, vehicle_number='MH12AB1234')
+        Party.objects.create(business=cls.business, name='Shree Traders', mobile='9000000002', gst_no='27ABCDE1234F1Z5')
+        Driver.objects.create(business=cls.business, driver_name='Suresh', mobile='9000000003')
+
+    def setUp(self):
+        caches['default'].clear()
+
+    def assertDuplicate(self, instance, fields, message):
+        with self.assertRaises(ValidationError) as raised:
+            instance.save()
+        self.assertEqual(set(raised.exception.message_dict), set(fields))
+        self.assertIn(message, raised.exception.message_dict[fields[0]][0])
+        # The surrounding transaction is still usable
+        self.assertTrue(Business.objects.exists())
+
+    def test_violations_become_field_errors(self):
+        self.assertDuplicate(
+            Party(business=self.business, name='Shree Traders', mobile='9000000002'),
+            ['mobile', 'name'], 'already exists in your business'
+        )
+        self.assertDuplicate(
+            Party(business=self.other, name='Other Traders', gst_no='27abcde1234f1z5'),
+            ['gst_no'], 'GST number 27ABCDE1234F1Z5 is already registered'
+        )
+        self.assertDuplicate(
+            Driver(business=self.business, driver_name='Mahesh', mobile='9000000003'),
+            ['mobile'], 'already registered as primary mobile'
+        )
+        self.assertDuplicate(
+            VehicleOwner(business=self.business, owner_name='Ramesh', owner_mobile_number='9000000001'),
+            ['owner_mobile_number', 'owner_name'], 'already exists in your business'
+        )
+        self.assertDuplicate(
+            Vehicle(business=self.business, vehicle_number='mh12ab1234'),
+            ['vehicle_number'], 'already registered in your business (Owner: Ramesh)'
+        )
+        # The failed vehicle gave its slot back
+        self.assertEqual(Business.objects.get(pk=self.business.pk).vehicle_count, 1)
+
+        # Other businesses may reuse numbers
+        Vehicle.objects.create(business=self.other, vehicle_number='MH12AB1234')
+        Driver.objects.create(business=self.other, driver_name='Mahesh', mobile='9000000003')
+
+    def test_saves_run_no_duplicate_lookups(self):
+        with CaptureQueriesContext(connection) as queries:
+            Party.objects.create(business=self.business, name='New Traders', mobile='9000000009')
+            Vehicle.objects.create(business=self.business, vehicle_number='MH12AB9999')
+        self.assertFalse([query['sql'] for query in queries if query['sql'].startswith('SELECT')])
+
+    def test_admin_shows_constraint_errors_on_the_form(self):
+        user = CustomUser.objects.create_user(
+            username='owner', password='pass', role='business_owner', business=self.business, is_staff=True
+        )
+        self.client.force_login(user)
+        response = self.client.post('/admin/AdminApp/party/add/', {
+            'name': 'Shree Traders', 'mobile': '9000000002',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.context['adminform'].form.errors['mobile'],
+            ['A party with name "Shree Traders" and mobile number 9000000002 already exists in your business.']
+        )
+        self.assertEqual(Party.objects.filter(business=self.business).count(), 1)
+
+        response = self.client.post('/admin/AdminApp/party/add/', {'name': 'New Traders', 'mobile': '9000000009'})
+        self.assertEqual(response.status_code, 302)
+
+
+class VehicleLookupTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = create_business('ACME')
+        cls.vehicle = Vehicle.objects.create(business=cls.business, vehicle_number='MH 12 ab 1234')
+        cls.longer = Vehicle.objects.create(business=cls.business, vehicle_number='MH12AB12345')
+        Vehicle.objects.create(business=cls.business, vehicle_number='MH14XY9999')
+        cls.other_vehicle = Vehicle.objects.create(business=create_business('ZETA'), vehicle_number='MH12AB1234')
+        cls.user = CustomUser.objects.create_user(
+            username='owner', password='pass', role='business_owner', business=cls.business, is_staff=True
+        )
+
+    def setUp(self):
+        caches['default'].clear()
+
+    def test_numbers_are_stored_normalized(self):
+        self.vehicle.refresh_from_db()
+        self.assertEqual(self.vehicle.vehicle_number, 'MH12AB1234')
+        self.assertEqual(self.vehicle.vehicle_key, 'MH12AB1234')
+
+        # The key is computed by the database, whatever was written
+        Vehicle.objects.filter(pk=self.longer.pk).update(vehicle_number='mh-12/ab.12345')
+        self.longer.refresh_from_db()
+        self.assertEqual(self.longer.vehicle_key, 'MH12AB12345')
+
+    def test_any_spelling_finds_the_vehicle(self):
+        for number in ('MH 12 AB 1234', 'mh12ab1234', 'MH12-AB-1234'):
+            with self.subTest(number=number):
+                self.assertEqual(list(lookup_vehicles(self.business, number)), [self.vehicle, self.longer])
+        self.assertEqual(list(lookup_vehicles(self.business, 'mh 12')), [self.vehicle, self.longer])
+        self.assertFalse(lookup_vehicles(self.business, ' - '))
+
+    def test_lookups_use_the_business_key_index(self):
+        plan = lookup_vehicles(self.business, 'MH 12-AB').explain()
+        self.assertIn('USING', plan)
+        self.assertIn('vehicle_key>? AND vehicle_key<?', plan)
+        self.assertNotIn('SCAN', plan)
+
+    def test_spellings_of_a_number_are_duplicates(self):
+        with self.assertRaises(ValidationError) as raised:
+            Vehicle.objects.create(business=self.business, vehicle_number='MH12-AB-1234')
+        self.assertIn('already registered in your business', raised.exception.message_dict['vehicle_number'][0])
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Vehicle.objects.filter(pk=self.longer.pk).update(vehicle_number='mh 12 ab 1234')
+
+    def test_bulk_rows_name_vehicles_by_number(self):
+        party = Party.objects.create(business=self.business, name='Shree Traders')
+        row = {'party': party.pk, 'bill_date': '2025-06-01', 'from_location': 'Pune',
+               'to_location': 'Mumbai', 'rent_amount': '1000'}
+        result = create_bills(self.business, [
+            {**row, 'vehicle_number': 'mh 12-ab 1234'},
+            {**row, 'vehicle_number': 'MH99ZZ0000'},
+            {**row, 'vehicle_number': 'MH12AB1234', 'vehicle': self.vehicle.pk},
+        ])
+        self.assertEqual([bill.vehicle_id for bill in result.created], [self.vehicle.pk])
+        self.assertEqual(result.errors, {
+            1: {'vehicle': ['No vehicle MH99ZZ0000 in this business.']},
+            2: {'vehicle': ['Give either vehicle or vehicle_number, not both.']},
+        })
+
+    def test_lookup_api(self):
+        self.client.force_login(self.user)
+        response = self.client.get('/api/vehicles/lookup/', {'q': 'mh12-ab'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [vehicle['id'] for vehicle in response.json()['vehicles']], [self.vehicle.pk, self.longer.pk]
+        )
+        response = self.client.get('/api/vehicles/lookup/', {'q': 'MH 12 AB 1234', 'limit': '1'})
+        self.assertEqual([vehicle['vehicle_number'] for vehicle in response.json()['vehicles']], ['MH12AB1234'])
+
+    def test_bill_form_looks_vehicles_up_on_demand(self):
+        self.client.force_login(self.user)
+        response = self.client.get('/admin/AdminApp/bill/add/')
+        self.assertContains(response, '/api/vehicles/lookup/')
+        self.assertNotContains(response, 'MH14XY9999')
+
+        bill = create_bill(self.business, self.vehicle, date(2025, 6, 1), 1000)
+        response = self.client.get(f'/admin/AdminApp/bill/{bill.pk}/change/')
+        self.assertContains(response, f'<option value="{self.vehicle.pk}" selected>')
+        self.assertNotContains(response, 'MH12AB12345')
+
+    def test_admin_search_matches_spelled_numbers(self):
+        create_bill(self.business, self.vehicle, date(2025, 6, 1), 1000)
+        create_bill(self.other_vehicle.business, self.other_vehicle, date(2025, 6, 1), 1000)
+        self.client.force_login(self.user)
+        response = self.client.get('/admin/AdminApp/bill/', {'q': 'MH 12 AB 1234'})
+        self.assertEqual(response.context['cl'].result_count, 1)
+        response = self.client.get('/admin/AdminApp/vehicle/', {'q': 'mh12-ab'})
+        self.assertEqual(
+            set(response.context['cl'].result_list), {self.vehicle, self.longer}
+        )
+
+        # Any part of the number still matches, like the old icontains on vehicle_number
+        response = self.client.get('/admin/AdminApp/bill/', {'q': 'ab-1234'})
+        self.assertEqual(response.context['cl'].result_count, 1)
+        response = self.client.get('/admin/AdminApp/vehicle/', {'q': '1234'})
+        self.assertEqual(
+            set(response.context['cl'].result_list), {self.vehicle, self.longer}
+        )
+
+
+class VehicleNumberMigrationTests(TransactionTestCase):
+    """Numbers renamed by migrations 0020 and 0021 still fit Vehicle.vehicle_number"""
+
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.migrate([('AdminApp', target)])
+        return executor.loader.project_state(('AdminApp', target)).apps
+
+    def tearDown(self):
+        call_command('migrate', 'AdminApp', verbosity=0)
+
+    def test_long_duplicate_numbers_are_cut_to_fit(self):
+        apps = self.migrate('0019_business_quota_counters')
+        business = apps.get_model('AdminApp', 'Business').objects.create(
+            business_name='ACME Transport', business_label='ACME', mobile_number='9876543210'
+        )
+        Vehicle = apps.get_model('AdminApp', 'Vehicle')
+        for number in ('MH12AB1234567890ABCD', 'MH12AB1234567890ABCD', 'mh12ab1234567890abc', 'MH12AB1234567890ABC'):
+            Vehicle.objects.create(business=business, vehicle_number=number)
+
+        apps = self.migrate('0021_vehicle_vehicle_key')
+        numbers = apps.get_model('AdminApp', 'Vehicle').objects.order_by('pk').values_list('vehicle_number', flat=True)
+        # The same number is renamed by 0020, numbers only differing by case by 0021
+        self.assertEqual(list(numbers), [
+            'MH12AB1234567890ABCD', 'MH12AB1234567890DUP2', 'mh12ab1234567890abc', 'MH12AB1234567890DUP3',
+        ])
+
+
+class BusinessQuotaTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = create_business('ACME', max_vehicles=2, max_staff_users=1)
+        cls.other = create_business('ZETA')
+
+    def counters(self, business=None):
+        return Business.objects.values_list('vehicle_count', 'staff_count').get(pk=(business or self.business).pk)
+
+    def test_vehicle_counter_follows_creates_moves_and_deletes(self):
+        first = Vehicle.objects.create(business=self.business, vehicle_number='MH12AB0001')
+        Vehicle.objects.create(business=self.business, vehicle_number='MH12AB0002')
+        self.assertEqual(self.counters(), (2, 0))
+
+        with self.assertRaisesMessage(ValidationError, 'Maximum limit of 2'):
+            Vehicle.objects.create(business=self.business, vehicle_number='MH12AB0003')
+        self.assertEqual((self.counters(), Vehicle.objects.count()), ((2, 0), 2))
+
+        first.business = self.other
+        first.save()
+        self.assertEqual((self.counters(), self.counters(self.other)), ((1, 0), (1, 0)))
+
+        Vehicle.objects.filter(business=self.other).delete()
+        self.assertEqual(self.counters(self.other), (0, 0))
+
+    def test_staff_counter_follows_role_and_activity(self):
+        staff = CustomUser.objects.create_user(username='staff1', password='pass', role='staff', business=self.business)
+        self.assertEqual(self.counters(), (0, 1))
+        with self.assertRaisesMessage(ValidationError, 'Staff limit reached'):
+            CustomUser.objects.create_user(username='staff2', password='pass', role='staff', business=self.business)
+
+        staff.is_active_staff = False
+        staff.save()
+        self.assertEqual(self.counters(), (0, 0))
+        other = CustomUser.objects.create_user(username='staff2', password='pass', role='staff', business=self.business)
+        other.delete()
+        self.assertEqual(self.counters(), (0, 0))
+
+        # Owners and admins do not take staff slots
+        CustomUser.objects.create_user(username='owner', password='pass', role='business_owner', business=self.business)
+        self.assertEqual(self.counters(), (0, 0))
+
+    def test_limit_checks_read_the_counters(self):
+        Vehicle.objects.create(business=self.business, vehicle_number='MH12AB0001')
+        business = Business.objects.get(pk=self.business.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(business.can_add_vehicle())
+            self.assertTrue(business.can_add_staff())
+
+    def test_reconcile_command_repairs_drift(self):
+        Vehicle.objects.create(business=self.business, vehicle_number='MH12AB0001')
+        CustomUser.objects.create_user(username='staff1', password='pass', role='staff', business=self.business)
+        Business.objects.filter(pk=self.business.pk).update(vehicle_count=5, staff_count=0)
+
+        with self.assertRaises(CommandError):
+            call_command('reconcile_business_quotas', verify=True, stdout=StringIO())
+        call_command('reconcile_business_quotas', stdout=StringIO())
+        self.assertEqual(self.counters(), (1, 1))
+        call_command('reconcile_business_quotas', verify=True, stdout=StringIO())
+
+
+class BusinessQuotaConcurrencyTests(FileDatabaseTestCase):
+    THREADS = 8
+    LIMIT = 3
+
+    def run_in_threads(self, add):
+        """Call add(i) from THREADS threads at once, return the errors raised"""
+        barrier = threading.Barrier(self.THREADS)
+        errors = []
+
+        def worker(index):
+            try:
+                barrier.wait()
+                add(index)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return errors
+
+    def test_concurrent_vehicle_adds_stop_at_the_limit(self):
+        business = create_business('ACME', max_vehicles=self.LIMIT)
+        errors = self.run_in_threads(
+            lambda index: Vehicle.objects.create(business=business, vehicle_number=f'MH12AB{index:04d}')
+        )
+
+        self.assertEqual(len(errors), self.THREADS - self.LIMIT)
+        self.assertTrue(all(isinstance(error, ValidationError) for error in errors))
+        self.assertEqual(Vehicle.objects.filter(business=business).count(), self.LIMIT)
+        self.assertEqual(Business.objects.get(pk=business.pk).vehicle_count, self.LIMIT)
+
+    def test_concurrent_staff_adds_stop_at_the_limit(self):
+        business = create_business('ACME', max_staff_users=self.LIMIT)
+        errors = self.run_in_threads(
+            lambda index: CustomUser.objects.create_user(
+                username=f'staff{index}', password='pass', role='staff', business=business
+            )
+        )
+
+        self.assertEqual(len(errors), self.THREADS - self.LIMIT)
+        self.assertTrue(all(isinstance(error, ValidationError) for error in errors))
+        self.assertEqual(CustomUser.objects.filter(business=business).count(), self.LIMIT)
+        self.assertEqual(Business.objects.get(pk=business.pk).staff_count, self.LIMIT)
+
+
+@override_settings(SQLITE_WRITE_QUEUE=True)
+class QueuedBusinessQuotaConcurrencyTests(BusinessQuotaConcurrencyTests):
+    """The same races with the vehicle saves going through the write queue"""
+
+
+@override_settings(SQLITE_WRITE_QUEUE=True)
+class WriteQueueTests(FileDatabaseTestCase):
+
+    def test_queue_options_use_wal_and_immediate_transactions(self):
+        wrapper = connections['default'].__class__({**connection.settings_dict, 'OPTIONS': settings.SQLITE_WRITE_QUEUE_OPTIONS})
+        try:
+            with wrapper.cursor() as cursor:
+                self.assertEqual(cursor.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+                self.assertEqual(cursor.execute('PRAGMA synchronous').fetchone()[0], 1)
+            self.assertEqual(wrapper.transaction_mode, 'IMMEDIATE')
+        finally:
+            wrapper.close()
+
+    def test_concurrent_bills_are_committed_in_batches(self):
+        business = create_business('ACME')
+        vehicle = Vehicle.objects.create(business=business, vehicle_number='MH12AB1234')
+        writer = get_write_queue()
+        batches, writes = writer.batches, writer.writes
+        barrier = threading.Barrier(8)
+        errors = []
+
+        def worker():
+            try:
+                barrier.wait()
+                for _ in range(5):
+                    create_bill(business, vehicle, date(2025, 6, 1), 1000)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(set(Bill.objects.values_list('bill_number', flat=True))), 40)
+        self.assertEqual(writer.writes - writes, 40)
+        self.assertLess(writer.batches - batches, 40)
+        self.assertEqual(verify_business_rollups(business.pk), [])
+
+    def test_failed_writes_only_roll_back_themselves(self):
+        def fail():
+            create_business('FAIL')
+            raise ValueError('rejected')
+
+        writer = get_write_queue()
+        failing = writer.submit(fail)
+        passing = writer.submit(lambda: create_business('PASS').pk)
+        with self.assertRaisesMessage(ValueError, 'rejected'):
+            failing.result()
+        self.assertEqual(list(Business.objects.values_list('pk', flat=True)), [passing.result()])
+
+    def test_admin_forms_only_send_the_save_to_the_writer(self):
+        business = create_business('ACME')
+        Party.objects.create(business=business, name='Om Logistics', gst_no='27ABCDE1234F1Z5')
+        user = CustomUser.objects.create_user(
+            username='owner', password='pass', role='business_owner', business=business, is_staff=True
+        )
+        self.client.force_login(user)
+        party_admin = type(admin_site._registry[Party])
+        response_add = party_admin.response_add
+        threads = []
+
+        def record_response_add(model_admin, request, obj, *args):
+            threads.append(threading.current_thread())
+            return response_add(model_admin, request, obj, *args)
+
+        writer = get_write_queue()
+        writes = writer.writes
+        with patch.object(party_admin, 'response_add', record_response_add):
+            response = self.client.post('/admin/AdminApp/party/add/', {'name': 'Shree Traders'})
+        self.assertEqual(response.status_code, 302)
+        # The redirect was built on the request thread, the save ran on the writer
+        self.assertEqual(threads, [threading.current_thread()])
+        self.assertGreater(writer.writes, writes)
+        self.assertTrue(Party.objects.filter(business=business, name='Shree Traders').exists())
+
+        # A save rejected by a unique constraint shows the form again
+        response = self.client.post('/admin/AdminApp/party/add/', {'name': 'Copy', 'gst_no': '27ABCDE1234F1Z5'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['adminform'].form.errors)
+        self.assertFalse(Party.objects.filter(name='Copy').exists())
+
+    def test_writes_in_a_transaction_stay_on_the_calling_thread(self):
+        with transaction.atomic():
+            self.assertIs(run_serialized(threading.current_thread), threading.current_thread())
+        self.assertIsNot(run_serialized(threading.current_thread), threading.current_thread())
+
+
+class BillSequenceConcurrencyTests(FileDatabaseTestCase):
+    THREADS = 8
+    BILLS_PER_THREAD = 250
+
+    def test_parallel_saves_have_no_gaps_or_duplicates(self):
+        business = create_business('ACME')
+        vehicle = Vehicle.objects.create(business=business, vehicle_number='MH12AB1234')
+        errors = []
+
+        def save_bills():
+            try:
+                for number in range(self.BILLS_PER_THREAD):
+                    create_bill(business, vehicle, date(2025, 6, 1) + timedelta(days=number % 30), 100)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=save_bills) for i in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        total = self.THREADS * self.BILLS_PER_THREAD
+        numbers = sorted(Bill.objects.filter(business=business).values_list('bill_number', flat=True))
+        self.assertEqual(numbers, [f'ACM-{number:04d}' for number in range(1, total + 1)])
+        self.assertEqual(BillSequence.objects.get(business=business).last_number, total)
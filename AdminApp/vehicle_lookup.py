@@ -0,0 +1,30 @@
+from .models import Vehicle, normalize_vehicle_number
+
+
+DEFAULT_LOOKUP_LIMIT = 10
+
+
+def vehicle_key_prefix_filter(query):
+    """Filter kwargs matching vehicle keys starting with the normalized query, or None
+
+    A range on vehicle_key instead of LIKE, so the (business, vehicle_key)
+    index of unique_vehicle_key_business serves it on every database.
+    """
+    key = normalize_vehicle_number(query)
+    if not key:
+        return None
+    return {'vehicle_key__gte': key, 'vehicle_key__lt': key[:-1] + chr(ord(key[-1]) + 1)}
+
+
+def lookup_vehicles(business, query, limit=DEFAULT_LOOKUP_LIMIT):
+    """Vehicles of a business whose number starts with query, the exact match first"""
+    prefix = vehicle_key_prefix_filter(query)
+    if prefix is None:
+        return Vehicle.objects.none()
+    return Vehicle.objects.filter(business=business, **prefix).order_by('vehicle_key')[:limit]
+
+
+def vehicle_key_map(business):
+    """{vehicle_key: id} of all vehicles of a business, for resolving numbers in bulk"""
+    return dict(Vehicle.objects.filter(business=business).values_list('vehicle_key', 'pk'))
+
@@ -175,16 +175,34 @@ def bills_print_view(request):
 
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.db.models import Count, Sum, Avg, Q
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import require_POST
+from asgiref.sync import sync_to_async
 from datetime import timedelta, datetime
+from functools import partial
+import hashlib
 import json
-from .models import Business, Bill, Vehicle, Party, Driver, VehicleOwner
-from django.contrib.admin.models import LogEntry
+from .models import Business, Bill, BillDailyRollup
+from .activity import get_activity_page
+from .bulk_bills import create_bills
+from .bulk_actions import get_bulk_progress
+from .payments import record_payments
+from .vehicle_lookup import DEFAULT_LOOKUP_LIMIT, lookup_vehicles
+from .filter_choices import CHOICE_FIELDS, get_filter_choices
+from django.core.paginator import Paginator
+from .dashboard import GRANULARITIES, build_revenue_series, get_rollup_metrics, get_dashboard_metrics
+from .dashboard import OVERVIEW_DEFAULT_SORT, OVERVIEW_SORT_FIELDS, get_business_overview
+from .dashboard_cache import get_cached_dashboard_data, get_business_version, get_cache_stats
+from .concurrency import run_concurrently, arun_concurrently
+from .leaderboards import get_top_entries, get_live_top_entries
 
  
-@login_required
-def report_dashboard(request):
+def get_dashboard_params(request):
+    """Business, businesses, date range and granularity requested for a dashboard"""
     # Get business context based on user role
     if request.user.is_system_admin:
         businesses = Business.objects.all()
@@ -197,12 +215,24 @@ def report_dashboard(request):
         business = request.user.business
         businesses = Business.objects.filter(pk=business.pk) if business else Business.objects.none()
 
-    if not business:
-        return render(request, 'admin/report_dashboard.html', {
-            'error': 'No business associated with your account'
-        })
+    start_date, end_date = get_date_range(request)
+
+    # Chart bucket size, picked from the date span unless given explicitly
+    granularity = request.GET.get('granularity')
+    if granularity not in GRANULARITIES:
+        granularity = None
+
+    return {
+        'business': business,
+        'businesses': businesses,
+        'start_date': start_date,
+        'end_date': end_date,
+        'granularity': granularity,
+    }
+
 
-    # Date filters
+def get_date_range(request):
+    """start_date and end_date from the query string, defaulting to the last 30 days"""
     today = timezone.now().date()
     
     # Get start_date from request or default to 30 days ago
@@ -225,111 +255,383 @@ def report_dashboard(request):
     else:
         end_date = today
 
-    # Get filtered bills
-    bills = Bill.objects.filter(
-        business=business,
-        bill_date__range=[start_date, end_date]
+    return start_date, end_date
+
+
+def get_dashboard_block(block, business, start_date, end_date, granularity=None):
+    """One metric or chart block, cached until the business data changes"""
+    return get_cached_dashboard_data(
+        business, start_date, end_date,
+        lambda: compute_dashboard_block(block, business, start_date, end_date, granularity),
+        block, granularity or 'auto',
     )
 
-    # Key Metrics
-    total_bills = bills.count()
-    total_revenue = bills.aggregate(Sum('rent_amount'))['rent_amount__sum'] or 0
-    total_advance = bills.aggregate(Sum('advance_amount'))['advance_amount__sum'] or 0
-    total_pending = bills.aggregate(Sum('pending_amount'))['pending_amount__sum'] or 0
-    total_commission = bills.aggregate(Sum('commission_charge'))['commission_charge__sum'] or 0
-    total_commission_received = bills.aggregate(Sum('commission_received'))['commission_received__sum'] or 0
-    total_commission_pending = bills.aggregate(Sum('commission_pending'))['commission_pending__sum'] or 0
-
-    # Quick Stats
-    total_vehicles = Vehicle.objects.filter(business=business).count()
-    total_parties = Party.objects.filter(business=business).count()
-    total_drivers = Driver.objects.filter(business=business).count()
-    total_owners = VehicleOwner.objects.filter(business=business).count()
-
-    # Payment Status Distribution
-    payment_status_data = {
-        'Paid': bills.filter(pending_amount=0).count(),
-        'Partially Paid': bills.filter(advance_amount__gt=0, pending_amount__gt=0).count(),
-        'Pending': bills.filter(advance_amount=0, pending_amount__gt=0).count()
-    }
 
-    # Recent Activity
-    recent_bills = bills.order_by('-bill_date')[:10]
+@login_required
+def report_dashboard(request):
+    params = get_dashboard_params(request)
+    business = params['business']
+    start_date, end_date = params['start_date'], params['end_date']
 
-    # Generate Chart Data for Chart.js
-    chart_data = {
-        'revenue_chart_data': get_revenue_chart_data(bills, start_date, end_date),
-        'payment_status_chart_data': get_payment_status_chart_data(payment_status_data),
-        'vehicle_performance_data': get_vehicle_performance_data(bills),
-        'party_activity_data': get_party_activity_data(bills),
-    }
-    recent_actions = LogEntry.objects.select_related('content_type', 'user')[:10]
+    if not business:
+        return render(request, 'admin/report_dashboard.html', {
+            'error': 'No business associated with your account'
+        })
+
+    # Charts are loaded by the page from dashboard_data_api, only metrics are rendered here.
+    # Metrics and Recent Activity are independent, so they are queried concurrently.
+    results = run_concurrently({
+        'metrics': partial(get_dashboard_block, 'metrics', business, start_date, end_date),
+        'recent_bills': lambda: list(Bill.objects.filter(
+            business=business,
+            bill_date__range=[start_date, end_date]
+        ).select_related('party').order_by('-bill_date')[:10]),
+        'recent_actions': partial(get_activity_page, business, limit=RECENT_ACTIVITY_SIZE),
+    })
+    metrics = results['metrics']
+    recent_bills = results['recent_bills']
+    recent_actions, activity_cursor = results['recent_actions']
 
     context = {
         'business': business,
-        'businesses': businesses,
+        'businesses': params['businesses'],
         'start_date': start_date.strftime('%Y-%m-%d'),
         'end_date': end_date.strftime('%Y-%m-%d'),
+        'granularity': params['granularity'] or '',
+        'granularity_choices': list(GRANULARITIES),
         
-        # Key Metrics
-        'total_bills': total_bills,
-        'total_revenue': total_revenue,
-        'total_advance': total_advance,
-        'total_pending': total_pending,
-        'total_commission': total_commission,
-        'total_commission_received': total_commission_received,
-        'total_commission_pending': total_commission_pending,
-        
-        # Quick Stats
-        'total_vehicles': total_vehicles,
-        'total_parties': total_parties,
-        'total_drivers': total_drivers,
-        'total_owners': total_owners,
+        # Key Metrics and Quick Stats
+        **metrics,
         
         # Chart Data
-        'chart_data_json': json.dumps(chart_data),
+        'chart_blocks': CHART_BLOCKS,
         'recent_actions': recent_actions,
+        'activity_cursor': activity_cursor,
+        'cache_stats': get_cache_stats() if request.user.is_system_admin else None,
         # Recent Activity
         'recent_bills': recent_bills,
-        'payment_status_data': payment_status_data,
 
     }
     
     return render(request, 'admin/report_dashboard.html', context)
 
-def get_revenue_chart_data(bills, start_date, end_date):
-    """Generate revenue chart data for Chart.js"""
+
+RECENT_ACTIVITY_SIZE = 10
+
+
+@login_required
+def activity_feed_api(request):
+    """JSON pages of a business activity feed, older pages via ?cursor=<next_cursor>"""
+    params = get_dashboard_params(request)
+    business = params['business']
+    if not business:
+        return JsonResponse({'error': 'No business associated with your account'}, status=404)
+
+    entries, next_cursor = get_activity_page(business, request.GET.get('cursor'), RECENT_ACTIVITY_SIZE)
+    return JsonResponse({
+        'business': business.pk,
+        'entries': [
+            {
+                'id': entry.pk,
+                'action': entry.get_action_display(),
+                'object': entry.object_repr,
+                'model': entry.content_type.name if entry.content_type else None,
+                'count': entry.object_count,
+                'message': entry.message,
+                'user': entry.user.username if entry.user else None,
+                'created_at': entry.created_at.isoformat(),
+            }
+            for entry in entries
+        ],
+        'next_cursor': next_cursor,
+    })
+
+
+@login_required
+@require_POST
+def bulk_bill_create_api(request):
+    """Create many bills from a JSON body {"bills": [{...}, ...]}
+
+    Rows that fail validation are returned in "errors" by index; the rest are
+    created. System admins pick the business with ?business=<id>.
+    """
+    params = get_dashboard_params(request)
+    business = params['business']
+    if not business:
+        return JsonResponse({'error': 'No business associated with your account'}, status=404)
+
     try:
-        # Create date range
-        date_range = []
-        current_date = start_date
-        while current_date <= end_date:
-            date_range.append(current_date.strftime('%Y-%m-%d'))
-            current_date += timedelta(days=1)
-        
-        # Aggregate revenue by date
-        daily_data = bills.values('bill_date').annotate(
-            daily_revenue=Sum('rent_amount'),
-            daily_advance=Sum('advance_amount')
-        ).order_by('bill_date')
-        
-        # Create data arrays
-        revenue_data = [0] * len(date_range)
-        advance_data = [0] * len(date_range)
-        
-        for data in daily_data:
-            date_str = data['bill_date'].strftime('%Y-%m-%d')
-            if date_str in date_range:
-                index = date_range.index(date_str)
-                revenue_data[index] = float(data['daily_revenue'] or 0)
-                advance_data[index] = float(data['daily_advance'] or 0)
+        rows = json.loads(request.body)['bills']
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'error': 'Expected a JSON object with a "bills" list'}, status=400)
+    if not isinstance(rows, list):
+        return JsonResponse({'error': 'Expected a JSON object with a "bills" list'}, status=400)
+
+    result = create_bills(business, rows, user=request.user)
+    return JsonResponse(result.as_dict(), status=201 if result.created else 400)
+
+
+@login_required
+@require_POST
+def bill_payments_api(request):
+    """Record rent and commission payments from a JSON body {"payments": [{...}, ...]}
+
+    All payments are recorded or, if any row is invalid, none; the errors are
+    returned by row index. System admins pick the business with ?business=<id>.
+    """
+    params = get_dashboard_params(request)
+    business = params['business']
+    if not business:
+        return JsonResponse({'error': 'No business associated with your account'}, status=404)
+
+    try:
+        rows = json.loads(request.body)['payments']
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'error': 'Expected a JSON object with a "payments" list'}, status=400)
+    if not isinstance(rows, list):
+        return JsonResponse({'error': 'Expected a JSON object with a "payments" list'}, status=400)
+
+    payments, errors = record_payments(business, rows, user=request.user)
+    if errors:
+        return JsonResponse({'errors': [{'row': row, 'errors': row_errors} for row, row_errors in errors.items()]}, status=400)
+    return JsonResponse({
+        'created': [
+            {'id': payment.pk, 'bill': payment.bill_id, 'kind': payment.kind, 'amount': str(payment.amount)}
+            for payment in payments
+        ],
+    }, status=201)
+
+
+@login_required
+def bulk_action_progress_api(request):
+    """Progress of the user's latest chunked admin bulk action, for polling while it runs"""
+    progress = get_bulk_progress(request.user.pk)
+    if progress is None:
+        return JsonResponse({'error': 'No bulk action in progress'}, status=404)
+    return JsonResponse(progress)
+
+
+@login_required
+def vehicle_lookup_api(request):
+    """Vehicles of a business whose number starts with ?q=, for bill entry and search boxes
+
+    "MH 12 AB", "mh12ab" and "MH12-AB" give the same results; an exact match comes first.
+    """
+    params = get_dashboard_params(request)
+    business = params['business']
+    if not business:
+        return JsonResponse({'error': 'No business associated with your account'}, status=404)
+
+    try:
+        limit = min(int(request.GET.get('limit', DEFAULT_LOOKUP_LIMIT)), 50)
+    except ValueError:
+        limit = DEFAULT_LOOKUP_LIMIT
+    vehicles = lookup_vehicles(business, request.GET.get('q', ''), max(limit, 1))
+    return JsonResponse({
+        'business': business.pk,
+        'vehicles': [
+            {
+                'id': vehicle.pk,
+                'vehicle_number': vehicle.vehicle_number,
+                'vehicle_name': vehicle.vehicle_name,
+            }
+            for vehicle in vehicles
+        ],
+    })
+
+
+@login_required
+def filter_choices_api(request, field):
+    """Choices of a changelist filter matching ?q=, searched on demand by the filter's select box
+
+    Business users only get their business's objects. The response is in
+    select2's {"results": [{"id", "text"}]} format.
+    """
+    if field not in CHOICE_FIELDS:
+        return JsonResponse({'error': f'Unknown filter "{field}"'}, status=404)
+    return JsonResponse({'results': get_filter_choices(field, request.user, request.GET.get('q', ''))})
+
+
+OVERVIEW_PAGE_SIZE = 50
+
+OVERVIEW_COLUMNS = (
+    ('business_name', 'Business'),
+    ('total_bills', 'Bills'),
+    ('total_revenue', 'Revenue'),
+    ('total_pending', 'Pending'),
+    ('total_commission', 'Commission'),
+    ('total_commission_pending', 'Commission Pending'),
+)
+
+
+@login_required
+def business_overview(request):
+    """Bill totals of every business side by side, for system admins"""
+    if not request.user.is_system_admin:
+        raise PermissionDenied
+
+    start_date, end_date = get_date_range(request)
+    sort = request.GET.get('sort', OVERVIEW_DEFAULT_SORT)
+    if sort.lstrip('-') not in OVERVIEW_SORT_FIELDS:
+        sort = OVERVIEW_DEFAULT_SORT
+
+    paginator = Paginator(get_business_overview(start_date, end_date, sort), OVERVIEW_PAGE_SIZE)
+    page = paginator.get_page(request.GET.get('page'))
+
+    # Clicking the sorted column flips its direction, other columns sort descending
+    columns = []
+    for key, label in OVERVIEW_COLUMNS:
+        sorted_desc = sort == f'-{key}'
+        columns.append({
+            'label': label,
+            'sorted': sort.lstrip('-') == key,
+            'descending': sorted_desc,
+            'sort': key if sorted_desc else f'-{key}',
+        })
+
+    context = {
+        'title': 'Business Overview',
+        'columns': columns,
+        'start_date': start_date.strftime('%Y-%m-%d'),
+        'end_date': end_date.strftime('%Y-%m-%d'),
+        'sort': sort,
+        'page': page,
+        'rows': page.object_list,
+    }
+    return render(request, 'admin/business_overview.html', context)
+
+
+def dashboard_data_etag(params, block):
+    """ETag of a dashboard API response, known without computing the data"""
+    business = params['business']
+    version = get_business_version(business.pk)
+    raw = (
+        f"{business.pk}:{version}:{block or 'all'}:{params['start_date']}:"
+        f"{params['end_date']}:{params['granularity'] or 'auto'}"
+    )
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+
+@login_required
+@cache_control(private=True, no_cache=True)
+async def dashboard_data_api(request):
+    """JSON metric and chart blocks for the report dashboard
+
+    ?block=<name> returns a single block, otherwise every block is returned.
+    Clients sending If-None-Match get a 304 while the business is unchanged.
+    The blocks are awaited concurrently on the bounded dashboard pool.
+    """
+    # Loaded by login_required already, don't let request.user load it again
+    request.user = await request.auser()
+    params = await sync_to_async(get_dashboard_params)(request)
+    business = params['business']
+    if not business:
+        return JsonResponse({'error': 'No business associated with your account'}, status=404)
+
+    block = request.GET.get('block')
+    if block and block not in DASHBOARD_BLOCKS:
+        return JsonResponse({'error': f'Unknown block "{block}"'}, status=400)
+
+    etag = await sync_to_async(dashboard_data_etag)(params, block)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        blocks = [block] if block else DASHBOARD_BLOCKS
+        data = await acompute_dashboard(
+            business, params['start_date'], params['end_date'], params['granularity'], blocks
+        )
+        response = JsonResponse({
+            'business': business.pk,
+            'start_date': params['start_date'].strftime('%Y-%m-%d'),
+            'end_date': params['end_date'].strftime('%Y-%m-%d'),
+            'blocks': data,
+        })
+    response.headers.setdefault('ETag', etag)
+    return response
+
+
+CHART_BLOCKS = (
+    'revenue_chart_data',
+    'payment_status_chart_data',
+    'vehicle_performance_data',
+    'party_activity_data',
+)
+DASHBOARD_BLOCKS = ('metrics',) + CHART_BLOCKS
+
+# Length of the vehicle and party charts
+TOP_VEHICLES = 10
+TOP_PARTIES = 8
+
+
+def dashboard_queries(business, start_date, end_date, granularity=None, blocks=DASHBOARD_BLOCKS):
+    """Independent dashboard block queries as name -> callable"""
+    return {
+        name: partial(get_dashboard_block, name, business, start_date, end_date, granularity)
+        for name in blocks
+    }
+
+
+def compute_dashboard(business, start_date, end_date, granularity=None, blocks=DASHBOARD_BLOCKS):
+    """Every dashboard block, one query after another"""
+    return {name: query() for name, query in dashboard_queries(
+        business, start_date, end_date, granularity, blocks
+    ).items()}
+
+
+async def acompute_dashboard(business, start_date, end_date, granularity=None, blocks=DASHBOARD_BLOCKS):
+    """Every dashboard block, queried concurrently on the bounded dashboard pool"""
+    return await arun_concurrently(dashboard_queries(
+        business, start_date, end_date, granularity, blocks
+    ))
+
+
+def compute_dashboard_block(block, business, start_date, end_date, granularity=None):
+    """Compute one dashboard block for a business and date range"""
+    # Get filtered bills
+    bills = Bill.objects.filter(
+        business=business,
+        bill_date__range=[start_date, end_date]
+    )
+
+    # Daily rollups cover the same range in O(days) rows
+    rollups = BillDailyRollup.objects.filter(
+        business=business,
+        bill_date__range=[start_date, end_date]
+    )
+
+    # Key Metrics, Quick Stats and Payment Status Distribution
+    if block == 'metrics':
+        return get_dashboard_metrics(business, start_date, end_date)
+
+    # Generate Chart Data for Chart.js
+    if block == 'revenue_chart_data':
+        return get_revenue_chart_data(rollups, start_date, end_date, granularity)
+    if block == 'payment_status_chart_data':
+        return get_payment_status_chart_data(get_rollup_metrics(rollups)['payment_status_data'])
+    # Standard windows read materialized leaderboards, custom ranges query the bills
+    if block == 'vehicle_performance_data':
+        rows = get_top_entries(business, 'vehicle', start_date, end_date, TOP_VEHICLES)
+        if rows is None:
+            rows = get_live_top_entries(bills, 'vehicle', TOP_VEHICLES)
+        return get_vehicle_performance_data(rows)
+    if block == 'party_activity_data':
+        rows = get_top_entries(business, 'party', start_date, end_date, TOP_PARTIES)
+        if rows is None:
+            rows = get_live_top_entries(bills, 'party', TOP_PARTIES)
+        return get_party_activity_data(rows)
+    raise ValueError(f'Unknown dashboard block "{block}"')
+
+def get_revenue_chart_data(bills, start_date, end_date, granularity=None):
+    """Generate revenue chart data for Chart.js from bills or BillDailyRollup rows"""
+    try:
+        series = build_revenue_series(bills, start_date, end_date, granularity)
         
         return {
-            'labels': date_range,
+            'granularity': series['granularity'],
+            'labels': series['labels'],
             'datasets': [
                 {
                     'label': 'Total Revenue',
-                    'data': revenue_data,
+                    'data': series['revenue'],
                     'borderColor': '#4CAF50',
                     'backgroundColor': 'rgba(76, 175, 80, 0.1)',
                     'borderWidth': 3,
@@ -338,7 +640,7 @@ def get_revenue_chart_data(bills, start_date, end_date):
                 },
                 {
                     'label': 'Advance Received',
-                    'data': advance_data,
+                    'data': series['advance'],
                     'borderColor': '#FF9800',
                     'backgroundColor': 'rgba(255, 152, 0, 0.1)',
                     'borderWidth': 3,
@@ -369,20 +671,15 @@ def get_payment_status_chart_data(payment_status_data):
     except Exception as e:
         return {'labels': [], 'datasets': []}
 
-def get_vehicle_performance_data(bills):
-    """Generate vehicle performance data for Chart.js"""
+def get_vehicle_performance_data(vehicle_data):
+    """Generate vehicle performance data for Chart.js from top vehicle rows"""
     try:
-        vehicle_data = bills.values('vehicle__vehicle_number').annotate(
-            total_trips=Count('id'),
-            total_revenue=Sum('rent_amount')
-        ).order_by('-total_revenue')[:10]
-        
         if not vehicle_data:
             return {'labels': [], 'datasets': []}
         
-        vehicle_numbers = [item['vehicle__vehicle_number'] or 'Unknown' for item in vehicle_data]
-        trips = [item['total_trips'] for item in vehicle_data]
-        revenue = [float(item['total_revenue'] or 0) for item in vehicle_data]
+        vehicle_numbers = [item['label'] for item in vehicle_data]
+        trips = [item['bill_count'] for item in vehicle_data]
+        revenue = [float(item['revenue'] or 0) for item in vehicle_data]
         
         return {
             'labels': vehicle_numbers,
@@ -408,19 +705,14 @@ def get_vehicle_performance_data(bills):
     except Exception as e:
         return {'labels': [], 'datasets': []}
 
-def get_party_activity_data(bills):
-    """Generate party activity data for Chart.js"""
+def get_party_activity_data(party_data):
+    """Generate party activity data for Chart.js from top party rows"""
     try:
-        party_data = bills.values('party__name').annotate(
-            total_bills=Count('id'),
-            total_amount=Sum('rent_amount')
-        ).order_by('-total_amount')[:8]
-        
         if not party_data:
             return {'labels': [], 'datasets': []}
         
-        parties = [item['party__name'] or 'Unknown Party' for item in party_data]
-        amounts = [float(item['total_amount'] or 0) for item in party_data]
+        parties = [item['label'] for item in party_data]
+        amounts = [float(item['revenue'] or 0) for item in party_data]
         
         return {
             'labels': parties,
@@ -0,0 +1,157 @@
+import functools
+import queue
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager, nullcontext
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+try:
+    import fcntl
+except ImportError:  # Windows: writes are still serialized within each process
+    fcntl = None
+
+try:
+    from crum import get_current_user, impersonate
+except ImportError:
+    get_current_user, impersonate = (lambda: None), (lambda user: nullcontext())
+
+
+# Most writes committed together; jobs that queue up while a batch commits share the next one
+WRITE_BATCH_SIZE = getattr(settings, 'SQLITE_WRITE_BATCH_SIZE', 50)
+
+_local = threading.local()
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def write_queue_enabled(using=DEFAULT_DB_ALIAS):
+    """SQLITE_WRITE_QUEUE is on and the database is SQLite"""
+    return getattr(settings, 'SQLITE_WRITE_QUEUE', False) and connections[using].vendor == 'sqlite'
+
+
+@contextmanager
+def process_write_lock(using=DEFAULT_DB_ALIAS):
+    """Exclusive lock shared by every process writing to the database file
+
+    Writers of other gunicorn workers wait here, in order, instead of polling
+    SQLite's lock until busy_timeout runs out.
+    """
+    connection = connections[using]
+    if fcntl is None or connection.is_in_memory_db():
+        yield
+        return
+    with open(f"{connection.settings_dict['NAME']}.write-lock", 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class WriteQueue:
+    """A writer thread that runs submitted write callables in batched transactions
+
+    Every callable runs in its own savepoint, so a failing one only rolls
+    back itself; its exception is raised to its caller. Results are handed
+    back once the whole batch has committed.
+    """
+
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        self.using = using
+        self.jobs = queue.SimpleQueue()
+        self.thread = None
+        self.start_lock = threading.Lock()
+        self.batches = self.writes = 0
+
+    def submit(self, call):
+        future = Future()
+        self.jobs.put((call, future, get_current_user()))
+        if self.thread is None or not self.thread.is_alive():
+            with self.start_lock:
+                if self.thread is None or not self.thread.is_alive():
+                    self.thread = threading.Thread(target=self.run, name=f'sqlite-writer-{self.using}', daemon=True)
+                    self.thread.start()
+        return future
+
+    def take_batch(self):
+        """Wait for a job, then take whatever else is already waiting"""
+        batch = [self.jobs.get()]
+        while len(batch) < WRITE_BATCH_SIZE:
+            try:
+                batch.append(self.jobs.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def run(self):
+        _local.writer = True
+        while True:
+            batch = self.take_batch()
+            try:
+                self.commit(batch)
+            finally:
+                connections[self.using].close_if_unusable_or_obsolete()
+
+    def commit(self, batch):
+        results = []
+        try:
+            with process_write_lock(self.using), transaction.atomic(using=self.using):
+                for call, future, user in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        with impersonate(user), transaction.atomic(using=self.using):
+                            results.append((future, call(), None))
+                    except Exception as error:
+                        results.append((future, None, error))
+        except Exception as error:
+            # The commit itself failed, nothing of the batch was written
+            for call, future, user in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        self.batches += 1
+        self.writes += len(results)
+        for future, result, error in results:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+
+def get_write_queue(using=DEFAULT_DB_ALIAS):
+    if using not in _queues:
+        with _queues_lock:
+            _queues.setdefault(using, WriteQueue(using))
+    return _queues[using]
+
+
+def run_serialized(call, using=DEFAULT_DB_ALIAS):
+    """Run a write callable on the process's writer thread and return its result
+
+    Runs it directly when the queue is off, on the writer thread itself, and
+    inside an open transaction, which the writer thread could not join.
+    """
+    if (not write_queue_enabled(using) or getattr(_local, 'writer', False)
+            or connections[using].in_atomic_block):
+        return call()
+    return get_write_queue(using).submit(call).result()
+
+
+def serialize_writes(model):
+    """Class decorator sending a model's save() and delete() through run_serialized"""
+    save, delete = model.save, model.delete
+
+    @functools.wraps(save)
+    def serialized_save(self, *args, **kwargs):
+        return run_serialized(lambda: save(self, *args, **kwargs), kwargs.get('using') or DEFAULT_DB_ALIAS)
+
+    @functools.wraps(delete)
+    def serialized_delete(self, *args, **kwargs):
+        return run_serialized(lambda: delete(self, *args, **kwargs), kwargs.get('using') or DEFAULT_DB_ALIAS)
+
+    model.save, model.delete = serialized_save, serialized_delete
+    return model
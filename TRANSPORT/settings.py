@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -84,6 +85,52 @@ DATABASES = {
     }
 }
 
+# Send bill and master data writes through one writer thread per process, committed
+# in batches under a file lock shared by all processes (see AdminApp/write_queue.py).
+# Worth it with several gunicorn workers on SQLite; benchmark with `manage.py benchmark_writes`
+SQLITE_WRITE_QUEUE = os.environ.get('SQLITE_WRITE_QUEUE', '') == '1'
+
+# SQLite connection options used together with the write queue
+SQLITE_WRITE_QUEUE_OPTIONS = {
+    # WAL lets readers run while the writer commits, and with synchronous=NORMAL
+    # a commit no longer waits for fsync (only a power cut can lose the last ones)
+    'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL',
+    # Take the write lock at BEGIN: a read transaction upgrading to a write fails
+    # at once with "database is locked" instead of waiting for the timeout
+    'transaction_mode': 'IMMEDIATE',
+}
+
+if SQLITE_WRITE_QUEUE:
+    DATABASES['default']['OPTIONS'] = SQLITE_WRITE_QUEUE_OPTIONS
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Local memory is per process. When running several gunicorn workers, switch to
+# the file based cache so every worker sees the same dashboard versions:
+# CACHES = {
+#     'default': {
+#         'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+#         'LOCATION': BASE_DIR / 'cache',
+#     }
+# }
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'transport-cache',
+    }
+}
+
+# Seconds a computed report dashboard is cached (data changes invalidate it earlier)
+DASHBOARD_CACHE_TIMEOUT = 300
+
+# Worker threads per process for running independent dashboard queries concurrently
+DASHBOARD_QUERY_WORKERS = 4
+
+# Restart bill numbers every April 1st, e.g. ACM-2526-0001 instead of ACM-0001
+BILL_NUMBER_PER_FINANCIAL_YEAR = False
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -26,7 +26,14 @@ urlpatterns = [
     path('bill/<int:bill_id>/print/', views.bill_print_view, name='bill_print'),
     path('bill/print/', views.bills_print_view, name='bills_print'),
     path('report-dashboard/', views.report_dashboard, name='report_dashboard'),
-    # path('api/dashboard-data/', views.dashboard_data_api, name='dashboard_data_api'),
+    path('report-dashboard/overview/', views.business_overview, name='business_overview'),
+    path('api/dashboard-data/', views.dashboard_data_api, name='dashboard_data_api'),
+    path('api/activity/', views.activity_feed_api, name='activity_feed_api'),
+    path('api/bills/bulk/', views.bulk_bill_create_api, name='bulk_bill_create_api'),
+    path('api/bills/payments/', views.bill_payments_api, name='bill_payments_api'),
+    path('api/vehicles/lookup/', views.vehicle_lookup_api, name='vehicle_lookup_api'),
+    path('api/filter-choices/<str:field>/', views.filter_choices_api, name='filter_choices_api'),
+    path('api/bulk-actions/progress/', views.bulk_action_progress_api, name='bulk_action_progress_api'),
 
 
 ]+static(settings.MEDIA_URL,document_root=settings.MEDIA_ROOT) 